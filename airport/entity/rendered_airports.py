@@ -0,0 +1,27 @@
+import gzip
+import hashlib
+
+from rest_framework.renderers import JSONRenderer
+
+
+class RenderedAirports:
+    """This class is used to store the airports list rendered as JSON, plain and gzipped, for one data version"""
+
+    __slots__ = ("body", "gzip_body", "etag", "last_modified")
+
+    def __init__(self, body: bytes, gzip_body: bytes, etag: str, last_modified: float):
+        self.body = body
+        self.gzip_body = gzip_body
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @classmethod
+    def build(cls, airports: list[dict], last_modified: float) -> "RenderedAirports":
+        # Same bytes DRF's renderer would send, so clients see no difference
+        body = JSONRenderer().render(airports)
+        return cls(
+            body=body,
+            gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+            etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+            last_modified=last_modified,
+        )
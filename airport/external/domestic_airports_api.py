@@ -3,17 +3,25 @@ import os
 import requests
 from requests.auth import HTTPBasicAuth
 
+from flightservice.http_session import get_http_session, get_http_timeout
+
 load_dotenv()
 
 
 class DomesticAirportAPIConnector:
-    def __init__(self):
+    def __init__(self, session: requests.Session | None = None):
         self.username: str = os.getenv("USERNAME", "")
         self.password: str = os.getenv("PASSWORD", "")
         self.api_key: str = os.getenv("API_KEY", "")
+        self.base_url: str = os.getenv("AIRPORT_API_URL", "https://stub.amopromo.com")
+        self.session = session or get_http_session()
 
     def retrieve_airports(self) -> dict:
-        url = f"https://stub.amopromo.com/air/airports/{self.api_key}"
-        response = requests.get(url, auth=HTTPBasicAuth(self.username, self.password))
+        url = f"{self.base_url}/air/airports/{self.api_key}"
+        response = self.session.get(
+            url,
+            auth=HTTPBasicAuth(self.username, self.password),
+            timeout=get_http_timeout(),
+        )
         response.raise_for_status()
         return response.json()
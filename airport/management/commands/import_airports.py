@@ -10,7 +10,13 @@ class Command(BaseCommand):
             self.stdout.write(
                 self.style.SUCCESS("Starting 'Domestic Airport API' data process")
             )
-            AirportTask().update_airports()
+            result = AirportTask().update_airports()
+            self.stdout.write(
+                f"Airports: {result['created']} created, {result['updated']} updated, "
+                f"{result['deleted']} deleted, {result['unchanged']} unchanged"
+            )
+            for phase, seconds in result["timings"].items():
+                self.stdout.write(f"  {phase}: {seconds:.3f}s")
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(
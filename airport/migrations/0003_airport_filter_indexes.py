@@ -0,0 +1,31 @@
+# Generated by Django 4.2.4 on 2026-10-18 15:15
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0002_alter_airport_iata"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="airport",
+            index=models.Index(fields=["state", "iata"], name="airport_state_iata_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="airport",
+            index=models.Index(
+                django.db.models.functions.text.Lower("city"),
+                name="airport_city_lower_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="airport",
+            index=models.Index(
+                fields=["latitude", "longitude"], name="airport_lat_lon_idx"
+            ),
+        ),
+    ]
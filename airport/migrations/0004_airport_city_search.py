@@ -0,0 +1,35 @@
+# Generated by Django 4.2.4 on 2026-10-18 16:16
+
+from django.db import migrations, models
+
+
+def fill_city_search(apps, schema_editor):
+    Airport = apps.get_model("airport", "Airport")
+    airports = list(Airport.objects.only("id", "city"))
+    for airport in airports:
+        airport.city_search = airport.city.casefold()
+    Airport.objects.bulk_update(airports, ["city_search"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0003_airport_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="airport",
+            name="airport_city_lower_idx",
+        ),
+        migrations.AddField(
+            model_name="airport",
+            name="city_search",
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.RunPython(fill_city_search, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="airport",
+            index=models.Index(fields=["city_search"], name="airport_city_search_idx"),
+        ),
+    ]
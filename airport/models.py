@@ -2,6 +2,11 @@ from django.db import models
 from rest_framework import serializers
 
 
+def normalize_city(city: str) -> str:
+    """Method used to fold the case of a city, for every alphabet (SQLite lower() only folds ASCII)"""
+    return city.casefold()
+
+
 class Iata(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     iata_code = models.CharField(max_length=3, blank=False, unique=True)
@@ -20,10 +25,24 @@ class Airport(models.Model):
         Iata, on_delete=models.CASCADE, related_name="airport", to_field="iata_code"
     )
     city = models.CharField(max_length=100, blank=False)
+    # Filled from the city on save, the city prefix filter compares against it
+    city_search = models.CharField(max_length=100, blank=True, editable=False)
     latitude = models.FloatField(blank=False)
     longitude = models.FloatField(blank=False)
     state = models.CharField(max_length=2, blank=False)
 
+    class Meta:
+        # Ending on iata lets the filtered queries walk the index in the keyset order
+        indexes = [
+            models.Index(fields=["state", "iata"], name="airport_state_iata_idx"),
+            models.Index(fields=["city_search"], name="airport_city_search_idx"),
+            models.Index(fields=["latitude", "longitude"], name="airport_lat_lon_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.city_search = normalize_city(self.city)
+        super().save(*args, **kwargs)
+
 
 class AirportSerializer(serializers.ModelSerializer):
     class Meta:
@@ -0,0 +1,194 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.core.cache import cache as default_cache
+from django.core.cache.backends.base import BaseCache
+import logging
+import threading
+import time
+
+from airport.entity.rendered_airports import RenderedAirports
+from airport.repository.airport_repository import IAirportsRepository
+from airport.repository.airports_version import AirportsVersionWatcher
+
+
+class AirportCacheRepository(IAirportsRepository):
+    """Airports repository answering from a two-tier cache of the ready-to-send airports list.
+
+    Each cached list also carries its rendered JSON body, plain and gzipped, so the list
+    endpoint sends the same bytes until the airports change.
+
+    The first tier is an in-process copy and the second is the shared Django cache, both
+    keyed by the airports version, so an update invalidates every copy at once. The version
+    is checked at most once every `refresh_interval` seconds. Lists older than
+    `ttl - early_refresh` are refreshed in the background while still being served, and a
+    single thread per process (and a single process per version, through a cache lock)
+    queries the database at a time.
+    """
+
+    def __init__(
+        self,
+        airport_repository: IAirportsRepository,
+        ttl: float = 60,
+        early_refresh: float = 10,
+        refresh_interval: float | None = None,
+        version_watcher: AirportsVersionWatcher | None = None,
+        lock_timeout: float = 10,
+        cache: BaseCache = default_cache,
+    ):
+        self.airport_repository = airport_repository
+        self.ttl = ttl
+        self.early_refresh = early_refresh
+        self.version_watcher = version_watcher or AirportsVersionWatcher(
+            airport_repository, refresh_interval
+        )
+        self.lock_timeout = lock_timeout
+        self.cache = cache
+        # (version, airports, computed_at, rendered) entry, replaced as a whole by the loading thread
+        self.entry: tuple[int, list[dict], float, RenderedAirports] | None = None
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.refreshing = False
+        self.refresh_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="airport-cache-refresh"
+        )
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def get_airports(self) -> list[dict]:
+        return self.get_entry()[1]
+
+    def get_rendered_airports(self) -> RenderedAirports:
+        return self.get_entry()[3]
+
+    def get_entry(self) -> tuple[int, list[dict], float, RenderedAirports]:
+        version = self.get_version()
+        entry = self.entry
+        if entry is not None and entry[0] == version:
+            age = time.time() - entry[2]
+            if age < self.ttl - self.early_refresh:
+                self.hits += 1
+                return entry
+            if age < self.ttl:
+                self.hits += 1
+                self.start_refresh(version)
+                return entry
+        return self.load(version)
+
+    def find_airports(
+        self,
+        state: str | None = None,
+        city_prefix: str | None = None,
+        iatas: list[str] | None = None,
+        bounding_box: tuple[float, float, float, float] | None = None,
+        after: str | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        # Filtered pages are served by the database indexes
+        return self.airport_repository.find_airports(
+            state, city_prefix, iatas, bounding_box, after, limit
+        )
+
+    def update_airports(self, airport_list: list[dict]) -> dict:
+        result = self.airport_repository.update_airports(airport_list)
+        self.version_watcher.expire()  # Reads the bumped version on the next request
+        return result
+
+    def get_coordinates(self) -> dict[str, tuple[float, float]]:
+        return self.airport_repository.get_coordinates()
+
+    def get_version(self) -> int:
+        return self.version_watcher.get_version()
+
+    def load(self, version: int) -> tuple[int, list[dict], float, RenderedAirports]:
+        """Method used to load the airports on a miss, letting a single thread do it at a time"""
+        with self.lock:
+            entry = self.entry
+            if (
+                entry is not None
+                and entry[0] == version
+                and time.time() - entry[2] < self.ttl
+            ):
+                return entry  # Loaded by another thread while this one waited
+
+            entry = self.get_shared_entry(version, max_age=self.ttl)
+            if entry is not None:
+                self.shared_hits += 1
+            else:
+                self.misses += 1
+                entry = self.compute(version, wait=True)
+            self.entry = entry
+            return entry
+
+    def start_refresh(self, version: int) -> None:
+        with self.refresh_lock:
+            if self.refreshing:
+                return
+            self.refreshing = True
+        self.refresh_executor.submit(self.refresh, version)
+
+    def refresh(self, version: int) -> None:
+        try:
+            # Another process may have refreshed the shared list already
+            entry = self.get_shared_entry(
+                version, max_age=self.ttl - self.early_refresh
+            )
+            if entry is None:
+                entry = self.compute(version, wait=False)
+            if entry is not None:
+                self.entry = entry
+        except Exception as error:
+            logging.warning(f"Could not refresh cached airports: {error}")
+        finally:
+            with self.refresh_lock:
+                self.refreshing = False
+
+    def stats(self) -> dict:
+        """Method used to count the requests answered in process, by the shared cache and by the database"""
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+        }
+
+    def get_shared_entry(
+        self, version: int, max_age: float
+    ) -> tuple[int, list[dict], float, RenderedAirports] | None:
+        entry = self.cache.get(f"airports:{version}")
+        if entry is not None and time.time() - entry[2] < max_age:
+            return entry
+        return None
+
+    def compute(
+        self, version: int, wait: bool
+    ) -> tuple[int, list[dict], float, RenderedAirports] | None:
+        """Method used to query the airports and share them, unless another process is already doing it.
+
+        When `wait` is set, waits up to `lock_timeout` seconds for the other process to share the
+        airports before querying them anyway. Otherwise returns None.
+        """
+        lock_key = f"airports:{version}:lock"
+        acquired = self.cache.add(lock_key, 1, self.lock_timeout)
+        if not acquired:
+            if not wait:
+                return None
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                entry = self.get_shared_entry(version, max_age=self.ttl)
+                if entry is not None:
+                    return entry
+            logging.warning("Timed out waiting for the cached airports")
+
+        try:
+            airports = self.airport_repository.get_airports()
+            computed_at = time.time()
+            # The version is the update time (ns), unless the airports were never updated
+            last_modified = version / 1e9 if version else computed_at
+            rendered = RenderedAirports.build(airports, last_modified)
+            entry = (version, airports, computed_at, rendered)
+            self.cache.set(f"airports:{version}", entry, self.ttl)
+            logging.info(f"Caching {len(entry[1])} airports (version {version})")
+            return entry
+        finally:
+            if acquired:
+                self.cache.delete(lock_key)
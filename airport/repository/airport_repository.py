@@ -1,10 +1,14 @@
 from abc import ABC, abstractmethod
 from django.core.cache import cache
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
 import logging
+import time
 
-from airport.models import Airport, AirportSerializer
+from airport.entity.rendered_airports import RenderedAirports
+from airport.models import Airport, AirportSerializer, normalize_city
 from airport.repository.iata_repository import IataRepository
-from rest_framework.serializers import ReturnDict
 
 
 class IAirportsRepository(ABC):
@@ -13,42 +17,176 @@ class IAirportsRepository(ABC):
         pass
 
     @abstractmethod
-    def update_airports(self, airport_list: list[dict]) -> None:
+    def get_rendered_airports(self) -> RenderedAirports:
+        pass
+
+    @abstractmethod
+    def find_airports(
+        self,
+        state: str | None = None,
+        city_prefix: str | None = None,
+        iatas: list[str] | None = None,
+        bounding_box: tuple[float, float, float, float] | None = None,
+        after: str | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        pass
+
+    @abstractmethod
+    def update_airports(self, airport_list: list[dict]) -> dict:
+        pass
+
+    @abstractmethod
+    def get_coordinates(self) -> dict[str, tuple[float, float]]:
+        pass
+
+    @abstractmethod
+    def get_version(self) -> int:
         pass
 
 
 class AirportRepository(IAirportsRepository):
+    BATCH_SIZE = 500
+    UPDATED_FIELDS = ("city", "latitude", "longitude", "state")
+    # Derived from the updated fields, bulk_create and bulk_update don't call save()
+    DERIVED_FIELDS = ("city_search",)
+
     def __init__(self, iata_repository: IataRepository):
         self.iata_repository = iata_repository
 
-    def get_airports(self) -> ReturnDict:
-        cached_data = cache.get("airports")
+    def get_airports(self) -> list[dict]:
+        qs = Airport.objects.all()
+        return list(AirportSerializer(qs, many=True).data)
 
-        if cached_data is not None:
-            logging.info("Using cached airports data")
-            return cached_data
+    def get_rendered_airports(self) -> RenderedAirports:
+        return RenderedAirports.build(self.get_airports(), time.time())
 
-        qs = Airport.objects.all()
-        airports = AirportSerializer(qs, many=True).data
-        cache.set("airports", airports, 60)
-        logging.info("Caching airports data")
-        return airports
+    def find_airports(
+        self,
+        state: str | None = None,
+        city_prefix: str | None = None,
+        iatas: list[str] | None = None,
+        bounding_box: tuple[float, float, float, float] | None = None,
+        after: str | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        qs = self.filter_airports(state, city_prefix, iatas, bounding_box, after)
+        if limit is not None:
+            qs = qs[:limit]
+        return list(AirportSerializer(qs, many=True).data)
 
-    def update_airports(self, airport_list: list[dict]) -> None:
-        for airport in airport_list:
-            iata_obj = self.iata_repository.create_iata(airport["iata"])
-            _, created = Airport.objects.update_or_create(
-                iata=iata_obj,
-                defaults={
-                    "city": airport["city"],
-                    "latitude": airport["latitude"],
-                    "longitude": airport["longitude"],
-                    "state": airport["state"],
-                },
+    def filter_airports(
+        self,
+        state: str | None = None,
+        city_prefix: str | None = None,
+        iatas: list[str] | None = None,
+        bounding_box: tuple[float, float, float, float] | None = None,
+        after: str | None = None,
+    ) -> QuerySet:
+        """Method used to build the query of the airports matching every given filter, ordered by iata.
+
+        `bounding_box` is (min latitude, min longitude, max latitude, max longitude) and `after` is
+        the last iata of the previous page (keyset pagination).
+        """
+        qs = Airport.objects.order_by("iata_id")
+        if state is not None:
+            qs = qs.filter(state=state)
+        if city_prefix is not None:
+            # A range over the folded city is served by its index, unlike the LIKE of istartswith
+            prefix = normalize_city(city_prefix)
+            qs = qs.filter(
+                city_search__gte=prefix, city_search__lt=prefix + "\U0010ffff"
+            )
+        if iatas is not None:
+            qs = qs.filter(iata_id__in=iatas)
+        if bounding_box is not None:
+            min_latitude, min_longitude, max_latitude, max_longitude = bounding_box
+            qs = qs.filter(
+                latitude__range=(min_latitude, max_latitude),
+                longitude__range=(min_longitude, max_longitude),
             )
-            if created:
-                logging.info(f"Airport '{airport['iata']}' created.")
+        if after is not None:
+            qs = qs.filter(iata_id__gt=after)
+        return qs
+
+    def update_airports(self, airport_list: list[dict]) -> dict:
+        """Syncs the airports table with the airport list, touching only the airports that changed.
+
+        Returns the number of created, updated, deleted and unchanged airports together with the
+        time in seconds spent on each phase.
+        """
+        timings = {}
+        started_at = time.perf_counter()
+        existing = {airport.iata_id: airport for airport in Airport.objects.all()}
+        timings["load"] = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        now = timezone.now()
+        to_create, to_update = [], []
+        incoming_iatas = set()
+        for airport in airport_list:
+            incoming_iatas.add(airport["iata"])
+            current = existing.get(airport["iata"])
+            fields = self.get_fields(airport)
+            if current is None:
+                to_create.append(Airport(iata_id=airport["iata"], **fields))
+            elif any(
+                getattr(current, field) != value for field, value in fields.items()
+            ):
+                for field, value in fields.items():
+                    setattr(current, field, value)
+                current.updated_at = now  # bulk_update doesn't fill auto_now fields
+                to_update.append(current)
+        to_delete = [iata for iata in existing if iata not in incoming_iatas]
+        timings["diff"] = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        changed = bool(to_create or to_update or to_delete)
+        if changed:
+            with transaction.atomic():
+                self.iata_repository.create_iatas(
+                    [airport.iata_id for airport in to_create], self.BATCH_SIZE
+                )
+                Airport.objects.bulk_create(to_create, batch_size=self.BATCH_SIZE)
+                Airport.objects.bulk_update(
+                    to_update,
+                    fields=[*self.UPDATED_FIELDS, *self.DERIVED_FIELDS, "updated_at"],
+                    batch_size=self.BATCH_SIZE,
+                )
+                self.iata_repository.delete_iatas(to_delete, self.BATCH_SIZE)
+        timings["write"] = time.perf_counter() - started_at
+
+        result = {
+            "created": len(to_create),
+            "updated": len(to_update),
+            "deleted": len(to_delete),
+            "unchanged": len(airport_list) - len(to_create) - len(to_update),
+            "timings": timings,
+        }
+        logging.info(
+            f"Airports synced: {result['created']} created, {result['updated']} updated, "
+            f"{result['deleted']} deleted, {result['unchanged']} unchanged."
+        )
+        if changed:
+            # Cached airports data is keyed by version, so bumping it invalidates every copy
+            self.bump_version()
+            logging.info("Airports version bumped")
+        return result
+
+    def get_fields(self, airport: dict) -> dict:
+        fields = {field: airport[field] for field in self.UPDATED_FIELDS}
+        fields["city_search"] = normalize_city(airport["city"])
+        return fields
+
+    def get_coordinates(self) -> dict[str, tuple[float, float]]:
+        """Returns the (latitude, longitude) of every airport by its iata code"""
+        qs = Airport.objects.values_list("iata_id", "latitude", "longitude")
+        return {iata: (latitude, longitude) for iata, latitude, longitude in qs}
+
+    def get_version(self) -> int:
+        """Returns the version of the airports data, which changes on every update"""
+        return cache.get("airports_version", 0)
 
-        cache.delete("airports")
-        logging.info("Reseting cached airports data")
-        return
+    def bump_version(self) -> None:
+        # Shared through the cache so other processes notice the airports changed
+        cache.set("airports_version", time.time_ns(), None)
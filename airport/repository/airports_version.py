@@ -0,0 +1,81 @@
+from django.conf import settings
+from typing import Callable, Generic, TypeVar
+import threading
+import time
+
+from airport.repository.airport_repository import AirportRepository, IAirportsRepository
+from airport.repository.iata_repository import IataRepository
+
+T = TypeVar("T")
+
+
+class AirportsVersionWatcher:
+    """This class is used to read the airports version at most once every `refresh_interval` seconds.
+
+    The interval defaults to AIRPORT_CACHE_VERSION_INTERVAL. The in-process copies of the
+    airports share `airports_version_watcher`, so they pick up an update together.
+    """
+
+    def __init__(
+        self, repository: IAirportsRepository, refresh_interval: float | None = None
+    ):
+        self.repository = repository
+        self.refresh_interval = (
+            settings.AIRPORT_CACHE_VERSION_INTERVAL
+            if refresh_interval is None
+            else refresh_interval
+        )
+        self.version: int | None = None
+        self.checked_at = 0.0
+
+    def get_version(self) -> int:
+        now = time.monotonic()
+        if self.version is None or now - self.checked_at >= self.refresh_interval:
+            self.version = self.repository.get_version()
+            self.checked_at = now
+        return self.version
+
+    def expire(self) -> None:
+        """Method used to read the version again on the next call, after the airports were updated"""
+        self.version = None
+
+
+class VersionedAirportsData(Generic[T]):
+    """This class is used to keep data built from the airports, rebuilding it when their version changes.
+
+    The version is read through the given AirportsVersionWatcher, or an own one. A single
+    thread builds the data at a time, the others wait for it.
+    """
+
+    def __init__(
+        self,
+        repository: IAirportsRepository,
+        build: Callable[[int], T],
+        refresh_interval: float | None = None,
+        watcher: AirportsVersionWatcher | None = None,
+    ):
+        self.watcher = watcher or AirportsVersionWatcher(repository, refresh_interval)
+        self.build = build
+        # (version, data) pair, replaced as a whole so readers never see a partial build
+        self.entry: tuple[int, T] | None = None
+        self.lock = threading.Lock()
+
+    def get(self) -> T:
+        version = self.watcher.get_version()
+        entry = self.entry
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        with self.lock:
+            entry = self.entry
+            if entry is None or entry[0] != version:
+                entry = (version, self.build(version))
+                self.entry = entry
+        return entry[1]
+
+    def expire(self) -> None:
+        self.watcher.expire()
+
+
+# Shared by the in-process copies of the airports, so the version is read once per interval
+airports_version_watcher = AirportsVersionWatcher(AirportRepository(IataRepository()))
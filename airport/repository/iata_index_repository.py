@@ -0,0 +1,52 @@
+import logging
+
+from airport.models import Iata
+from airport.repository.airport_repository import IAirportsRepository
+from airport.repository.airports_version import (
+    AirportsVersionWatcher,
+    VersionedAirportsData,
+)
+from airport.repository.iata_repository import IIataRepository
+
+
+class IataIndexRepository(IIataRepository):
+    """Iata repository answering lookups from an in-memory index of the iata codes.
+
+    The index is loaded on first use and swapped for a fresh one whenever the airports
+    version changes. The version is checked at most once every `refresh_interval` seconds,
+    so lookups in between don't touch the database.
+    """
+
+    def __init__(
+        self,
+        iata_repository: IIataRepository,
+        airport_repository: IAirportsRepository,
+        refresh_interval: float | None = None,
+        version_watcher: AirportsVersionWatcher | None = None,
+    ):
+        self.iata_repository = iata_repository
+        self.airport_repository = airport_repository
+        self.iata_codes = VersionedAirportsData(
+            airport_repository, self.load_iata_codes, refresh_interval, version_watcher
+        )
+
+    def get_iata(self, iata: str) -> dict:
+        # Same shape as the IataSerializer data, which has an empty code when not found
+        return {"iata_code": iata if iata in self.get_iata_codes() else ""}
+
+    def create_iata(self, iata: str) -> Iata:
+        return self.iata_repository.create_iata(iata)
+
+    def create_iatas(self, iatas: list[str], batch_size: int = 500) -> None:
+        self.iata_repository.create_iatas(iatas, batch_size)
+
+    def delete_iatas(self, iatas: list[str], batch_size: int = 500) -> None:
+        self.iata_repository.delete_iatas(iatas, batch_size)
+
+    def get_iata_codes(self) -> frozenset[str]:
+        return self.iata_codes.get()
+
+    def load_iata_codes(self, version: int) -> frozenset[str]:
+        iata_codes = self.iata_repository.get_iata_codes()
+        logging.info(f"Loaded {len(iata_codes)} iata codes (version {version})")
+        return iata_codes
@@ -13,6 +13,18 @@ class IIataRepository(ABC):
     def create_iata(self, iata: str) -> None:
         pass
 
+    @abstractmethod
+    def get_iata_codes(self) -> frozenset[str]:
+        pass
+
+    @abstractmethod
+    def create_iatas(self, iatas: list[str], batch_size: int) -> None:
+        pass
+
+    @abstractmethod
+    def delete_iatas(self, iatas: list[str], batch_size: int) -> None:
+        pass
+
 
 class IataRepository(IIataRepository):
     def get_iata(self, iata: str) -> ReturnDict:
@@ -24,3 +36,18 @@ class IataRepository(IIataRepository):
         if created:
             logging.info(f"Iata '{iata}' created.")
         return obj
+
+    def get_iata_codes(self) -> frozenset[str]:
+        return frozenset(Iata.objects.values_list("iata_code", flat=True))
+
+    def create_iatas(self, iatas: list[str], batch_size: int = 500) -> None:
+        Iata.objects.bulk_create(
+            [Iata(iata_code=iata) for iata in iatas],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+
+    def delete_iatas(self, iatas: list[str], batch_size: int = 500) -> None:
+        # Their airports are deleted in cascade
+        for i in range(0, len(iatas), batch_size):
+            Iata.objects.filter(iata_code__in=iatas[i : i + batch_size]).delete()
@@ -1,15 +1,36 @@
 from abc import ABC, abstractmethod
 
+from airport.entity.rendered_airports import RenderedAirports
 from airport.repository.airport_repository import IAirportsRepository
 
 
+class ValidationException(Exception):
+    pass
+
+
 class IAirportsService(ABC):
     @abstractmethod
     def get_airports(self) -> list:
         pass
 
     @abstractmethod
-    def update_airports(self) -> None:
+    def get_rendered_airports(self) -> RenderedAirports:
+        pass
+
+    @abstractmethod
+    def find_airports(
+        self,
+        state: str | None = None,
+        city_prefix: str | None = None,
+        iatas: list[str] | None = None,
+        bounding_box: tuple[float, float, float, float] | None = None,
+        after: str | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        pass
+
+    @abstractmethod
+    def update_airports(self) -> dict:
         pass
 
     @abstractmethod
@@ -18,13 +39,38 @@ class IAirportsService(ABC):
 
 
 class AirportService(IAirportsService):
+    MAX_LIMIT = 1000
+
     def __init__(self, repository: IAirportsRepository):
         self.repository = repository
 
     def get_airports(self) -> list:
         return self.repository.get_airports()
 
-    def update_airports(self, airports_data: dict) -> None:
+    def get_rendered_airports(self) -> RenderedAirports:
+        return self.repository.get_rendered_airports()
+
+    def find_airports(
+        self,
+        state: str | None = None,
+        city_prefix: str | None = None,
+        iatas: list[str] | None = None,
+        bounding_box: tuple[float, float, float, float] | None = None,
+        after: str | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        self.validate_limit(limit)
+        self.validate_bounding_box(bounding_box)
+        return self.repository.find_airports(
+            state=state.upper() if state is not None else None,
+            city_prefix=city_prefix,
+            iatas=[iata.upper() for iata in iatas] if iatas is not None else None,
+            bounding_box=bounding_box,
+            after=after.upper() if after is not None else None,
+            limit=limit,
+        )
+
+    def update_airports(self, airports_data: dict) -> dict:
         airports_list = self.format_airport_data(airports_data)
         return self.repository.update_airports(airports_list)
 
@@ -41,3 +87,18 @@ class AirportService(IAirportsService):
                 }
             )
         return airports_list
+
+    def validate_limit(self, limit: int | None):
+        if limit is not None and not 1 <= limit <= self.MAX_LIMIT:
+            raise ValidationException(f"'limit' must be between 1 and {self.MAX_LIMIT}")
+
+    def validate_bounding_box(
+        self, bounding_box: tuple[float, float, float, float] | None
+    ):
+        if bounding_box is None:
+            return
+        min_latitude, min_longitude, max_latitude, max_longitude = bounding_box
+        if min_latitude > max_latitude or min_longitude > max_longitude:
+            raise ValidationException(
+                "'bbox' must be min_latitude,min_longitude,max_latitude,max_longitude"
+            )
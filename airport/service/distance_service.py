@@ -0,0 +1,86 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import threading
+
+from airport.repository.airport_repository import IAirportsRepository
+from airport.repository.airports_version import (
+    AirportsVersionWatcher,
+    VersionedAirportsData,
+)
+from flight.utils.haversine_formula import haversine_distance
+
+
+class IDistanceService(ABC):
+    @abstractmethod
+    def get_distance(self, origin: str, destination: str) -> float | None:
+        pass
+
+    @abstractmethod
+    def get_distances_from(self, origin: str) -> dict[str, float]:
+        pass
+
+
+class AirportDistanceService(IDistanceService):
+    """Great-circle distances between airports, memoized by iata pair.
+
+    The airport coordinates are loaded once and reloaded, together with the memoized
+    distances, whenever the airports version changes. The version is checked at most
+    once every `refresh_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        repository: IAirportsRepository,
+        max_size: int = 4096,
+        refresh_interval: float | None = None,
+        version_watcher: AirportsVersionWatcher | None = None,
+    ):
+        self.repository = repository
+        self.max_size = max_size
+        self.coordinates = VersionedAirportsData(
+            repository, self.load_coordinates, refresh_interval, version_watcher
+        )
+        self.distances: OrderedDict[tuple[str, str], float] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_distance(self, origin: str, destination: str) -> float | None:
+        """Returns the distance in km between two airports, or None if any of them is unknown"""
+        coordinates = self.get_coordinates()
+        # The distance is symmetric, so both directions share the same entry
+        key = (origin, destination) if origin <= destination else (destination, origin)
+        with self.lock:
+            distance = self.distances.get(key)
+            if distance is not None:
+                self.distances.move_to_end(key)
+                return distance
+
+        if origin not in coordinates or destination not in coordinates:
+            return None
+        distance = haversine_distance(*coordinates[key[0]], *coordinates[key[1]])
+        with self.lock:
+            self.distances[key] = distance
+            while len(self.distances) > self.max_size:
+                self.distances.popitem(last=False)
+        return distance
+
+    def get_distances_from(self, origin: str) -> dict[str, float]:
+        """Returns the distance in km from the origin to every other airport"""
+        coordinates = self.get_coordinates()
+        if origin not in coordinates:
+            return {}
+        latitude, longitude = coordinates[origin]
+        return {
+            iata: haversine_distance(latitude, longitude, *iata_coordinates)
+            for iata, iata_coordinates in coordinates.items()
+            if iata != origin
+        }
+
+    def get_coordinates(self) -> dict[str, tuple[float, float]]:
+        return self.coordinates.get()
+
+    def load_coordinates(self, version: int) -> dict[str, tuple[float, float]]:
+        coordinates = self.repository.get_coordinates()
+        # The memoized distances may belong to moved or removed airports
+        with self.lock:
+            self.distances.clear()
+        return coordinates
@@ -0,0 +1,120 @@
+from abc import ABC, abstractmethod
+import logging
+import time
+
+from airport.repository.airport_repository import IAirportsRepository
+from airport.repository.airports_version import (
+    AirportsVersionWatcher,
+    VersionedAirportsData,
+)
+from airport.service.airport_service import ValidationException
+from airport.utils.spatial_index import SpatialIndex
+
+
+class AirportNotFoundException(Exception):
+    pass
+
+
+class INearbyAirportsService(ABC):
+    @abstractmethod
+    def get_nearest(
+        self, latitude: float, longitude: float, k: int
+    ) -> list[tuple[str, float]]:
+        pass
+
+    @abstractmethod
+    def get_within(
+        self, latitude: float, longitude: float, radius: float
+    ) -> list[tuple[str, float]]:
+        pass
+
+    @abstractmethod
+    def get_nearest_to_airport(self, iata: str, k: int) -> list[tuple[str, float]]:
+        pass
+
+    @abstractmethod
+    def get_within_airport(self, iata: str, radius: float) -> list[tuple[str, float]]:
+        pass
+
+
+class NearbyAirportsService(INearbyAirportsService):
+    """Nearest airports to a point or to another airport, as (iata, distance in km) closest first.
+
+    Answers from a spatial index of the airport coordinates, which is built on first use
+    and rebuilt whenever the airports version changes. The version is checked at most
+    once every `refresh_interval` seconds.
+    """
+
+    MAX_K = 100
+    MAX_RADIUS = 5000
+
+    def __init__(
+        self,
+        repository: IAirportsRepository,
+        refresh_interval: float | None = None,
+        version_watcher: AirportsVersionWatcher | None = None,
+    ):
+        self.repository = repository
+        self.index = VersionedAirportsData(
+            repository, self.build_index, refresh_interval, version_watcher
+        )
+
+    def get_nearest(
+        self, latitude: float, longitude: float, k: int
+    ) -> list[tuple[str, float]]:
+        self.validate_coordinates(latitude, longitude)
+        self.validate_k(k)
+        return self.get_index().nearest(latitude, longitude, k)
+
+    def get_within(
+        self, latitude: float, longitude: float, radius: float
+    ) -> list[tuple[str, float]]:
+        self.validate_coordinates(latitude, longitude)
+        self.validate_radius(radius)
+        return self.get_index().within(latitude, longitude, radius)
+
+    def get_nearest_to_airport(self, iata: str, k: int) -> list[tuple[str, float]]:
+        self.validate_k(k)
+        index = self.get_index()
+        latitude, longitude = self.get_airport_coordinates(index, iata)
+        return index.nearest(latitude, longitude, k, exclude=iata)
+
+    def get_within_airport(self, iata: str, radius: float) -> list[tuple[str, float]]:
+        self.validate_radius(radius)
+        index = self.get_index()
+        latitude, longitude = self.get_airport_coordinates(index, iata)
+        return index.within(latitude, longitude, radius, exclude=iata)
+
+    def get_airport_coordinates(
+        self, index: SpatialIndex, iata: str
+    ) -> tuple[float, float]:
+        coordinates = index.coordinates.get(iata)
+        if coordinates is None:
+            raise AirportNotFoundException(f"Airport {iata} not found")
+        return coordinates
+
+    def get_index(self) -> SpatialIndex:
+        return self.index.get()
+
+    def build_index(self, version: int) -> SpatialIndex:
+        started_at = time.perf_counter()
+        index = SpatialIndex(self.repository.get_coordinates())
+        logging.info(
+            f"Built the spatial index of {len(index)} airports "
+            f"in {time.perf_counter() - started_at:.3f}s (version {version})"
+        )
+        return index
+
+    def validate_coordinates(self, latitude: float, longitude: float):
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValidationException("Invalid coordinates")
+
+    def validate_k(self, k: int):
+        if not 1 <= k <= self.MAX_K:
+            raise ValidationException(f"'k' must be between 1 and {self.MAX_K}")
+
+    def validate_radius(self, radius: float):
+        if not 0 < radius <= self.MAX_RADIUS:
+            raise ValidationException(
+                f"'radius' must be greater than 0 and up to {self.MAX_RADIUS} km"
+            )
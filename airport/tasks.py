@@ -1,3 +1,5 @@
+import time
+
 from airport.service.airport_service import AirportService
 from airport.external.domestic_airports_api import DomesticAirportAPIConnector
 from airport.repository.airport_repository import AirportRepository
@@ -10,6 +12,10 @@ class AirportTask:
         self.airport_service = AirportService(self.airport_repository)
         self.domestic_airport_api_connector = DomesticAirportAPIConnector()
 
-    def update_airports(self):
+    def update_airports(self) -> dict:
+        started_at = time.perf_counter()
         airports_data = self.domestic_airport_api_connector.retrieve_airports()
-        self.airport_service.update_airports(airports_data)
+        fetch_time = time.perf_counter() - started_at
+        result = self.airport_service.update_airports(airports_data)
+        result["timings"] = {"fetch": fetch_time, **result["timings"]}
+        return result
@@ -0,0 +1,53 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import pytest
+import time
+
+COORDINATES = {
+    "GRU": (-23.425669, -46.481926),
+    "CGH": (-23.627, -46.655),
+    "VCP": (-23.0074, -47.1345),
+    "GIG": (-22.81, -43.2506),
+    "BSB": (-15.869167, -47.920834),
+    "STM": (-2.424886, -54.78639),
+}
+
+
+class FakeAirportRepository:
+    """Airports repository kept in memory, counting its loads (after `delay` seconds each) and version reads"""
+
+    def __init__(self, airports: list[dict] | None = None, delay: float = 0):
+        self.delay = delay
+        self.version = 1
+        self.version_reads = 0
+        self.loads = 0
+        self.airports = airports or [{"iata": "GRU"}, {"iata": "STM"}]
+        self.coordinates = dict(COORDINATES)
+
+    def get_airports(self) -> list[dict]:
+        self.loads += 1
+        time.sleep(self.delay)
+        return list(self.airports)
+
+    def get_coordinates(self) -> dict[str, tuple[float, float]]:
+        self.loads += 1
+        return dict(self.coordinates)
+
+    def update_airports(self, airport_list: list[dict]) -> dict:
+        self.airports = airport_list
+        self.version += 1
+        return {"created": len(airport_list)}
+
+    def get_version(self) -> int:
+        self.version_reads += 1
+        return self.version
+
+
+@pytest.fixture
+def airport_repository() -> FakeAirportRepository:
+    return FakeAirportRepository()
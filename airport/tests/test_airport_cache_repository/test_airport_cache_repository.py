@@ -0,0 +1,84 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import pytest
+import threading
+import time
+from django.core.cache.backends.locmem import LocMemCache
+
+from airport.repository.airport_cache_repository import AirportCacheRepository
+from airport.tests.conftest import FakeAirportRepository
+
+
+@pytest.fixture
+def shared_cache() -> LocMemCache:
+    cache = LocMemCache("airport-cache-test", {})
+    cache.clear()
+    return cache
+
+
+def wait_for(condition, timeout: float = 2) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_airports_are_served_from_the_process_copy(shared_cache):
+    airport_repository = FakeAirportRepository()
+    repository = AirportCacheRepository(airport_repository, cache=shared_cache)
+    for _ in range(10):
+        assert repository.get_airports() == [{"iata": "GRU"}, {"iata": "STM"}]
+    assert airport_repository.loads == 1
+
+
+def test_other_processes_reuse_the_shared_copy(shared_cache):
+    airport_repository = FakeAirportRepository()
+    AirportCacheRepository(airport_repository, cache=shared_cache).get_airports()
+    other_process = AirportCacheRepository(airport_repository, cache=shared_cache)
+    assert other_process.get_airports() == [{"iata": "GRU"}, {"iata": "STM"}]
+    assert airport_repository.loads == 1
+
+
+def test_concurrent_misses_load_the_airports_once(shared_cache):
+    airport_repository = FakeAirportRepository(delay=0.2)
+    repository = AirportCacheRepository(airport_repository, cache=shared_cache)
+    threads = [threading.Thread(target=repository.get_airports) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert airport_repository.loads == 1
+
+
+def test_update_airports_bumps_the_version_of_every_copy(shared_cache):
+    airport_repository = FakeAirportRepository()
+    repository = AirportCacheRepository(airport_repository, cache=shared_cache)
+    other_process = AirportCacheRepository(
+        airport_repository, cache=shared_cache, refresh_interval=0
+    )
+    repository.get_airports()
+    other_process.get_airports()
+
+    repository.update_airports([{"iata": "BSB"}])
+    assert repository.get_airports() == [{"iata": "BSB"}]
+    assert other_process.get_airports() == [{"iata": "BSB"}]
+    assert airport_repository.loads == 2
+
+
+def test_airports_close_to_expiry_are_refreshed_in_background(shared_cache):
+    airport_repository = FakeAirportRepository()
+    repository = AirportCacheRepository(
+        airport_repository, ttl=10, early_refresh=10, cache=shared_cache
+    )
+    repository.get_airports()
+    computed_at = repository.entry[2]
+
+    airport_repository.airports = [{"iata": "BSB"}]
+    # Still served while the refresh runs
+    assert repository.get_airports() == [{"iata": "GRU"}, {"iata": "STM"}]
+    wait_for(lambda: repository.entry[2] > computed_at)
+    assert repository.get_airports() == [{"iata": "BSB"}]
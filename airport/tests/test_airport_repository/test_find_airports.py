@@ -0,0 +1,114 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import pytest
+
+from airport.repository.airport_repository import AirportRepository
+from airport.repository.iata_repository import IataRepository
+
+AIRPORTS = [
+    {"iata": "BSB", "city": "Brasília", "latitude": -15.87, "longitude": -47.92, "state": "DF"},
+    {"iata": "CGH", "city": "São Paulo", "latitude": -23.63, "longitude": -46.66, "state": "SP"},
+    {"iata": "GIG", "city": "Rio de Janeiro", "latitude": -22.81, "longitude": -43.25, "state": "RJ"},
+    {"iata": "GRU", "city": "São Paulo", "latitude": -23.43, "longitude": -46.48, "state": "SP"},
+    {"iata": "SSA", "city": "Salvador", "latitude": -12.91, "longitude": -38.32, "state": "BA"},
+    {"iata": "STM", "city": "Santarem", "latitude": -2.42, "longitude": -54.79, "state": "PA"},
+    {"iata": "VCP", "city": "Campinas", "latitude": -23.01, "longitude": -47.13, "state": "SP"},
+]  # fmt: skip
+
+
+pytestmark = pytest.mark.usefixtures("db")
+
+
+@pytest.fixture
+def airport_repository() -> AirportRepository:
+    airport_repository = AirportRepository(IataRepository())
+    airport_repository.update_airports(AIRPORTS)
+    return airport_repository
+
+
+def get_iatas(airports: list[dict]) -> list[str]:
+    return [airport["iata"] for airport in airports]
+
+
+def test_find_airports_filters_by_state(airport_repository: AirportRepository):
+    airports = airport_repository.find_airports(state="SP")
+    assert get_iatas(airports) == ["CGH", "GRU", "VCP"]
+
+
+def test_find_airports_filters_by_city_prefix(airport_repository: AirportRepository):
+    assert get_iatas(airport_repository.find_airports(city_prefix="sã")) == [
+        "CGH",
+        "GRU",
+    ]
+    assert get_iatas(airport_repository.find_airports(city_prefix="SA")) == [
+        "SSA",
+        "STM",
+    ]
+
+
+@pytest.mark.parametrize("city_prefix", ["SÃO", "são", "São Paulo"])
+def test_find_airports_folds_the_case_of_any_alphabet(
+    airport_repository: AirportRepository, city_prefix: str
+):
+    assert get_iatas(airport_repository.find_airports(city_prefix=city_prefix)) == [
+        "CGH",
+        "GRU",
+    ]
+
+
+def test_updated_city_is_found_by_its_new_prefix(airport_repository: AirportRepository):
+    airport_repository.update_airports(
+        [
+            {**airport, "city": "Ñuñoa"} if airport["iata"] == "SSA" else airport
+            for airport in AIRPORTS
+        ]
+    )
+    assert get_iatas(airport_repository.find_airports(city_prefix="ñu")) == ["SSA"]
+    assert get_iatas(airport_repository.find_airports(city_prefix="ÑU")) == ["SSA"]
+
+
+def test_find_airports_filters_by_iatas(airport_repository: AirportRepository):
+    airports = airport_repository.find_airports(iatas=["STM", "GRU", "XXX"])
+    assert get_iatas(airports) == ["GRU", "STM"]
+
+
+def test_find_airports_filters_by_bounding_box(airport_repository: AirportRepository):
+    airports = airport_repository.find_airports(bounding_box=(-24, -48, -22, -46))
+    assert get_iatas(airports) == ["CGH", "GRU", "VCP"]
+
+
+def test_find_airports_paginates_by_iata(airport_repository: AirportRepository):
+    first_page = airport_repository.find_airports(limit=3)
+    second_page = airport_repository.find_airports(after="CGH", limit=3)
+    last_page = airport_repository.find_airports(after="SSA", limit=3)
+    assert get_iatas(first_page) == ["BSB", "CGH", "GIG"]
+    assert get_iatas(second_page) == ["GIG", "GRU", "SSA"]
+    assert get_iatas(last_page) == ["STM", "VCP"]
+
+
+def test_find_airports_combines_filters(airport_repository: AirportRepository):
+    airports = airport_repository.find_airports(state="SP", after="CGH", limit=1)
+    assert get_iatas(airports) == ["GRU"]
+
+
+@pytest.mark.parametrize(
+    "filters, index",
+    [
+        ({"state": "SP", "after": "CGH"}, "airport_state_iata_idx"),
+        ({"city_prefix": "são"}, "airport_city_search_idx"),
+        ({"bounding_box": (-24, -48, -22, -46)}, "airport_lat_lon_idx"),
+        ({"iatas": ["GRU", "STM"]}, "airport_airport_iata_id"),
+        ({"after": "GRU"}, "airport_airport_iata_id"),
+    ],
+)
+def test_find_airports_queries_use_an_index(
+    airport_repository: AirportRepository, filters: dict, index: str
+):
+    plan = airport_repository.filter_airports(**filters)[:50].explain()
+    assert f"USING INDEX {index}" in plan
+    assert "SCAN airport_airport" not in plan
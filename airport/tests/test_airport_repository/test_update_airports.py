@@ -0,0 +1,84 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from airport.models import Airport, Iata
+from airport.repository.airport_repository import AirportRepository
+from airport.repository.iata_repository import IataRepository
+
+
+pytestmark = pytest.mark.usefixtures("db")
+
+
+@pytest.fixture
+def airport_repository() -> AirportRepository:
+    return AirportRepository(IataRepository())
+
+
+def build_airports(count: int) -> list[dict]:
+    return [
+        {
+            "iata": f"A{i:02}",
+            "city": f"City {i}",
+            "latitude": -20.0 + i,
+            "longitude": -45.0 - i,
+            "state": "SP",
+        }
+        for i in range(count)
+    ]
+
+
+def test_update_airports_creates_all_airports(airport_repository: AirportRepository):
+    result = airport_repository.update_airports(build_airports(30))
+    assert (result["created"], result["updated"], result["deleted"]) == (30, 0, 0)
+    assert Airport.objects.count() == 30
+    assert Iata.objects.count() == 30
+
+
+def test_update_airports_applies_only_the_diff(airport_repository: AirportRepository):
+    airports = build_airports(4)
+    airport_repository.update_airports(airports)
+
+    airports[0]["city"] = "New city"
+    removed = airports.pop(1)
+    airports.append({**removed, "iata": "NEW"})
+    result = airport_repository.update_airports(airports)
+
+    assert result["created"] == 1
+    assert result["updated"] == 1
+    assert result["deleted"] == 1
+    assert result["unchanged"] == 2
+    assert Airport.objects.get(iata="A00").city == "New city"
+    assert not Iata.objects.filter(iata_code=removed["iata"]).exists()
+    assert set(result["timings"]) == {"load", "diff", "write"}
+
+
+def test_update_airports_uses_a_constant_number_of_queries(
+    airport_repository: AirportRepository,
+):
+    with CaptureQueriesContext(connection) as queries:
+        airport_repository.update_airports(build_airports(50))
+    airport_queries = [
+        query
+        for query in queries
+        if "airport_airport" in query["sql"] or "airport_iata" in query["sql"]
+    ]
+    assert len(airport_queries) == 3  # Load, create iatas and create airports
+
+
+def test_unchanged_airports_are_not_written(airport_repository: AirportRepository):
+    airport_repository.update_airports(build_airports(10))
+    version = airport_repository.get_version()
+
+    with CaptureQueriesContext(connection) as queries:
+        result = airport_repository.update_airports(build_airports(10))
+    assert result["unchanged"] == 10
+    assert len(queries) == 1  # Only loading the existing airports
+    assert airport_repository.get_version() == version
@@ -0,0 +1,57 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+from django.conf import settings
+
+import airport.views
+import flight.views
+from airport.repository.airports_version import (
+    AirportsVersionWatcher,
+    VersionedAirportsData,
+    airports_version_watcher,
+)
+from airport.tests.conftest import FakeAirportRepository
+
+
+def test_interval_defaults_to_the_airports_cache_setting():
+    watcher = AirportsVersionWatcher(FakeAirportRepository())
+    assert watcher.refresh_interval == settings.AIRPORT_CACHE_VERSION_INTERVAL
+
+
+def test_version_is_read_once_within_refresh_interval():
+    airport_repository = FakeAirportRepository()
+    watcher = AirportsVersionWatcher(airport_repository, refresh_interval=60)
+    watcher.get_version()
+    airport_repository.version = 2
+    assert watcher.get_version() == 1
+    assert airport_repository.version_reads == 1
+
+    watcher.expire()
+    assert watcher.get_version() == 2
+
+
+def test_data_is_built_once_per_version():
+    airport_repository = FakeAirportRepository()
+    builds = []
+    data = VersionedAirportsData(
+        airport_repository, lambda version: builds.append(version) or version, 0
+    )
+    assert data.get() == 1
+    assert data.get() == 1
+    airport_repository.version = 2
+    assert data.get() == 2
+    assert builds == [1, 2]
+
+
+def test_in_process_airports_share_one_watcher():
+    watchers = {
+        airport.views.airport_cache_repository.version_watcher,
+        airport.views.nearby_airports_service.index.watcher,
+        flight.views.iata_index_repository.iata_codes.watcher,
+        flight.views.airport_distance_service.coordinates.watcher,
+    }
+    assert watchers == {airports_version_watcher}
@@ -0,0 +1,67 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import pytest
+
+from airport.service.distance_service import AirportDistanceService
+from airport.tests.conftest import COORDINATES, FakeAirportRepository
+from flight.utils.haversine_formula import haversine_distance
+
+
+@pytest.fixture
+def distance_service(airport_repository) -> AirportDistanceService:
+    return AirportDistanceService(airport_repository, refresh_interval=0)
+
+
+def test_distance_is_the_great_circle_distance(
+    distance_service: AirportDistanceService,
+):
+    expected = haversine_distance(-23.425669, -46.481926, -2.424886, -54.78639)
+    assert distance_service.get_distance("GRU", "STM") == expected
+
+
+def test_distance_is_memoized_for_both_directions(
+    distance_service: AirportDistanceService,
+):
+    distance = distance_service.get_distance("GRU", "STM")
+    assert distance_service.get_distance("STM", "GRU") == distance
+    assert len(distance_service.distances) == 1
+
+
+def test_unknown_airport_has_no_distance(distance_service: AirportDistanceService):
+    assert distance_service.get_distance("GRU", "XXX") is None
+
+
+def test_memoized_distances_are_bounded(airport_repository: FakeAirportRepository):
+    distance_service = AirportDistanceService(airport_repository, max_size=2)
+    distance_service.get_distance("GRU", "STM")
+    distance_service.get_distance("GRU", "BSB")
+    distance_service.get_distance("STM", "BSB")
+    assert list(distance_service.distances) == [("BSB", "GRU"), ("BSB", "STM")]
+
+
+def test_coordinates_are_reloaded_when_airports_version_changes(
+    distance_service: AirportDistanceService,
+    airport_repository: FakeAirportRepository,
+):
+    distance_service.get_distance("GRU", "STM")
+    distance_service.get_distance("GRU", "STM")
+    assert airport_repository.loads == 1
+
+    airport_repository.coordinates["STM"] = (0.0, 0.0)
+    airport_repository.version = 2
+    expected = haversine_distance(-23.425669, -46.481926, 0.0, 0.0)
+    assert distance_service.get_distance("GRU", "STM") == expected
+    assert airport_repository.loads == 2
+
+
+def test_distances_from_airport_to_all_airports(
+    distance_service: AirportDistanceService,
+):
+    distances = distance_service.get_distances_from("GRU")
+    assert set(distances) == set(COORDINATES) - {"GRU"}
+    assert distances["STM"] == distance_service.get_distance("GRU", "STM")
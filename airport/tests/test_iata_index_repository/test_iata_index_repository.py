@@ -0,0 +1,58 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import pytest
+
+from airport.repository.iata_index_repository import IataIndexRepository
+
+
+class FakeIataRepository:
+    def __init__(self):
+        self.loads = 0
+        self.iata_codes = {"GRU", "STM"}
+
+    def get_iata_codes(self) -> frozenset[str]:
+        self.loads += 1
+        return frozenset(self.iata_codes)
+
+
+@pytest.fixture
+def iata_repository() -> FakeIataRepository:
+    return FakeIataRepository()
+
+
+def test_get_iata_has_the_serializer_shape(iata_repository, airport_repository):
+    repository = IataIndexRepository(iata_repository, airport_repository)
+    assert repository.get_iata("GRU") == {"iata_code": "GRU"}
+    assert repository.get_iata("XXX") == {"iata_code": ""}
+
+
+def test_index_is_loaded_once_within_refresh_interval(
+    iata_repository, airport_repository
+):
+    repository = IataIndexRepository(
+        iata_repository, airport_repository, refresh_interval=60
+    )
+    for _ in range(10):
+        repository.get_iata("GRU")
+    assert iata_repository.loads == 1
+    assert airport_repository.version_reads == 1
+
+
+def test_index_is_swapped_when_airports_version_changes(
+    iata_repository, airport_repository
+):
+    repository = IataIndexRepository(
+        iata_repository, airport_repository, refresh_interval=0
+    )
+    assert repository.get_iata("BSB") == {"iata_code": ""}
+
+    iata_repository.iata_codes.add("BSB")
+    assert repository.get_iata("BSB") == {"iata_code": ""}  # Same version
+    airport_repository.version = 2
+    assert repository.get_iata("BSB") == {"iata_code": "BSB"}
+    assert iata_repository.loads == 2
@@ -0,0 +1,103 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import pytest
+import random
+
+from airport.service.airport_service import ValidationException
+from airport.service.nearby_airports_service import (
+    AirportNotFoundException,
+    NearbyAirportsService,
+)
+from airport.utils.spatial_index import SpatialIndex
+from flight.utils.haversine_formula import haversine_distance
+
+
+@pytest.fixture
+def nearby_service(airport_repository) -> NearbyAirportsService:
+    return NearbyAirportsService(airport_repository, refresh_interval=0)
+
+
+@pytest.fixture
+def world_coordinates() -> dict[str, tuple[float, float]]:
+    rng = random.Random(7)
+    coordinates = {
+        f"A{i:04}": (rng.uniform(-90, 90), rng.uniform(-180, 180)) for i in range(3000)
+    }
+    # Points across the antimeridian and next to the poles
+    coordinates.update({"E180": (0, 179.9), "W180": (0, -179.9), "POLE": (89.9, 0)})
+    return coordinates
+
+
+def brute_force(coordinates: dict, latitude: float, longitude: float) -> list:
+    return sorted(
+        (haversine_distance(latitude, longitude, *point), key)
+        for key, point in coordinates.items()
+    )
+
+
+def test_nearest_matches_a_full_scan(world_coordinates: dict):
+    index = SpatialIndex(world_coordinates)
+    rng = random.Random(11)
+    for latitude, longitude in [(0, 180), (90, 0), (-90, 45)] + [
+        (rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(50)
+    ]:
+        expected = brute_force(world_coordinates, latitude, longitude)[:10]
+        nearest = index.nearest(latitude, longitude, 10)
+        assert [key for key, _ in nearest] == [key for _, key in expected]
+        assert [d for _, d in nearest] == pytest.approx([d for d, _ in expected])
+
+
+def test_within_matches_a_full_scan(world_coordinates: dict):
+    index = SpatialIndex(world_coordinates)
+    rng = random.Random(13)
+    for _ in range(50):
+        latitude, longitude = rng.uniform(-90, 90), rng.uniform(-180, 180)
+        radius = rng.uniform(100, 2000)
+        expected = [
+            key
+            for distance, key in brute_force(world_coordinates, latitude, longitude)
+            if distance <= radius
+        ]
+        assert [key for key, _ in index.within(latitude, longitude, radius)] == (
+            expected
+        )
+
+
+def test_nearest_to_airport_excludes_the_airport(nearby_service):
+    nearest = nearby_service.get_nearest_to_airport("GRU", 2)
+    assert [iata for iata, _ in nearest] == ["CGH", "VCP"]
+
+
+def test_within_airport_returns_the_airports_in_the_radius(nearby_service):
+    within = nearby_service.get_within_airport("GRU", 500)
+    assert [iata for iata, _ in within] == ["CGH", "VCP", "GIG"]
+    assert within[0][1] == haversine_distance(-23.425669, -46.481926, -23.627, -46.655)
+
+
+def test_unknown_airport_raises_exception(nearby_service):
+    with pytest.raises(AirportNotFoundException):
+        nearby_service.get_nearest_to_airport("XXX", 3)
+
+
+@pytest.mark.parametrize("k", [0, 101])
+def test_invalid_k_raises_exception(nearby_service, k: int):
+    with pytest.raises(ValidationException):
+        nearby_service.get_nearest(-23.4, -46.4, k)
+
+
+def test_index_is_rebuilt_when_airports_version_changes(
+    nearby_service, airport_repository
+):
+    nearby_service.get_nearest(-23.4, -46.4, 1)
+    nearby_service.get_nearest(-23.4, -46.4, 1)
+    assert airport_repository.loads == 1
+
+    airport_repository.coordinates["NEW"] = (-23.4, -46.4)
+    airport_repository.version = 2
+    assert nearby_service.get_nearest(-23.4, -46.4, 1) == [("NEW", 0.0)]
+    assert airport_repository.loads == 2
@@ -0,0 +1,125 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import gzip
+import json
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from airport import views
+from airport.repository.airport_cache_repository import AirportCacheRepository
+from airport.tests.conftest import FakeAirportRepository
+
+AIRPORTS = [
+    {"iata": "GRU", "city": "São Paulo", "state": "SP"},
+    {"iata": "STM", "city": "Santarem", "state": "PA"},
+]
+
+
+class FilteringAirportRepository(FakeAirportRepository):
+    def __init__(self):
+        super().__init__(AIRPORTS)
+        self.version = 1_691_700_000_000_000_000
+
+    def find_airports(self, state, city_prefix, iatas, bounding_box, after, limit):
+        self.filters = {"state": state, "iatas": iatas, "bounding_box": bounding_box}
+        airports = [airport for airport in AIRPORTS if airport["iata"] > (after or "")]
+        return airports[:limit]
+
+
+@pytest.fixture
+def airport_repository(monkeypatch) -> FilteringAirportRepository:
+    airport_repository = FilteringAirportRepository()
+    cache = LocMemCache("airport-list-view-test", {})
+    cache.clear()
+    monkeypatch.setattr(
+        views,
+        "airport_cache_repository",
+        AirportCacheRepository(airport_repository, cache=cache),
+    )
+    return airport_repository
+
+
+def get(query: str = "", **headers):
+    request = APIRequestFactory().get(f"/airport/list{query}", **headers)
+    force_authenticate(request, user=User(username="john_doe"))
+    return views.AirportListView.as_view()(request)
+
+
+def test_airport_list_sends_the_rendered_airports(airport_repository):
+    response = get()
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/json"
+    assert json.loads(response.content) == AIRPORTS
+    assert response["ETag"].startswith('"')
+    assert response["Last-Modified"] == "Thu, 10 Aug 2023 20:40:00 GMT"
+
+
+def test_airport_list_is_gzipped_when_accepted(airport_repository):
+    response = get(HTTP_ACCEPT_ENCODING="gzip, deflate")
+    assert response["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.content)) == AIRPORTS
+    assert response["ETag"] != get()["ETag"]
+    assert "Accept-Encoding" in response["Vary"]
+
+
+def test_airport_list_answers_not_modified_for_the_same_etag(airport_repository):
+    etag = get()["ETag"]
+    response = get(HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response["ETag"] == etag
+
+
+def test_airport_list_answers_not_modified_since_the_last_update(airport_repository):
+    last_modified = get()["Last-Modified"]
+    response = get(HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 304
+
+
+def test_airport_list_is_rendered_once_per_version(airport_repository):
+    etag = get()["ETag"]
+    for _ in range(5):
+        assert get()["ETag"] == etag
+    assert airport_repository.loads == 1
+
+
+def test_airport_list_requires_token():
+    request = APIRequestFactory().get("/airport/list")
+    response = views.AirportListView.as_view()(request)
+    assert response.status_code == 401
+
+
+def test_airport_list_passes_the_filters(airport_repository):
+    response = get("?state=sp&iata=gru,stm&bbox=-30,-60,-1,-40")
+    assert response.status_code == 200
+    assert airport_repository.filters == {
+        "state": "SP",
+        "iatas": ["GRU", "STM"],
+        "bounding_box": (-30.0, -60.0, -1.0, -40.0),
+    }
+
+
+def test_airport_list_links_the_next_page(airport_repository):
+    response = get("?limit=1")
+    assert [airport["iata"] for airport in response.data] == ["GRU"]
+    assert response["Link"] == (
+        '<http://testserver/airport/list?after=GRU&limit=1>; rel="next"'
+    )
+
+    response = get("?limit=1&after=STM")
+    assert response.data == []
+    assert "Link" not in response
+
+
+@pytest.mark.parametrize("query", ["?bbox=1,2,3", "?bbox=0,0,-1,-1", "?limit=0"])
+def test_airport_list_rejects_invalid_filters(airport_repository, query: str):
+    response = get(query)
+    assert response.status_code == 400
+    assert "error" in response.data
@@ -0,0 +1,50 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from airport import views
+from airport.service.nearby_airports_service import NearbyAirportsService
+from airport.tests.conftest import FakeAirportRepository
+
+
+@pytest.fixture(autouse=True)
+def nearby_service(monkeypatch):
+    monkeypatch.setattr(
+        views,
+        "nearby_airports_service",
+        NearbyAirportsService(FakeAirportRepository()),
+    )
+
+
+def get(query: str):
+    request = APIRequestFactory().get(f"/airport/nearby{query}")
+    force_authenticate(request, user=User(username="john_doe"))
+    return views.NearbyAirportsView.as_view()(request)
+
+
+def test_nearby_airports_of_an_airport():
+    response = get("?iata=gru&k=2")
+    assert response.status_code == 200
+    assert [airport["iata"] for airport in response.data] == ["CGH", "VCP"]
+    assert response.data[0]["distance"] == 28.5
+
+
+def test_nearby_airports_of_a_point_within_a_radius():
+    response = get("?lat=-23.5&lon=-46.6&radius=100")
+    assert [airport["iata"] for airport in response.data] == ["GRU", "CGH", "VCP"]
+
+
+def test_nearby_airports_of_an_unknown_airport():
+    assert get("?iata=XXX").status_code == 404
+
+
+@pytest.mark.parametrize("query", ["", "?lat=-23.5", "?iata=GRU&k=0", "?lat=a&lon=1"])
+def test_nearby_airports_rejects_invalid_parameters(query: str):
+    assert get(query).status_code == 400
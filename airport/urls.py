@@ -1,6 +1,7 @@
 from django.urls import path, include
-from airport.views import AirportListView
+from airport.views import AirportListView, NearbyAirportsView
 
 urlpatterns = [
     path("list", AirportListView.as_view()),
+    path("nearby", NearbyAirportsView.as_view()),
 ]
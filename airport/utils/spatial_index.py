@@ -0,0 +1,148 @@
+from heapq import heappush, heappushpop
+import math
+
+from flight.utils.haversine_formula import haversine_distance
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def to_unit_vector(latitude: float, longitude: float) -> tuple[float, float, float]:
+    latitude, longitude = math.radians(latitude), math.radians(longitude)
+    return (
+        math.cos(latitude) * math.cos(longitude),
+        math.cos(latitude) * math.sin(longitude),
+        math.sin(latitude),
+    )
+
+
+class SpatialIndex:
+    """This class is used to find the places closest to a coordinate with a KD-tree.
+
+    The tree holds the 3D positions of the places on the unit sphere. The straight-line
+    distance between two of these positions grows with their great-circle distance, so
+    the nearest positions in 3D are also the nearest on the Earth surface.
+    """
+
+    LEAF_SIZE = 8
+
+    def __init__(self, coordinates: dict[str, tuple[float, float]]):
+        self.coordinates = coordinates
+        self.keys = list(coordinates)
+        self.points = [to_unit_vector(*coordinates[key]) for key in self.keys]
+        self.root = self.build(list(range(len(self.keys)))) if self.keys else None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def build(self, indices: list[int]) -> tuple:
+        """Method used to build a node: (axis, split, left, right), or (-1, 0, indices, None) for a leaf"""
+        if len(indices) <= self.LEAF_SIZE:
+            return (-1, 0.0, indices, None)
+        # Splits on the axis where the points are most spread out
+        axis = max(
+            range(3),
+            key=lambda a: max(self.points[i][a] for i in indices)
+            - min(self.points[i][a] for i in indices),
+        )
+        indices.sort(key=lambda i: self.points[i][axis])
+        middle = len(indices) // 2
+        return (
+            axis,
+            self.points[indices[middle]][axis],
+            self.build(indices[:middle]),
+            self.build(indices[middle:]),
+        )
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int,
+        exclude: str | None = None,
+    ) -> list[tuple[str, float]]:
+        """Returns the k closest (key, distance in km), closest first"""
+        if self.root is None or k <= 0:
+            return []
+        point = to_unit_vector(latitude, longitude)
+        heap = []  # Max-heap of (-squared chord, index) of the k closest so far
+        self.search_nearest(self.root, point, k, heap, exclude)
+        indices = [i for _, i in sorted(heap, reverse=True)]
+        return self.with_distances(latitude, longitude, indices)
+
+    def within(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float,
+        exclude: str | None = None,
+    ) -> list[tuple[str, float]]:
+        """Returns every (key, distance in km) up to `radius` km away, closest first"""
+        if self.root is None or radius < 0:
+            return []
+        point = to_unit_vector(latitude, longitude)
+        # Chord between two points `radius` km apart along the surface
+        chord = 2 * math.sin(min(radius / EARTH_RADIUS_KM, math.pi) / 2)
+        found = []
+        self.search_within(self.root, point, chord * chord, found, exclude)
+        found.sort()
+        return self.with_distances(latitude, longitude, [i for _, i in found])
+
+    def search_nearest(
+        self, node: tuple, point: tuple, k: int, heap: list, exclude: str | None
+    ) -> None:
+        axis, split, left, right = node
+        if axis < 0:
+            for i in left:
+                if self.keys[i] == exclude:
+                    continue
+                distance = self.squared_distance(point, self.points[i])
+                if len(heap) < k:
+                    heappush(heap, (-distance, i))
+                elif distance < -heap[0][0]:
+                    heappushpop(heap, (-distance, i))
+            return
+
+        difference = point[axis] - split
+        near, far = (left, right) if difference < 0 else (right, left)
+        self.search_nearest(near, point, k, heap, exclude)
+        # The other side can only hold closer points if the split plane is closer
+        if len(heap) < k or difference * difference < -heap[0][0]:
+            self.search_nearest(far, point, k, heap, exclude)
+
+    def search_within(
+        self,
+        node: tuple,
+        point: tuple,
+        squared_chord: float,
+        found: list,
+        exclude: str | None,
+    ) -> None:
+        axis, split, left, right = node
+        if axis < 0:
+            for i in left:
+                distance = self.squared_distance(point, self.points[i])
+                if distance <= squared_chord and self.keys[i] != exclude:
+                    found.append((distance, i))
+            return
+
+        difference = point[axis] - split
+        if difference < 0 or difference * difference <= squared_chord:
+            self.search_within(left, point, squared_chord, found, exclude)
+        if difference >= 0 or difference * difference <= squared_chord:
+            self.search_within(right, point, squared_chord, found, exclude)
+
+    def squared_distance(self, a: tuple, b: tuple) -> float:
+        return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+    def with_distances(
+        self, latitude: float, longitude: float, indices: list[int]
+    ) -> list[tuple[str, float]]:
+        return [
+            (
+                self.keys[i],
+                haversine_distance(
+                    latitude, longitude, *self.coordinates[self.keys[i]]
+                ),
+            )
+            for i in indices
+        ]
@@ -1,19 +1,232 @@
-from rest_framework.authentication import TokenAuthentication
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date
+import re
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.generics import ListAPIView
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
-from airport.service.airport_service import AirportService
+from airport.service.airport_service import AirportService, ValidationException
+from airport.service.nearby_airports_service import (
+    AirportNotFoundException,
+    NearbyAirportsService,
+)
+from airport.repository.airport_cache_repository import AirportCacheRepository
 from airport.repository.airport_repository import AirportRepository
+from airport.repository.airports_version import airports_version_watcher
 from airport.repository.iata_repository import IataRepository
+from flightservice.metrics import metrics
+from flightservice.profiling import profiled
+from user.authentication import CachedTokenAuthentication
+
+# Shared by every request, so the in-process airports list outlives each of them
+airport_cache_repository = AirportCacheRepository(
+    AirportRepository(IataRepository()),
+    ttl=settings.AIRPORT_CACHE_TTL,
+    early_refresh=settings.AIRPORT_CACHE_EARLY_REFRESH,
+    version_watcher=airports_version_watcher,
+)
+nearby_airports_service = NearbyAirportsService(
+    AirportRepository(IataRepository()),
+    version_watcher=airports_version_watcher,
+)
+
+
+def collect_airport_cache_metrics() -> list:
+    stats = airport_cache_repository.stats()
+    return [
+        (
+            "cache_requests_total",
+            "counter",
+            "Requests to the in-process caches, by result",
+            [
+                ({"cache": "airports", "result": result}, stats[key])
+                for result, key in (
+                    ("hit", "hits"),
+                    ("shared_hit", "shared_hits"),
+                    ("miss", "misses"),
+                )
+            ],
+        )
+    ]
+
+
+metrics.register_collector(collect_airport_cache_metrics)
+
+re_accepts_gzip = re.compile(r"\bgzip\b")
+
+FILTER_QUERY_PARAMS = ("state", "city", "iata", "bbox", "after", "limit")
+DEFAULT_NEARBY_K = 5
+
+
+def get_list_query_param(query_params, name: str) -> list[str] | None:
+    value = query_params.get(name)
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def get_bounding_box_query_param(
+    query_params, name: str
+) -> tuple[float, float, float, float] | None:
+    values = get_list_query_param(query_params, name)
+    if values is None:
+        return None
+    try:
+        bounding_box = tuple(float(value) for value in values)
+    except ValueError:
+        bounding_box = ()
+    if len(bounding_box) != 4:
+        raise ValidationException(
+            f"'{name}' must be min_latitude,min_longitude,max_latitude,max_longitude"
+        )
+    return bounding_box
+
+
+def get_float_query_param(query_params, name: str) -> float | None:
+    value = query_params.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValidationException(f"'{name}' must be a number")
+
+
+def get_int_query_param(query_params, name: str) -> int | None:
+    value = query_params.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationException(f"'{name}' must be an integer")
 
 
 class AirportListView(ListAPIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @profiled("airport_list")
     def list(self, request, *args, **kwargs):
-        airport_repository = AirportRepository(IataRepository())
-        airport_service = AirportService(airport_repository)
-        airports = airport_service.get_airports()
-        return Response(data=airports, status=200)
+        airport_service = AirportService(airport_cache_repository)
+        if any(name in request.query_params for name in FILTER_QUERY_PARAMS):
+            return self.list_filtered(request, airport_service)
+
+        airports = airport_service.get_rendered_airports()
+
+        # The body is rendered once per airports version, so requests only copy bytes
+        gzipped = bool(
+            re_accepts_gzip.search(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        )
+        # Each encoding is a different representation, so it gets its own strong ETag
+        etag = f'{airports.etag[:-1]}-gzip"' if gzipped else airports.etag
+        last_modified = int(airports.last_modified)
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = HttpResponse(
+                airports.gzip_body if gzipped else airports.body,
+                content_type="application/json",
+            )
+            if gzipped:
+                response.headers["Content-Encoding"] = "gzip"
+        response.headers["ETag"] = etag
+        response.headers["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+    def list_filtered(self, request, airport_service: AirportService):
+        query_params = request.query_params
+        try:
+            limit = get_int_query_param(query_params, "limit")
+            airports = airport_service.find_airports(
+                state=query_params.get("state"),
+                city_prefix=query_params.get("city"),
+                iatas=get_list_query_param(query_params, "iata"),
+                bounding_box=get_bounding_box_query_param(query_params, "bbox"),
+                after=query_params.get("after"),
+                limit=limit,
+            )
+        except ValidationException as error:
+            return Response({"error": str(error)}, 400)
+
+        response = Response(airports, 200)
+        if limit is not None and len(airports) == limit:
+            # Keyset pagination, the next page starts after the last iata of this one
+            next_url = replace_query_param(
+                request.build_absolute_uri(), "after", airports[-1]["iata"]
+            )
+            response.headers["Link"] = f'<{next_url}>; rel="next"'
+        return response
+
+
+def find_nearby_airport(
+    iata: str, k: int | None, radius: float | None
+) -> list[tuple[str, float]]:
+    if radius is None:
+        return nearby_airports_service.get_nearest_to_airport(
+            iata, k or DEFAULT_NEARBY_K
+        )
+    return nearby_airports_service.get_within_airport(iata, radius)[:k]
+
+
+def find_nearby_point(
+    latitude: float | None,
+    longitude: float | None,
+    k: int | None,
+    radius: float | None,
+) -> list[tuple[str, float]]:
+    if latitude is None or longitude is None:
+        raise ValidationException("Send 'iata' or both 'lat' and 'lon'")
+    if radius is None:
+        return nearby_airports_service.get_nearest(
+            latitude, longitude, k or DEFAULT_NEARBY_K
+        )
+    return nearby_airports_service.get_within(latitude, longitude, radius)[:k]
+
+
+class NearbyAirportsView(ListAPIView):
+    """Nearest airports to a point (lat, lon) or to an airport (iata), up to k of them or within a radius (km)"""
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request, *args, **kwargs):
+        query_params = request.query_params
+        iata = query_params.get("iata")
+        try:
+            k = get_int_query_param(query_params, "k")
+            radius = get_float_query_param(query_params, "radius")
+            if k is not None:
+                nearby_airports_service.validate_k(k)
+            if iata is not None:
+                nearby = find_nearby_airport(iata.upper(), k, radius)
+            else:
+                nearby = find_nearby_point(
+                    get_float_query_param(query_params, "lat"),
+                    get_float_query_param(query_params, "lon"),
+                    k,
+                    radius,
+                )
+        except ValidationException as error:
+            return Response({"error": str(error)}, 400)
+        except AirportNotFoundException as error:
+            return Response({"error": str(error)}, 404)
+
+        return Response(
+            [
+                {"iata": nearby_iata, "distance": round(distance, 2)}
+                for nearby_iata, distance in nearby
+            ],
+            200,
+        )
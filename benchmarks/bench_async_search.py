@@ -0,0 +1,96 @@
+"""Throughput of concurrent flight searches on the sync (threads) and async (event loop) paths.
+
+Both paths search against a local stub answering every leg after a fixed delay.
+
+Usage: python benchmarks/bench_async_search.py [--requests 200] [--delay 0.2] [--threads 16]
+"""
+
+import django
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import argparse
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flight.service import mock_airlines
+from flight.service.mock_airlines import MockAirlinesIncService
+from flight.external.mock_airlines_inc_api import MockAirlineAPIConnector
+from flightservice.http_session import aclose_async_http_client
+from upstream_stub import build_server
+
+
+class FakeIataRepository:
+    def get_iata(self, iata: str) -> dict:
+        return {"iata_code": iata}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.2)
+    parser.add_argument("--threads", type=int, default=16, help="sync worker threads")
+    args = parser.parse_args()
+
+    # Each sync search holds two leg threads, as sized by FLIGHT_LEGS_POOL_SIZE
+    mock_airlines.legs_executor = ThreadPoolExecutor(
+        max_workers=2 * args.threads, thread_name_prefix="flight-leg"
+    )
+    server = build_server(options=10, latency_ms=args.delay * 1000, airports=26 * 26)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    connector = MockAirlineAPIConnector()
+    connector.base_url = f"http://127.0.0.1:{server.server_port}"
+    service = MockAirlinesIncService(connector, FakeIataRepository())
+    departure_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+    return_date = (datetime.now() + timedelta(days=5)).strftime("%Y-%m-%d")
+    airports = [f"Z{i // 26 % 26 + 65:c}{i % 26 + 65:c}" for i in range(26 * 20)]
+    routes = [
+        (airports[i % 520], airports[(i + 1) % 520]) for i in range(args.requests)
+    ]
+
+    def sync_search(route):
+        return service.search_flights(route[0], route[1], departure_date, return_date)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as workers:
+        list(workers.map(sync_search, routes))
+    sync_elapsed = time.perf_counter() - start
+
+    async def async_searches():
+        try:
+            return await asyncio.gather(
+                *[
+                    service.aiter_flight_combinations(
+                        route[0], route[1], departure_date, return_date
+                    )
+                    for route in routes
+                ]
+            )
+        finally:
+            await aclose_async_http_client()
+
+    start = time.perf_counter()
+    asyncio.run(async_searches())
+    async_elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    print(f"{args.requests} searches, {args.delay}s upstream delay per leg")
+    print(
+        f"sync  ({args.threads} threads): {sync_elapsed:.2f}s, {args.requests / sync_elapsed:.1f} searches/s"
+    )
+    print(
+        f"async (1 event loop): {async_elapsed:.2f}s, {args.requests / async_elapsed:.1f} searches/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
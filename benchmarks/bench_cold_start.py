@@ -0,0 +1,112 @@
+"""Cold start of the flight service: time until it answers, and latency of the first requests.
+
+Starts the server command against the upstream stub, polls it until it answers any HTTP
+request and then times the first /flight/consult and /airport/list requests. Each mode is run
+`--runs` times, with the warm start on and off. Import the stub airports first, for example:
+    python benchmarks/upstream_stub.py --port 8081
+    AIRPORT_API_URL=http://127.0.0.1:8081 python manage.py import_airports
+    python benchmarks/bench_cold_start.py --token <token> --command "gunicorn -c gunicorn.conf.py"
+"""
+
+import argparse
+import os
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+from upstream_stub import build_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_until_ready(client: httpx.Client, process: subprocess.Popen, timeout: float):
+    """Polls the server until it answers (a 404, no state is loaded), returns the seconds it took"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"The server exited with {process.returncode}")
+        try:
+            client.get("/")
+            return time.perf_counter() - start
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.01)
+    raise TimeoutError(f"The server did not answer in {timeout}s")
+
+
+def time_request(client: httpx.Client, path: str) -> float:
+    start = time.perf_counter()
+    response = client.get(path)
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+def run_once(args, stub_url: str, warm_start: bool) -> tuple[float, float, float]:
+    """Starts the server and returns its ready time and first search and airports latencies"""
+    env = dict(
+        os.environ,
+        SERVER_BIND=f"127.0.0.1:{args.port}",
+        WARM_START=str(warm_start).lower(),
+        AIRLINE_API_URL=stub_url,
+        AIRPORT_API_URL=stub_url,
+    )
+    departure = datetime.now() + timedelta(days=1)
+    search_path = (
+        f"/flight/consult/{args.origin}/{args.destination}/"
+        f"{departure:%Y-%m-%d}/{departure + timedelta(days=4):%Y-%m-%d}"
+    )
+    headers = {"Authorization": f"Token {args.token}"} if args.token else {}
+    process = subprocess.Popen(
+        shlex.split(args.command),
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(
+            base_url=f"http://127.0.0.1:{args.port}", headers=headers, timeout=60
+        ) as client:
+            ready = wait_until_ready(client, process, args.timeout)
+            search = time_request(client, search_path)
+            airports = time_request(client, "/airport/list")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return ready, search, airports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--command", default="gunicorn -c gunicorn.conf.py")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--token", default="", help="API token of a user")
+    parser.add_argument("--origin", default="GRU")
+    parser.add_argument("--destination", default="STM")
+    parser.add_argument("--latency", type=float, default=150, help="stub latency, ms")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=60, help="seconds")
+    args = parser.parse_args()
+
+    server = build_server(options=20, latency_ms=args.latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub_url = f"http://127.0.0.1:{server.server_port}"
+
+    print(f"{args.command}, stub latency {args.latency:.0f}ms", file=sys.stderr)
+    for warm_start in (False, True):
+        runs = [run_once(args, stub_url, warm_start) for _ in range(args.runs)]
+        ready, search, airports = (min(values) for values in zip(*runs))
+        print(
+            f"warm start {'on' if warm_start else 'off'}: ready in {ready * 1000:.0f}ms, "
+            f"first search {search * 1000:.0f}ms, "
+            f"first airports list {airports * 1000:.0f}ms (best of {args.runs})"
+        )
+
+
+if __name__ == "__main__":
+    main()
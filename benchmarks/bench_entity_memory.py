@@ -0,0 +1,66 @@
+"""Memory benchmark of the flight combinations of a 200x200 search.
+
+Usage: python benchmarks/bench_entity_memory.py
+"""
+import django
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import random
+import tracemalloc
+
+from flight.entity.flight import Aircraft, Flight, Location, Meta, Option, Price, Summary
+from flight.service.mock_airlines import MockAirlinesIncService
+from flight.external.mock_airlines_inc_api import MockAirlineAPIConnector
+from airport.repository.iata_repository import IataRepository
+
+OPTIONS_PER_LEG = 200
+
+
+def build_flight(rng: random.Random, departure_date: str) -> Flight:
+    origin = Location("GRU", "São Paulo", -23.425669, -46.481926, "SP")
+    destination = Location("STM", "Santarem", -2.424886, -54.78639, "PA")
+    options = []
+    for _ in range(OPTIONS_PER_LEG):
+        fare = rng.uniform(100, 2000)
+        options.append(
+            Option(
+                departure_time=f"{departure_date}T10:00:00",
+                arrival_time=f"{departure_date}T13:00:00",
+                price=Price(fare, fare * 0.1, fare * 1.1),
+                aircraft=Aircraft("A 320", "Airbus"),
+                meta=Meta(2500.5, 833.5, fare / 2500.5),
+            )
+        )
+    return Flight(Summary(departure_date, "BRL", origin, destination), options)
+
+
+def main():
+    rng = random.Random(42)
+    service = MockAirlinesIncService(MockAirlineAPIConnector(), IataRepository())
+    outbound_flights = build_flight(rng, "2023-08-11")
+    return_flights = build_flight(rng, "2023-08-15")
+
+    tracemalloc.start()
+    combinations = list(
+        service.mount_flight_combination(outbound_flights, return_flights)
+    )
+    combinations_bytes, _ = tracemalloc.get_traced_memory()
+    serialized = [combination.to_dict() for combination in combinations]
+    total_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    count = len(serialized)
+    print(f"combinations: {count}")
+    print(f"bytes per combination (built): {combinations_bytes / count:.1f}")
+    print(f"bytes per combination (built + serialized): {total_bytes / count:.1f}")
+    print(f"peak: {peak_bytes / 1024 / 1024:.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
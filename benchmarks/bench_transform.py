@@ -0,0 +1,212 @@
+"""Microbenchmarks of the flight transformation hot path.
+
+Times transform_api_data, the legs sort, mount_flight_combination, search_flights and
+FlightCombination.to_dict on synthetic payloads of 10, 100 and 1000 options per leg,
+recording ops/sec and allocations. The results are compared to a JSON baseline and the
+cases slower than the threshold are reported as regressions (exit code 1).
+
+Usage:
+    python benchmarks/bench_transform.py                # compares with the baseline
+    python benchmarks/bench_transform.py --save         # stores a new baseline
+    python benchmarks/bench_transform.py --threshold 0.1 --sizes 10 100
+"""
+
+import django
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from itertools import islice
+
+from flight.service.mock_airlines import MockAirlinesIncService
+from flight.external.mock_airlines_inc_api import MockAirlineAPIConnector
+from upstream_stub import AIRPORTS, build_flights
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "bench_transform_baseline.json")
+SIZES = (10, 100, 1000)
+MAX_COMBINATIONS = 10_000  # The full grid of 1000 options per leg has 1M combinations
+PAGE_SIZE = 100
+
+
+class FakeIataRepository:
+    def get_iata(self, iata: str) -> dict:
+        return {"iata_code": iata if iata in AIRPORTS else ""}
+
+    def get_iata_codes(self) -> frozenset[str]:
+        return frozenset(AIRPORTS)
+
+
+class InMemoryAirlineAPIConnector(MockAirlineAPIConnector):
+    def __init__(self, payloads: dict) -> None:
+        super().__init__()
+        self.payloads = payloads
+
+    def get_flights(self, origin: str, destination: str, departure_date: str) -> dict:
+        return self.payloads[(origin, destination, departure_date)]
+
+
+def build_cases(size: int) -> dict:
+    """Returns the benchmarked functions for payloads of `size` options per leg"""
+    departure_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+    return_date = (datetime.now() + timedelta(days=5)).strftime("%Y-%m-%d")
+    outbound_data = build_flights(AIRPORTS, "GRU", "STM", departure_date, size)
+    return_data = build_flights(AIRPORTS, "STM", "GRU", return_date, size)
+    service = MockAirlinesIncService(
+        InMemoryAirlineAPIConnector(
+            {
+                ("GRU", "STM", departure_date): outbound_data,
+                ("STM", "GRU", return_date): return_data,
+            }
+        ),
+        FakeIataRepository(),
+    )
+    outbound_flight = service.transform_api_data(outbound_data)
+    return_flight = service.transform_api_data(return_data)
+    combinations = list(
+        islice(
+            service.mount_flight_combination(outbound_flight, return_flight),
+            MAX_COMBINATIONS,
+        )
+    )
+
+    return {
+        "transform_api_data": lambda: service.transform_api_data(outbound_data),
+        "sort_legs": lambda: (
+            sorted(outbound_flight.options, key=lambda o: o.price.total),
+            sorted(return_flight.options, key=lambda o: o.price.total),
+        ),
+        "mount_flight_combination": lambda: list(
+            islice(
+                service.mount_flight_combination(outbound_flight, return_flight),
+                MAX_COMBINATIONS,
+            )
+        ),
+        "search_flights": lambda: service.search_flights(
+            origin="GRU",
+            destination="STM",
+            departure_date=departure_date,
+            return_date=return_date,
+            limit=PAGE_SIZE,
+        ),
+        "to_dict": lambda: [combination.to_dict() for combination in combinations],
+    }
+
+
+def measure(function, min_time: float = 0.2, repeat: int = 5) -> dict:
+    """Returns the best ops/sec of `repeat` rounds and the allocations of one call"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeat:
+            break
+        loops *= 2
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = function()
+    after = tracemalloc.take_snapshot()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+
+    return {
+        "ops_per_sec": round(loops / best, 2),
+        "peak_bytes": peak_bytes,
+        "allocated_blocks": blocks,
+    }
+
+
+def run(sizes: list[int]) -> dict:
+    results = {}
+    for size in sizes:
+        for name, function in build_cases(size).items():
+            key = f"{name}[{size}]"
+            results[key] = measure(function)
+            print(
+                f"{key:<32} {results[key]['ops_per_sec']:>12.2f} ops/s "
+                f"{results[key]['peak_bytes'] / 1024:>10.1f} KiB peak "
+                f"{results[key]['allocated_blocks']:>8} blocks"
+            )
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Returns the cases whose ops/sec dropped more than `threshold` (0-1) below the baseline"""
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        expected = baseline[key]["ops_per_sec"]
+        change = result["ops_per_sec"] / expected - 1
+        if change < -threshold:
+            regressions.append(
+                f"{key}: {result['ops_per_sec']:.2f} ops/s, "
+                f"{change:+.1%} from the baseline {expected:.2f} ops/s"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="allowed slowdown (0-1)"
+    )
+    parser.add_argument("--save", action="store_true", help="store a new baseline")
+    args = parser.parse_args()
+
+    results = run(args.sizes)
+
+    if args.save:
+        with open(args.baseline, "w") as file:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "results": results,
+                },
+                file,
+                indent=2,
+            )
+            file.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --save to create it")
+        return
+    with open(args.baseline) as file:
+        baseline = json.load(file)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"Regressions beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""End-to-end load test of a running flight service.
+
+Sends requests at a fixed rate (open loop: a slow response does not delay the next
+request) to /flight/consult and /airport/list and reports throughput and latency
+percentiles. Start the upstream stub, import its airports and start the service first,
+for example:
+    python benchmarks/upstream_stub.py --port 8081 --latency 150 --distribution lognormal
+    AIRPORT_API_URL=http://127.0.0.1:8081 python manage.py import_airports
+    AIRLINE_API_URL=http://127.0.0.1:8081 AIRPORT_API_URL=http://127.0.0.1:8081 python manage.py runserver
+    python benchmarks/load_test.py --token <token> --rps 50 --duration 30
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+from upstream_stub import AIRPORTS
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Returns the `p` percentile (0-100) of `values`, by nearest rank"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def build_paths(count: int, airport_list_share: float, seed: int = 0) -> list[str]:
+    """Returns the request paths, mixing flight searches and airport lists"""
+    rng = random.Random(seed)
+    iatas = list(AIRPORTS)
+    today = datetime.now()
+    paths = []
+    for _ in range(count):
+        if rng.random() < airport_list_share:
+            paths.append("/airport/list")
+            continue
+        origin, destination = rng.sample(iatas, 2)
+        departure = today + timedelta(days=rng.randint(1, 60))
+        arrival = departure + timedelta(days=rng.randint(1, 14))
+        paths.append(
+            f"/flight/consult/{origin}/{destination}/"
+            f"{departure:%Y-%m-%d}/{arrival:%Y-%m-%d}"
+        )
+    return paths
+
+
+async def send(client: httpx.AsyncClient, path: str, results: list) -> None:
+    """Sends one request and records its endpoint, status and latency"""
+    endpoint = path.split("/")[1]
+    start = time.perf_counter()
+    try:
+        response = await client.get(path)
+        status = response.status_code
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    results.append((endpoint, status, time.perf_counter() - start))
+
+
+async def run(
+    base_url: str, token: str, rps: float, duration: float, paths: list[str]
+) -> tuple[list, float]:
+    """Sends the requests at `rps` and waits for all of them"""
+    headers = {"Authorization": f"Token {token}"} if token else {}
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=200)
+    results = []
+    async with httpx.AsyncClient(
+        base_url=base_url, headers=headers, limits=limits, timeout=60
+    ) as client:
+        tasks = []
+        start = time.perf_counter()
+        for i, path in enumerate(paths):
+            delay = start + i / rps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(client, path, results)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+def report(results: list, elapsed: float, duration: float) -> None:
+    """Prints throughput, status counts and latency percentiles per endpoint"""
+    print(f"{len(results)} requests in {elapsed:.1f}s ({duration:.0f}s of sending)")
+    for endpoint in sorted({r[0] for r in results}):
+        rows = [r for r in results if r[0] == endpoint]
+        ok = [latency for _, status, latency in rows if status == 200]
+        statuses = {}
+        for _, status, _ in rows:
+            statuses[status] = statuses.get(status, 0) + 1
+        print(
+            f"/{endpoint}: {len(ok) / elapsed:.1f} ok/s, statuses {statuses}, "
+            f"p50 {percentile(ok, 50) * 1000:.0f}ms, "
+            f"p95 {percentile(ok, 95) * 1000:.0f}ms, "
+            f"p99 {percentile(ok, 99) * 1000:.0f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--token", default="", help="API token of a user")
+    parser.add_argument("--rps", type=float, default=20, help="requests per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds")
+    parser.add_argument(
+        "--airport-share",
+        type=float,
+        default=0.2,
+        help="share of /airport/list requests (0-1)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = build_paths(int(args.rps * args.duration), args.airport_share, args.seed)
+    results, elapsed = asyncio.run(
+        run(args.url, args.token, args.rps, args.duration, paths)
+    )
+    report(results, elapsed, args.duration)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Local stand-in for the airline and airport APIs (stub.amopromo.com).
+
+Serves the same payload shapes as the real stub:
+    GET /air/search/<api_key>/<origin>/<destination>/<departure_date>
+    GET /air/airports/<api_key>
+
+Point the service to it with AIRLINE_API_URL and AIRPORT_API_URL, for example:
+    python benchmarks/upstream_stub.py --port 8081 --options 50 --latency 150
+    AIRLINE_API_URL=http://127.0.0.1:8081 AIRPORT_API_URL=http://127.0.0.1:8081 python manage.py runserver
+"""
+
+import argparse
+import json
+import random
+import time
+import zlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+AIRPORTS = {
+    "GRU": {"city": "São Paulo", "lat": -23.425669, "lon": -46.481926, "state": "SP"},
+    "CGH": {"city": "São Paulo", "lat": -23.627, "lon": -46.655, "state": "SP"},
+    "VCP": {"city": "Campinas", "lat": -23.0074, "lon": -47.1345, "state": "SP"},
+    "GIG": {"city": "Rio de Janeiro", "lat": -22.81, "lon": -43.2506, "state": "RJ"},
+    "SDU": {"city": "Rio de Janeiro", "lat": -22.9105, "lon": -43.1631, "state": "RJ"},
+    "BSB": {"city": "Brasília", "lat": -15.8697, "lon": -47.9208, "state": "DF"},
+    "CNF": {"city": "Belo Horizonte", "lat": -19.6244, "lon": -43.9719, "state": "MG"},
+    "SSA": {"city": "Salvador", "lat": -12.9086, "lon": -38.3225, "state": "BA"},
+    "REC": {"city": "Recife", "lat": -8.1265, "lon": -34.9236, "state": "PE"},
+    "FOR": {"city": "Fortaleza", "lat": -3.7763, "lon": -38.5326, "state": "CE"},
+    "POA": {"city": "Porto Alegre", "lat": -29.9939, "lon": -51.1711, "state": "RS"},
+    "CWB": {"city": "Curitiba", "lat": -25.5285, "lon": -49.1758, "state": "PR"},
+    "FLN": {"city": "Florianópolis", "lat": -27.6703, "lon": -48.5525, "state": "SC"},
+    "MAO": {"city": "Manaus", "lat": -3.0386, "lon": -60.0497, "state": "AM"},
+    "BEL": {"city": "Belém", "lat": -1.3792, "lon": -48.4763, "state": "PA"},
+    "STM": {"city": "Santarem", "lat": -2.424886, "lon": -54.78639, "state": "PA"},
+}
+
+AIRCRAFTS = [
+    {"model": "A 320", "manufacturer": "Airbus"},
+    {"model": "A 321", "manufacturer": "Airbus"},
+    {"model": "737-800", "manufacturer": "Boeing"},
+    {"model": "E195", "manufacturer": "Embraer"},
+]
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+class UpstreamStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # Accepts load test bursts
+
+
+def build_airports(count: int) -> dict:
+    """Returns the known airports, completed with synthetic ones up to `count`"""
+    airports = dict(list(AIRPORTS.items())[:count])
+    rng = random.Random(0)
+    i = 0
+    while len(airports) < count:
+        iata = f"Z{i // 26 % 26 + 65:c}{i % 26 + 65:c}"
+        airports[iata] = {
+            "city": f"City {iata}",
+            "lat": round(rng.uniform(-33, 5), 6),
+            "lon": round(rng.uniform(-73, -35), 6),
+            "state": "XX",
+        }
+        i += 1
+    return airports
+
+
+def build_flights(
+    airports: dict, origin: str, destination: str, departure_date: str, options: int
+) -> dict:
+    """Returns the search payload, the same for the same route and date"""
+    rng = random.Random(zlib.crc32(f"{origin}{destination}{departure_date}".encode()))
+    date = datetime.strptime(departure_date, "%Y-%m-%d")
+    flight_options = []
+    for _ in range(options):
+        departure = date + timedelta(minutes=rng.randrange(0, 22 * 60, 5))
+        arrival = departure + timedelta(minutes=rng.randrange(60, 6 * 60, 5))
+        flight_options.append(
+            {
+                "departure_time": departure.strftime("%Y-%m-%dT%H:%M:%S"),
+                "arrival_time": arrival.strftime("%Y-%m-%dT%H:%M:%S"),
+                "price": {
+                    "fare": round(rng.uniform(150, 3000), 2),
+                    "fees": 0,
+                    "total": 0,
+                },
+                "aircraft": rng.choice(AIRCRAFTS),
+                "meta": {"range": 0, "cruise_speed_kmh": 0, "cost_per_km": 0},
+            }
+        )
+    return {
+        "summary": {
+            "departure_date": departure_date,
+            "from": {"iata": origin, **airports[origin]},
+            "to": {"iata": destination, **airports[destination]},
+            "currency": "BRL",
+        },
+        "options": flight_options,
+    }
+
+
+def build_latency_sampler(latency_ms: float, distribution: str):
+    """Returns a function giving the delay, in seconds, of each response (mean of `latency_ms`)"""
+    mean = latency_ms / 1000
+    rng = random.Random()
+    if distribution == "uniform":
+        return lambda: rng.uniform(0, 2 * mean)
+    if distribution == "exponential":
+        return lambda: rng.expovariate(1 / mean) if mean else 0
+    if distribution == "lognormal":
+        # sigma of 0.5 gives a long tail while keeping the mean
+        return lambda: rng.lognormvariate(0, 0.5) * mean / 1.1331
+    return lambda: mean
+
+
+def build_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    options: int = 20,
+    latency_ms: float = 0,
+    distribution: str = "fixed",
+    error_rate: float = 0,
+    airports: int = len(AIRPORTS),
+) -> UpstreamStubServer:
+    """Builds the stub server. Port 0 picks a free port, available on `server.server_port`"""
+    airports_data = build_airports(airports)
+    sample_latency = build_latency_sampler(latency_ms, distribution)
+    rng = random.Random()
+
+    class UpstreamStubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(sample_latency())
+            parts = self.path.strip("/").split("/")
+            if rng.random() < error_rate:
+                return self.send_json(503, {"error": "Service unavailable"})
+            if parts[:2] == ["air", "airports"]:
+                return self.send_json(200, airports_data)
+            if parts[:2] == ["air", "search"] and len(parts) == 6:
+                origin, destination, departure_date = parts[3:]
+                if origin not in airports_data or destination not in airports_data:
+                    return self.send_json(404, {"error": "Airport not found"})
+                return self.send_json(
+                    200,
+                    build_flights(
+                        airports_data, origin, destination, departure_date, options
+                    ),
+                )
+            return self.send_json(404, {"error": "Not found"})
+
+        def send_json(self, status: int, data: dict) -> None:
+            body = json.dumps(data).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return UpstreamStubServer((host, port), UpstreamStubHandler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--options", type=int, default=20, help="options per leg")
+    parser.add_argument("--airports", type=int, default=len(AIRPORTS))
+    parser.add_argument("--latency", type=float, default=0, help="mean latency (ms)")
+    parser.add_argument(
+        "--distribution", choices=LATENCY_DISTRIBUTIONS, default="fixed"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0, help="share of 503 responses (0-1)"
+    )
+    args = parser.parse_args()
+
+    server = build_server(
+        host=args.host,
+        port=args.port,
+        options=args.options,
+        latency_ms=args.latency,
+        distribution=args.distribution,
+        error_rate=args.error_rate,
+        airports=args.airports,
+    )
+    print(f"Upstream stub listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import pytest
+from django.db import transaction
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from user.authentication import token_cache
+
+
+@pytest.fixture(scope="session", autouse=True)
+def django_db_setup():
+    """Runs the tests on a test database created from the migrations, never on the developer one"""
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    yield
+    teardown_databases(old_config, verbosity=0)
+    teardown_test_environment()
+
+
+@pytest.fixture
+def db(django_db_setup):
+    """Runs the test in a transaction of the test database that is rolled back at the end"""
+    token_cache.clear()
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+    token_cache.clear()
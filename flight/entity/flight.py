@@ -1,6 +1,8 @@
 class Location:
     """This class is used to store the location of an airport"""
 
+    __slots__ = ("iata", "city", "latitude", "longitude", "state")
+
     def __init__(
         self,
         iata_code: str,
@@ -28,6 +30,8 @@ class Location:
 class Summary:
     """This class is used to store the summary of a flight"""
 
+    __slots__ = ("departure_date", "currency", "origin", "destination")
+
     def __init__(
         self,
         departure_date: str,
@@ -52,6 +56,8 @@ class Summary:
 class Price:
     """This class is used to store price data of a flight"""
 
+    __slots__ = ("fare", "fees", "total")
+
     def __init__(self, fare, fees, total):
         self.fare = fare
         self.fees = fees
@@ -68,6 +74,8 @@ class Price:
 class Aircraft:
     """This class is used to store aircraft data of a flight"""
 
+    __slots__ = ("model", "manufacturer")
+
     def __init__(self, model: str, manufacturer: str):
         self.model = model
         self.manufacturer = manufacturer
@@ -82,6 +90,8 @@ class Aircraft:
 class Meta:
     """This class is used to store meta data of a flight"""
 
+    __slots__ = ("range", "cruise_speed_kmh", "cost_per_km")
+
     def __init__(self, range: float, cruise_speed_kmh: float, cost_per_km: float):
         self.range = range
         self.cruise_speed_kmh = cruise_speed_kmh
@@ -98,6 +108,8 @@ class Meta:
 class Option:
     """This class is used to store the flight options"""
 
+    __slots__ = ("departure_time", "arrival_time", "price", "aircraft", "meta")
+
     def __init__(
         self,
         departure_time: str,
@@ -125,27 +137,48 @@ class Option:
 class Flight:
     """This class is used to store the flight data, which consists on a summary and a list of options"""
 
+    __slots__ = ("resume", "options")
+
     def __init__(self, resume: Summary, options: list[Option]):
         self.resume = resume
         self.options = options
 
     def to_dict(self):
         return {
-            "resume": self.resume.__dict__,
-            "options": [option.__dict__ for option in self.options],
+            "resume": self.resume.to_dict(),
+            "options": [option.to_dict() for option in self.options],
         }
 
 
 class OutboundFlight:
+    """This class is used to store one option of a flight leg together with the leg summary.
+
+    The same instance is shared by every combination using that option and the flight data
+    is only serialized the first time it is needed.
+    """
+
+    __slots__ = ("resume", "option", "_flight_data")
+
     def __init__(self, resume: Summary, option: Option):
-        self.flight_data = {}
-        self.flight_data.update(resume.to_dict())
-        self.flight_data.update(option.to_dict())
+        self.resume = resume
+        self.option = option
+        self._flight_data = None
+
+    @property
+    def flight_data(self) -> dict:
+        if self._flight_data is None:
+            flight_data = {}
+            flight_data.update(self.resume.to_dict())
+            flight_data.update(self.option.to_dict())
+            self._flight_data = flight_data
+        return self._flight_data
 
 
 class FlightCombination:
     """This class is used to store the flight combination data, which consists on a outbound flight and a return flight"""
 
+    __slots__ = ("price", "outbound_flight", "return_flight")
+
     def __init__(
         self,
         price: float,
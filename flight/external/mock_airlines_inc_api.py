@@ -1,17 +1,63 @@
 import os
 from dotenv import load_dotenv
+from time import perf_counter
 import requests
 
+from flightservice.http_session import (
+    get_async_http_client,
+    get_http_session,
+    get_http_timeout,
+)
+from flightservice.metrics import metrics
+
 load_dotenv()
 
+
 class MockAirlineAPIConnector:
-    def __init__(self) -> None:
+    def __init__(self, session: requests.Session | None = None) -> None:
         self.username: str = os.getenv("USERNAME", "")
         self.password: str = os.getenv("PASSWORD", "")
         self.api_key: str = os.getenv("API_KEY", "")
+        self.base_url: str = os.getenv("AIRLINE_API_URL", "https://stub.amopromo.com")
+        self.session = session or get_http_session()
+
+    def get_flights_endpoint(
+        self, origin: str, destination: str, departure_date: str
+    ) -> str:
+        return f"{self.base_url}/air/search/{self.api_key}/{origin}/{destination}/{departure_date}"
 
     def get_flights(self, origin: str, destination: str, departure_date: str) -> dict:
-        endpoint = f"https://stub.amopromo.com/air/search/{self.api_key}/{origin}/{destination}/{departure_date}"
-        response = requests.get(endpoint, auth=(self.username, self.password))
+        endpoint = self.get_flights_endpoint(origin, destination, departure_date)
+        started_at = perf_counter()
+        status = "error"
+        try:
+            response = self.session.get(
+                endpoint,
+                auth=(self.username, self.password),
+                timeout=get_http_timeout(),
+            )
+            status = response.status_code
+        finally:
+            metrics.observe_upstream(
+                "mock_airlines", status, perf_counter() - started_at
+            )
+        response.raise_for_status()
+        return response.json()
+
+    async def aget_flights(
+        self, origin: str, destination: str, departure_date: str
+    ) -> dict:
+        endpoint = self.get_flights_endpoint(origin, destination, departure_date)
+        started_at = perf_counter()
+        status = "error"
+        try:
+            response = await get_async_http_client().get(
+                endpoint, auth=(self.username, self.password)
+            )
+            status = response.status_code
+        finally:
+            metrics.observe_upstream(
+                "mock_airlines", status, perf_counter() - started_at
+            )
         response.raise_for_status()
         return response.json()
@@ -1,14 +1,94 @@
 from abc import ABC, abstractmethod
+from asgiref.sync import sync_to_async
+from typing import Iterator
+
 from flight.entity.flight import Flight, FlightCombination
 
 
+class ValidationException(Exception):
+    pass
+
+
+class UpstreamTimeoutException(Exception):
+    pass
+
+
 class IFlightAdapter(ABC):
     @abstractmethod
     def search_flights(
-        self, origin: str, destination: str, departure_date: str, return_date: str
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: str,
+        limit: int | None = None,
+        offset: int = 0,
     ) -> list[FlightCombination]:
         pass
 
+    @abstractmethod
+    def iter_flight_combinations(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: str,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> Iterator[FlightCombination]:
+        pass
+
+    async def aiter_flight_combinations(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: str,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> Iterator[FlightCombination]:
+        """Async version of iter_flight_combinations, running it in a thread unless overridden"""
+        return await sync_to_async(
+            self.iter_flight_combinations, thread_sensitive=False
+        )(
+            origin=origin,
+            destination=destination,
+            departure_date=departure_date,
+            return_date=return_date,
+            limit=limit,
+            offset=offset,
+        )
+
+    def get_cheapest_combinations(
+        self, origin: str, destination: str, dates: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], FlightCombination | None]:
+        """Method used to get the cheapest combination of each (departure, return) dates pair, searching each pair unless overridden"""
+        return {
+            (departure_date, return_date): next(
+                self.iter_flight_combinations(
+                    origin=origin,
+                    destination=destination,
+                    departure_date=departure_date,
+                    return_date=return_date,
+                    limit=1,
+                ),
+                None,
+            )
+            for departure_date, return_date in dates
+        }
+
+    def prewarm_search(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: str,
+        budget: int,
+        margin: float,
+    ) -> int:
+        """Method used to fetch a search ahead of demand, returning the upstream calls made. Adapters without a cache have nothing to warm"""
+        return 0
+
     @abstractmethod
     def transform_api_data(self, flight_data: dict | list) -> Flight:
         pass
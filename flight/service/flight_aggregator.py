@@ -0,0 +1,319 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import timedelta
+from heapq import merge
+from itertools import islice
+from typing import Iterator
+import asyncio
+import contextvars
+import logging
+import time
+
+from flight.entity.flight import FlightCombination, OutboundFlight
+from flight.service.flight_adapter import IFlightAdapter, ValidationException
+from flight.utils.calculate_flight_speed import convert_str_to_datetime
+from flight.utils.redact import redact_api_key
+from flight.utils.time import get_current_date
+from flightservice.metrics import metrics
+
+# Separated from the legs pool, since each provider search waits on its own legs
+providers_executor = ThreadPoolExecutor(
+    max_workers=settings.FLIGHT_PROVIDERS_POOL_SIZE,
+    thread_name_prefix="flight-provider",
+)
+
+
+class FlightProviderRegistry:
+    """This class is used to store the flight adapters (airlines) a search is sent to"""
+
+    def __init__(self):
+        self.providers: dict[str, IFlightAdapter] = {}
+
+    def register(self, name: str, adapter: IFlightAdapter) -> None:
+        self.providers[name] = adapter
+
+    def unregister(self, name: str) -> None:
+        self.providers.pop(name, None)
+
+    def get_providers(self) -> dict[str, IFlightAdapter]:
+        return dict(self.providers)
+
+
+class AggregatedSearch:
+    """This class is used to store the merged combinations of a search and the status of each provider"""
+
+    __slots__ = ("combinations", "providers")
+
+    def __init__(self, combinations: Iterator[FlightCombination], providers: dict):
+        self.combinations = combinations
+        self.providers = providers
+
+    def has_results(self) -> bool:
+        return any(status["status"] == "ok" for status in self.providers.values())
+
+    def timed_out(self) -> bool:
+        return any(status["status"] == "timeout" for status in self.providers.values())
+
+
+class AggregatedDateGrid:
+    """This class is used to store the cheapest combination of each (departure, return) dates pair and the status of each provider"""
+
+    __slots__ = ("cells", "providers")
+
+    def __init__(
+        self, cells: dict[tuple[str, str], FlightCombination | None], providers: dict
+    ):
+        self.cells = cells
+        self.providers = providers
+
+    def has_results(self) -> bool:
+        return any(status["status"] == "ok" for status in self.providers.values())
+
+    def timed_out(self) -> bool:
+        return any(status["status"] == "timeout" for status in self.providers.values())
+
+
+class FlightAggregatorService:
+    MAX_GRID_DAYS = 7
+
+    def __init__(self, registry: FlightProviderRegistry, provider_timeout: float = 10):
+        self.registry = registry
+        self.provider_timeout = provider_timeout
+
+    def search_flights(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: str,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> AggregatedSearch:
+        """Method used to search every provider concurrently, merging their combinations by price.
+
+        Invalid parameters raise ValidationException before any provider is called. Providers that
+        fail or don't answer within `provider_timeout` are left out and reported in the statuses.
+        """
+        providers = self.validate_search(
+            origin=origin,
+            destination=destination,
+            departure_date=departure_date,
+            return_date=return_date,
+            limit=limit,
+            offset=offset,
+        )
+
+        started_at = time.perf_counter()
+        futures = {
+            name: providers_executor.submit(
+                contextvars.copy_context().run,
+                adapter.iter_flight_combinations,
+                origin=origin,
+                destination=destination,
+                departure_date=departure_date,
+                return_date=return_date,
+            )
+            for name, adapter in providers.items()
+        }
+        done, _ = wait(futures.values(), timeout=self.provider_timeout)
+        elapsed_ms = round((time.perf_counter() - started_at) * 1000)
+        return self.merge_results(futures, done, elapsed_ms, limit, offset)
+
+    async def asearch_flights(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: str,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> AggregatedSearch:
+        """Async version of search_flights, awaiting every provider on the running event loop"""
+        providers = await sync_to_async(self.validate_search, thread_sensitive=False)(
+            origin=origin,
+            destination=destination,
+            departure_date=departure_date,
+            return_date=return_date,
+            limit=limit,
+            offset=offset,
+        )
+
+        started_at = time.perf_counter()
+        tasks = {
+            name: asyncio.create_task(
+                adapter.aiter_flight_combinations(
+                    origin=origin,
+                    destination=destination,
+                    departure_date=departure_date,
+                    return_date=return_date,
+                )
+            )
+            for name, adapter in providers.items()
+        }
+        done = set()
+        if tasks:
+            done, _ = await asyncio.wait(tasks.values(), timeout=self.provider_timeout)
+        elapsed_ms = round((time.perf_counter() - started_at) * 1000)
+        return self.merge_results(tasks, done, elapsed_ms, limit, offset)
+
+    def validate_search(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: str,
+        limit: int | None,
+        offset: int,
+    ) -> dict[str, IFlightAdapter]:
+        """Method used to validate the search with every provider, returning the providers"""
+        with metrics.stage("validate"):
+            self.validate_pagination(limit=limit, offset=offset)
+            providers = self.registry.get_providers()
+            for adapter in providers.values():
+                adapter.validate_parameters(
+                    origin=origin,
+                    destination=destination,
+                    departure_date=departure_date,
+                    return_date=return_date,
+                )
+        return providers
+
+    def merge_results(
+        self,
+        futures: dict,
+        done: set,
+        elapsed_ms: int,
+        limit: int | None,
+        offset: int,
+    ) -> AggregatedSearch:
+        """Method used to merge the combinations of the providers that answered (futures or tasks)"""
+        statuses, provider_combinations = self.collect_results(
+            futures, done, elapsed_ms
+        )
+        combinations = self.deduplicate(
+            merge(*provider_combinations, key=lambda combination: combination.price)
+        )
+        stop = None if limit is None else offset + limit
+        return AggregatedSearch(islice(combinations, offset, stop), statuses)
+
+    def collect_results(
+        self, futures: dict, done: set, elapsed_ms: int
+    ) -> tuple[dict, list]:
+        """Method used to get the status of each provider and the results of those that answered"""
+        statuses = {}
+        results = []
+        for name, future in futures.items():
+            if future not in done:
+                future.cancel()
+                statuses[name] = {"status": "timeout", "elapsed_ms": elapsed_ms}
+                logging.warning(f"Flight provider '{name}' timed out")
+            elif future.exception() is not None:
+                # The error (e.g. the URL of a failed request) is only logged, it may hold secrets
+                statuses[name] = {"status": "error"}
+                error = redact_api_key(str(future.exception()))
+                logging.warning(f"Flight provider '{name}' failed: {error}")
+            else:
+                statuses[name] = {"status": "ok"}
+                results.append(future.result())
+        return statuses, results
+
+    def search_date_grid(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: str,
+        days: int = 3,
+    ) -> AggregatedDateGrid:
+        """Method used to search the cheapest combination of every dates pair within `days` of the requested dates.
+
+        Each provider gets every pair at once, so the legs shared by several pairs are fetched once.
+        Pairs departing in the past or returning before the departure are left out.
+        """
+        self.validate_days(days)
+        providers = self.validate_search(
+            origin=origin,
+            destination=destination,
+            departure_date=departure_date,
+            return_date=return_date,
+            limit=None,
+            offset=0,
+        )
+        dates = self.get_grid_dates(departure_date, return_date, days)
+
+        started_at = time.perf_counter()
+        futures = {
+            name: providers_executor.submit(
+                contextvars.copy_context().run,
+                adapter.get_cheapest_combinations,
+                origin=origin,
+                destination=destination,
+                dates=dates,
+            )
+            for name, adapter in providers.items()
+        }
+        done, _ = wait(futures.values(), timeout=self.provider_timeout)
+        elapsed_ms = round((time.perf_counter() - started_at) * 1000)
+        statuses, provider_cells = self.collect_results(futures, done, elapsed_ms)
+        cells = {
+            pair: min(
+                (cells[pair] for cells in provider_cells if cells.get(pair)),
+                key=lambda combination: combination.price,
+                default=None,
+            )
+            for pair in dates
+        }
+        return AggregatedDateGrid(cells, statuses)
+
+    def get_grid_dates(
+        self, departure_date: str, return_date: str, days: int
+    ) -> list[tuple[str, str]]:
+        today = get_current_date().date()
+        departure = convert_str_to_datetime(departure_date, format="%Y-%m-%d").date()
+        arrival = convert_str_to_datetime(return_date, format="%Y-%m-%d").date()
+        shifts = [timedelta(days=day) for day in range(-days, days + 1)]
+        return [
+            (
+                (departure + departure_shift).isoformat(),
+                (arrival + return_shift).isoformat(),
+            )
+            for departure_shift in shifts
+            for return_shift in shifts
+            if today <= departure + departure_shift <= arrival + return_shift
+        ]
+
+    def validate_days(self, days: int):
+        if type(days) != int or not 0 <= days <= self.MAX_GRID_DAYS:
+            raise ValidationException(
+                f"Days must be an integer between 0 and {self.MAX_GRID_DAYS}"
+            )
+
+    def validate_pagination(self, limit: int | None, offset: int):
+        if limit is not None and (type(limit) != int or limit < 0):
+            raise ValidationException("Limit must be a non-negative integer")
+        if type(offset) != int or offset < 0:
+            raise ValidationException("Offset must be a non-negative integer")
+
+    def deduplicate(
+        self, combinations: Iterator[FlightCombination]
+    ) -> Iterator[FlightCombination]:
+        """Method used to skip the combinations already offered, cheaper, by another provider"""
+        seen = set()
+        for combination in combinations:
+            key = (
+                self.get_leg_key(combination.outbound_flight),
+                self.get_leg_key(combination.return_flight),
+            )
+            if key not in seen:
+                seen.add(key)
+                yield combination
+
+    def get_leg_key(self, leg: OutboundFlight) -> tuple:
+        return (
+            leg.resume.origin.iata,
+            leg.resume.destination.iata,
+            leg.option.departure_time,
+            leg.option.arrival_time,
+            leg.option.aircraft.model,
+        )
@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable
+import asyncio
+import logging
+import threading
+import time
+
+from flight.utils.redact import redact_api_key
+
+
+class LegCache:
+    """This class is used to cache the airline API data of each (origin, destination, date) leg.
+
+    Entries younger than `ttl` are fresh. Entries older than that, but younger than
+    `ttl + stale_ttl`, are served immediately while being refreshed in the background.
+    The cache holds at most `max_size` legs, evicting the least recently used.
+    """
+
+    def __init__(self, ttl: float, max_size: int, stale_ttl: float = 0):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.stale_ttl = stale_ttl
+        self.entries: OrderedDict[tuple, tuple[dict, float]] = OrderedDict()
+        self.refreshing: set[tuple] = set()
+        self.lock = threading.Lock()
+        self.refresh_executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="leg-cache-refresh"
+        )
+        self.refresh_tasks: set[asyncio.Task] = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get_or_fetch(self, key: tuple, fetch: Callable[[], dict]) -> dict:
+        data, needs_refresh = self.lookup(key)
+        if needs_refresh:
+            self.refresh_executor.submit(self.refresh, key, fetch)
+        if data is not None:
+            return data
+
+        data = fetch()
+        self.set(key, data)
+        return data
+
+    async def aget_or_fetch(
+        self, key: tuple, fetch: Callable[[], Awaitable[dict]]
+    ) -> dict:
+        """Same as get_or_fetch, for coroutine fetches. Stale legs are refreshed in a background task"""
+        data, needs_refresh = self.lookup(key)
+        if needs_refresh:
+            task = asyncio.create_task(self.arefresh(key, fetch))
+            self.refresh_tasks.add(task)
+            task.add_done_callback(self.refresh_tasks.discard)
+        if data is not None:
+            return data
+
+        data = await fetch()
+        self.set(key, data)
+        return data
+
+    def lookup(self, key: tuple) -> tuple[dict | None, bool]:
+        """Returns the cached leg (None on a miss) and whether the caller must start refreshing it"""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                data, stored_at = entry
+                age = now - stored_at
+                if age < self.ttl:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return data, False
+                if age < self.ttl + self.stale_ttl:
+                    self.entries.move_to_end(key)
+                    self.stale_hits += 1
+                    needs_refresh = key not in self.refreshing
+                    self.refreshing.add(key)
+                    return data, needs_refresh
+            self.misses += 1
+            return None, False
+
+    def expires_in(self, key: tuple) -> float | None:
+        """Returns the seconds the cached leg stays fresh (negative once stale), or None if it isn't cached"""
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is None:
+            return None
+        return entry[1] + self.ttl - time.monotonic()
+
+    def set(self, key: tuple, data: dict) -> None:
+        with self.lock:
+            self.entries[key] = (data, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def refresh(self, key: tuple, fetch: Callable[[], dict]) -> None:
+        try:
+            self.set(key, fetch())
+        except Exception as error:
+            logging.warning(
+                f"Could not refresh cached leg {key}: {redact_api_key(str(error))}"
+            )
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    async def arefresh(self, key: tuple, fetch: Callable[[], Awaitable[dict]]) -> None:
+        try:
+            self.set(key, await fetch())
+        except Exception as error:
+            logging.warning(
+                f"Could not refresh cached leg {key}: {redact_api_key(str(error))}"
+            )
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "size": len(self.entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+            }
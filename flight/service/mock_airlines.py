@@ -1,12 +1,25 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, wait
+import asyncio
+import contextvars
+import threading
+from heapq import heapify, heappop, heappush
+from itertools import islice
+from typing import Iterator
+
 from flight.utils.haversine_formula import haversine_distance
-from flight.utils.calculate_flight_speed import (
-    calculate_flight_speed,
-    convert_str_to_datetime,
+from flight.utils.calculate_flight_speed import convert_str_to_datetime
+from flight.utils.batch_calculations import (
+    calculate_costs_per_km,
+    calculate_fees,
+    calculate_flight_speeds,
 )
-from flight.utils.calculate_cost_per_km import calculate_cost_per_km
 from flight.utils.time import get_current_date
 from flight.external.mock_airlines_inc_api import MockAirlineAPIConnector
-from airport.repository.iata_repository import IataRepository
+from airport.repository.iata_repository import IIataRepository
+from airport.service.distance_service import IDistanceService
 from flight.entity.flight import (
     Flight,
     Location,
@@ -18,63 +31,406 @@ from flight.entity.flight import (
     Option,
     FlightCombination,
 )
-from flight.service.flight_adapter import IFlightAdapter
-
+from flight.service.flight_adapter import (
+    IFlightAdapter,
+    UpstreamTimeoutException,
+    ValidationException,
+)
+from flight.service.leg_cache import LegCache
+from flight.service.single_flight import SingleFlight
+from flightservice.metrics import metrics
 
-class ValidationException(Exception):
-    pass
+# Shared pool used to fetch the legs of a search concurrently
+legs_executor = ThreadPoolExecutor(
+    max_workers=settings.FLIGHT_LEGS_POOL_SIZE, thread_name_prefix="flight-leg"
+)
+# The date grids fetch many legs each, on their own small pool so they don't queue the searches
+grid_legs_executor = ThreadPoolExecutor(
+    max_workers=settings.FLIGHT_GRID_LEGS_POOL_SIZE,
+    thread_name_prefix="flight-grid-leg",
+)
 
 
 class MockAirlinesIncService(IFlightAdapter):
+    FEE_RATE = 0.1
+    MINIMUM_FEE = 40.0
+
     def __init__(
         self,
         api_connector: MockAirlineAPIConnector,
-        iata_repository: IataRepository,
+        iata_repository: IIataRepository,
+        search_timeout: float = 30,
+        leg_cache: LegCache | None = None,
+        distance_service: IDistanceService | None = None,
     ):
         self.api_connector = api_connector
         self.iata_repository = iata_repository
+        self.search_timeout = search_timeout
+        self.leg_cache = leg_cache
+        self.distance_service = distance_service
+        # Identical concurrent searches and leg fetches share one in-flight call
+        self.search_calls = SingleFlight()
+        self.leg_calls = SingleFlight()
+        # Transformed legs, reused while the leg cache serves the same data
+        self.transformed_legs: OrderedDict[tuple, tuple[dict, Flight]] = OrderedDict()
+        self.transformed_legs_lock = threading.Lock()
+
+    def coalescing_stats(self) -> dict:
+        """Method used to report how many searches and leg fetches joined a call in flight"""
+        return {"searches": self.search_calls.stats(), "legs": self.leg_calls.stats()}
 
     def search_flights(
-        self, origin: str, destination: str, departure_date: str, return_date: str
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: str,
+        limit: int | None = None,
+        offset: int = 0,
     ) -> list[FlightCombination]:
+        return list(
+            self.iter_flight_combinations(
+                origin=origin,
+                destination=destination,
+                departure_date=departure_date,
+                return_date=return_date,
+                limit=limit,
+                offset=offset,
+            )
+        )
+
+    def iter_flight_combinations(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: str,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> Iterator[FlightCombination]:
+        """Method used to validate and fetch the search eagerly, returning the combinations page lazily"""
         self.validate_parameters(
             origin=origin,
             destination=destination,
             departure_date=departure_date,
             return_date=return_date,
         )
-        outbound_flight_data = self.get_api_flight_data(
-            origin=origin, destination=destination, departure_date=departure_date
+        self.validate_pagination(limit=limit, offset=offset)
+        try:
+            outbound_flights, return_flights = self.search_calls.do(
+                key=(origin, destination, departure_date, return_date),
+                function=lambda: self.get_flights(
+                    origin, destination, departure_date, return_date
+                ),
+                timeout=self.search_timeout,
+            )
+        except TimeoutError:
+            raise UpstreamTimeoutException(
+                f"Airline API did not respond within {self.search_timeout} seconds"
+            )
+        return self.paginate_flight_combinations(
+            outbound_flights, return_flights, limit=limit, offset=offset
         )
-        return_flight_data = self.get_api_flight_data(
-            origin=destination, destination=origin, departure_date=return_date
+
+    async def aiter_flight_combinations(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: str,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> Iterator[FlightCombination]:
+        """Async version of iter_flight_combinations, fetching the legs without blocking a thread"""
+        await sync_to_async(self.validate_parameters, thread_sensitive=False)(
+            origin=origin,
+            destination=destination,
+            departure_date=departure_date,
+            return_date=return_date,
         )
-        formatted_outbound_flight_data = self.transform_api_data(
-            flight_data=outbound_flight_data
+        self.validate_pagination(limit=limit, offset=offset)
+        try:
+            outbound_flights, return_flights = await self.search_calls.ado(
+                key=(origin, destination, departure_date, return_date),
+                function=lambda: self.aget_flights(
+                    origin, destination, departure_date, return_date
+                ),
+                timeout=self.search_timeout,
+            )
+        except asyncio.TimeoutError:
+            raise UpstreamTimeoutException(
+                f"Airline API did not respond within {self.search_timeout} seconds"
+            )
+        return self.paginate_flight_combinations(
+            outbound_flights, return_flights, limit=limit, offset=offset
         )
-        formatted_return_flight_data = self.transform_api_data(
-            flight_data=return_flight_data
+
+    def get_flights(
+        self, origin: str, destination: str, departure_date: str, return_date: str
+    ) -> tuple[Flight, Flight]:
+        """Method used to fetch and transform the outbound and return legs of a search"""
+        legs = [
+            (origin, destination, departure_date),
+            (destination, origin, return_date),
+        ]
+        return self.transform_cached_legs(legs, self.get_api_legs_data(legs=legs))
+
+    async def aget_flights(
+        self, origin: str, destination: str, departure_date: str, return_date: str
+    ) -> tuple[Flight, Flight]:
+        """Async version of get_flights"""
+        legs = [
+            (origin, destination, departure_date),
+            (destination, origin, return_date),
+        ]
+        legs_data = await self.aget_api_legs_data(legs=legs)
+        # The distance service may need to query the database
+        return await sync_to_async(self.transform_cached_legs, thread_sensitive=False)(
+            legs, legs_data
+        )
+
+    def transform_cached_legs(
+        self, legs: list[tuple[str, str, str]], legs_data: list[dict]
+    ) -> tuple[Flight, Flight]:
+        outbound_flights, return_flights = (
+            self.transform_leg(leg, flight_data)
+            for leg, flight_data in zip(legs, legs_data)
         )
+        return outbound_flights, return_flights
+
+    def transform_leg(self, leg: tuple[str, str, str], flight_data: dict) -> Flight:
+        """Method used to transform a leg once for each data fetched into the leg cache"""
+        if self.leg_cache is None:
+            return self.transform_api_data(flight_data=flight_data)
+        with self.transformed_legs_lock:
+            entry = self.transformed_legs.get(leg)
+            if entry is not None and entry[0] is flight_data:
+                self.transformed_legs.move_to_end(leg)
+                return entry[1]
+
+        flight = self.transform_api_data(flight_data=flight_data)
+        with self.transformed_legs_lock:
+            self.transformed_legs[leg] = (flight_data, flight)
+            self.transformed_legs.move_to_end(leg)
+            while len(self.transformed_legs) > self.leg_cache.max_size:
+                self.transformed_legs.popitem(last=False)
+        return flight
+
+    def get_cheapest_combinations(
+        self, origin: str, destination: str, dates: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], FlightCombination | None]:
+        """Method used to get the cheapest combination of each (departure, return) dates pair.
+
+        Each distinct leg is fetched (concurrently) and transformed once, however many pairs share it.
+        """
+        for departure_date, return_date in dates:
+            self.validate_parameters(origin, destination, departure_date, return_date)
+        legs = list(
+            dict.fromkeys(
+                leg
+                for departure_date, return_date in dates
+                for leg in (
+                    (origin, destination, departure_date),
+                    (destination, origin, return_date),
+                )
+            )
+        )
+        cheapest_legs = {
+            leg: self.get_cheapest_leg(self.transform_leg(leg, flight_data))
+            for leg, flight_data in zip(
+                legs, self.get_api_legs_data(legs=legs, executor=grid_legs_executor)
+            )
+        }
+        combinations = {}
+        for departure_date, return_date in dates:
+            outbound_flight = cheapest_legs[(origin, destination, departure_date)]
+            return_flight = cheapest_legs[(destination, origin, return_date)]
+            combinations[(departure_date, return_date)] = (
+                FlightCombination(
+                    price=outbound_flight.option.price.total
+                    + return_flight.option.price.total,
+                    outbound_flight=outbound_flight,
+                    return_flight=return_flight,
+                )
+                if outbound_flight is not None and return_flight is not None
+                else None
+            )
+        return combinations
+
+    def get_cheapest_leg(self, flights: Flight) -> OutboundFlight | None:
+        """Method used to get the cheapest option of a leg, shared by every combination using it"""
+        with metrics.stage("sort"):
+            option = min(flights.options, key=lambda o: o.price.total, default=None)
+        if option is None:
+            return None
+        return OutboundFlight(flights.resume, option)
+
+    def prewarm_search(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: str,
+        budget: int,
+        margin: float,
+    ) -> int:
+        """Method used to fetch the legs of a search expiring within `margin` seconds, making at most `budget` upstream calls.
+
+        Once both legs are warm they are transformed too. Returns the upstream calls made.
+        """
+        if self.leg_cache is None:
+            return 0
+        self.validate_parameters(origin, destination, departure_date, return_date)
+        legs = [
+            (origin, destination, departure_date),
+            (destination, origin, return_date),
+        ]
+        calls = 0
+        for leg in legs:
+            expires_in = self.leg_cache.expires_in(leg)
+            if expires_in is not None and expires_in > margin:
+                continue
+            if calls >= budget:
+                return calls
+            # Live searches missing this leg join the fetch instead of repeating it
+            self.leg_calls.do(
+                key=leg, function=lambda: self.refresh_api_flight_data(*leg)
+            )
+            calls += 1
+        self.get_flights(origin, destination, departure_date, return_date)
+        return calls
+
+    def refresh_api_flight_data(
+        self, origin: str, destination: str, departure_date: str
+    ) -> dict:
+        data = self.api_connector.get_flights(origin, destination, departure_date)
+        self.leg_cache.set((origin, destination, departure_date), data)
+        return data
+
+    def paginate_flight_combinations(
+        self,
+        outbound_flights: Flight,
+        return_flights: Flight,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> Iterator[FlightCombination]:
+        """Method used to lazily combine the legs, which are only read, so coalesced searches can share them"""
         flight_combinations = self.mount_flight_combination(
-            outbound_flights=formatted_outbound_flight_data,
-            return_flights=formatted_return_flight_data,
+            outbound_flights=outbound_flights,
+            return_flights=return_flights,
         )
-        flight_combinations = sorted(flight_combinations, key=lambda k: k.price)
-        return flight_combinations
+        stop = None if limit is None else offset + limit
+        return islice(flight_combinations, offset, stop)
 
     def transform_api_data(self, flight_data: dict) -> Flight:
-        summary = self.extract_summary(flight_data)
-        flight_options = self.extract_options(flight_data)
-        flight = Flight(
-            resume=summary,
-            options=flight_options,
-        )
+        with metrics.stage("transform"):
+            summary = self.extract_summary(flight_data)
+            flight_options = self.extract_options(flight_data)
+            flight = Flight(
+                resume=summary,
+                options=flight_options,
+            )
+        metrics.observe_size("leg_options", len(flight_options))
         return flight
 
     def get_api_flight_data(
         self, origin: str, destination: str, departure_date: str
     ) -> dict:
-        return self.api_connector.get_flights(origin, destination, departure_date)
+        return self.leg_calls.do(
+            key=(origin, destination, departure_date),
+            function=lambda: self.fetch_api_flight_data(
+                origin, destination, departure_date
+            ),
+        )
+
+    def fetch_api_flight_data(
+        self, origin: str, destination: str, departure_date: str
+    ) -> dict:
+        if self.leg_cache is None:
+            return self.api_connector.get_flights(origin, destination, departure_date)
+        return self.leg_cache.get_or_fetch(
+            key=(origin, destination, departure_date),
+            fetch=lambda: self.api_connector.get_flights(
+                origin, destination, departure_date
+            ),
+        )
+
+    def get_api_legs_data(
+        self,
+        legs: list[tuple[str, str, str]],
+        executor: ThreadPoolExecutor | None = None,
+    ) -> list[dict]:
+        """Method used to fetch every (origin, destination, date) leg concurrently (on the legs pool by default), keeping the legs order"""
+        executor = executor or legs_executor
+        # The legs are timed as part of the request running the search
+        futures = [
+            executor.submit(
+                contextvars.copy_context().run,
+                self.get_api_flight_data,
+                origin=origin,
+                destination=destination,
+                departure_date=departure_date,
+            )
+            for origin, destination, departure_date in legs
+        ]
+        done, not_done = wait(futures, timeout=self.search_timeout)
+        for future in not_done:
+            future.cancel()
+
+        # Re-raises the first upstream error, in the legs order
+        for future in futures:
+            if future in done and future.exception() is not None:
+                raise future.exception()
+        if not_done:
+            raise UpstreamTimeoutException(
+                f"Airline API did not respond within {self.search_timeout} seconds"
+            )
+        return [future.result() for future in futures]
+
+    async def aget_api_flight_data(
+        self, origin: str, destination: str, departure_date: str
+    ) -> dict:
+        return await self.leg_calls.ado(
+            key=(origin, destination, departure_date),
+            function=lambda: self.afetch_api_flight_data(
+                origin, destination, departure_date
+            ),
+        )
+
+    async def afetch_api_flight_data(
+        self, origin: str, destination: str, departure_date: str
+    ) -> dict:
+        if self.leg_cache is None:
+            return await self.api_connector.aget_flights(
+                origin, destination, departure_date
+            )
+        return await self.leg_cache.aget_or_fetch(
+            key=(origin, destination, departure_date),
+            fetch=lambda: self.api_connector.aget_flights(
+                origin, destination, departure_date
+            ),
+        )
+
+    async def aget_api_legs_data(self, legs: list[tuple[str, str, str]]) -> list[dict]:
+        """Async version of get_api_legs_data"""
+        try:
+            return await asyncio.wait_for(
+                asyncio.gather(
+                    *[
+                        self.aget_api_flight_data(
+                            origin=origin,
+                            destination=destination,
+                            departure_date=departure_date,
+                        )
+                        for origin, destination, departure_date in legs
+                    ]
+                ),
+                timeout=self.search_timeout,
+            )
+        except asyncio.TimeoutError:
+            raise UpstreamTimeoutException(
+                f"Airline API did not respond within {self.search_timeout} seconds"
+            )
 
     def extract_summary(self, flight_data: dict) -> Summary:
         summary_data: dict = flight_data["summary"]
@@ -103,31 +459,26 @@ class MockAirlinesIncService(IFlightAdapter):
         options = flight_data["options"]
         summary = flight_data["summary"]
 
+        # Every option of a leg shares the same route, so its distance is calculated once
+        distance = self.get_leg_distance(summary)
+        departure_times = [option["departure_time"] for option in options]
+        arrival_times = [option["arrival_time"] for option in options]
+        prices = self.build_prices(
+            fares=[option["price"]["fare"] for option in options]
+        )
+        metas = self.build_metas(
+            range=distance,
+            departure_times=departure_times,
+            arrival_times=arrival_times,
+            fares=[price.fare for price in prices],
+        )
+
         flight_options = []
-        for option in options:
+        for option, price, meta in zip(options, prices, metas):
             aircraft = Aircraft(
                 model=option["aircraft"]["model"],
                 manufacturer=option["aircraft"]["manufacturer"],
             )
-            price = self.build_price(
-                fare=option["price"]["fare"],
-                fees=option["price"]["fees"],
-                total=option["price"]["total"],
-            )
-            meta = self.build_meta(
-                range=haversine_distance(
-                    summary["from"]["lat"],
-                    summary["from"]["lon"],
-                    summary["to"]["lat"],
-                    summary["to"]["lon"],
-                ),
-                cruise_speed_kmh=option["meta"]["cruise_speed_kmh"],
-                cost_per_km=option["meta"]["cost_per_km"],
-                departure_time=option["departure_time"],
-                arrival_time=option["arrival_time"],
-                fare=price.fare,
-            )
-
             flight_options.append(
                 Option(
                     departure_time=option["departure_time"],
@@ -139,32 +490,76 @@ class MockAirlinesIncService(IFlightAdapter):
             )
         return flight_options
 
+    def get_leg_distance(self, summary: dict) -> float:
+        """Method used to get the leg distance from the distance service, calculating it from the summary coordinates when unknown"""
+        if self.distance_service is not None:
+            distance = self.distance_service.get_distance(
+                summary["from"]["iata"], summary["to"]["iata"]
+            )
+            if distance is not None:
+                return distance
+        return haversine_distance(
+            summary["from"]["lat"],
+            summary["from"]["lon"],
+            summary["to"]["lat"],
+            summary["to"]["lon"],
+        )
+
     def mount_flight_combination(
         self, outbound_flights: Flight, return_flights: Flight
-    ) -> list[FlightCombination]:
-        flight_combinations = []
-        for outbound_flight in outbound_flights.options:
-            for flight_back in return_flights.options:
-                flight_combination = FlightCombination(
-                    price=outbound_flight.price.total + flight_back.price.total,
-                    outbound_flight=OutboundFlight(
-                        outbound_flights.resume, outbound_flight
-                    ),
-                    return_flight=OutboundFlight(return_flights.resume, flight_back),
-                )
-                flight_combinations.append(flight_combination)
+    ) -> Iterator[FlightCombination]:
+        """Method used to lazily yield the flight combinations ordered by price (cheaper to expensive).
+
+        Each leg is sorted by total once and the outbound x return grid is walked best-first
+        with a heap, so only the combinations actually consumed are built.
+        """
+        with metrics.stage("sort"):
+            outbound_options = sorted(
+                outbound_flights.options, key=lambda o: o.price.total
+            )
+            return_options = sorted(return_flights.options, key=lambda o: o.price.total)
+        if not outbound_options or not return_options:
+            return
+
+        # One heap entry per outbound option, each pointing at its cheapest unused return option
+        heap = [
+            (outbound_flight.price.total + return_options[0].price.total, i, 0)
+            for i, outbound_flight in enumerate(outbound_options)
+        ]
+        heapify(heap)
 
-        return flight_combinations
+        # Combinations share one OutboundFlight per option instead of copying the leg data
+        outbound_legs = [
+            OutboundFlight(outbound_flights.resume, option)
+            for option in outbound_options
+        ]
+        return_legs = [
+            OutboundFlight(return_flights.resume, option) for option in return_options
+        ]
+        while heap:
+            price, i, j = heappop(heap)
+            yield FlightCombination(
+                price=price,
+                outbound_flight=outbound_legs[i],
+                return_flight=return_legs[j],
+            )
+            if j + 1 < len(return_options):
+                next_price = (
+                    outbound_options[i].price.total + return_options[j + 1].price.total
+                )
+                heappush(heap, (next_price, i, j + 1))
 
     def build_price(self, fare: float, fees: float = 0, total: float = 0) -> Price:
         """Method used to build the price object based on the fare, filling up the fees and total"""
-        price = Price(fare, fees, total)
+        return self.build_prices(fares=[fare])[0]
 
-        # Calculates the fees based on established rule
-        fee = round((price.fare * 0.1), 4)
-        price.fees = max(fee, 40)  # Make sure the fee is not less than 40
-        price.total = price.fare + price.fees
-        return price
+    def build_prices(self, fares: list[float]) -> list[Price]:
+        """Method used to build the price objects of all the fares of a leg at once"""
+        # The fee is 10% of the fare and never less than 40
+        fees, totals = calculate_fees(
+            fares, fee_rate=self.FEE_RATE, minimum_fee=self.MINIMUM_FEE
+        )
+        return [Price(*price) for price in zip(fares, fees, totals)]
 
     def build_meta(
         self,
@@ -176,18 +571,28 @@ class MockAirlinesIncService(IFlightAdapter):
         fare: float,
     ) -> Meta:
         """Method used to build the meta object and fullfill the range, cruise_speed_kmh and cost_per_km"""
-        meta = Meta(range, cruise_speed_kmh, cost_per_km)
+        return self.build_metas(
+            range=range,
+            departure_times=[departure_time],
+            arrival_times=[arrival_time],
+            fares=[fare],
+        )[0]
 
-        cruise_speed = calculate_flight_speed(
+    def build_metas(
+        self,
+        range: float,
+        departure_times: list[str],
+        arrival_times: list[str],
+        fares: list[float],
+    ) -> list[Meta]:
+        """Method used to build the meta objects of all the options of a leg at once"""
+        cruise_speeds = calculate_flight_speeds(
             distance=range,
-            arrival_time=arrival_time,
-            departure_time=departure_time,
+            departure_times=departure_times,
+            arrival_times=arrival_times,
         )
-        cost = calculate_cost_per_km(fare=fare, distance=range)
-
-        meta.cruise_speed_kmh = cruise_speed
-        meta.cost_per_km = cost
-        return meta
+        costs = calculate_costs_per_km(fares=fares, distance=range)
+        return [Meta(range, *meta) for meta in zip(cruise_speeds, costs)]
 
     def validate_parameters(
         self, origin: str, destination: str, departure_date: str, return_date: str
@@ -200,6 +605,12 @@ class MockAirlinesIncService(IFlightAdapter):
         self.validate_departure_date(departure_date)
         self.validate_return_date(departure_date, return_date)
 
+    def validate_pagination(self, limit: int | None, offset: int):
+        if limit is not None and (type(limit) != int or limit < 0):
+            raise ValidationException("Limit must be a non-negative integer")
+        if type(offset) != int or offset < 0:
+            raise ValidationException("Offset must be a non-negative integer")
+
     def validate_origin_exists(self, origin: str):
         iata_info = self.iata_repository.get_iata(iata=origin)
         if not iata_info["iata_code"]:
@@ -0,0 +1,68 @@
+import heapq
+import threading
+import time
+
+Route = tuple[str, str, str, str]
+
+
+class RoutePopularityTracker:
+    """This class is used to count the searches of each (origin, destination, departure, return) route.
+
+    Counts decay by half every `half_life` seconds, so the ranking follows the recent traffic.
+    At most `max_routes` routes are tracked, dropping the least popular.
+    """
+
+    def __init__(self, half_life: float = 600, max_routes: int = 10000):
+        self.half_life = half_life
+        self.max_routes = max_routes
+        # Scores are stored as of `started_at`, so recording a search doesn't update every route
+        self.started_at = time.monotonic()
+        self.scores: dict[Route, float] = {}
+        self.lock = threading.Lock()
+
+    def record(self, route: Route) -> None:
+        weight = self.get_weight(time.monotonic())
+        with self.lock:
+            self.scores[route] = self.scores.get(route, 0.0) + weight
+            if len(self.scores) > self.max_routes:
+                self.prune()
+
+    def top(self, n: int) -> list[tuple[Route, float]]:
+        """Returns the `n` most searched routes with their decayed search count, most popular first"""
+        weight = self.get_weight(time.monotonic())
+        with self.lock:
+            top_routes = heapq.nlargest(
+                n, self.scores.items(), key=lambda item: item[1]
+            )
+        return [(route, score / weight) for route, score in top_routes]
+
+    def forget(self, route: Route) -> None:
+        with self.lock:
+            self.scores.pop(route, None)
+
+    def get_weight(self, now: float) -> float:
+        elapsed = now - self.started_at
+        if elapsed / self.half_life > 512:
+            self.rebase(now)
+            elapsed = 0.0
+        return 2 ** (elapsed / self.half_life)
+
+    def rebase(self, now: float) -> None:
+        """Method used to rescale the scores to `now` before the weights overflow"""
+        with self.lock:
+            factor = 2 ** ((now - self.started_at) / self.half_life)
+            self.scores = {
+                route: score / factor for route, score in self.scores.items()
+            }
+            self.started_at = now
+
+    def prune(self) -> None:
+        # Drops the less popular tenth at once, so pruning isn't paid on every search
+        keep = self.max_routes - max(1, self.max_routes // 10)
+        self.scores = dict(
+            heapq.nlargest(keep, self.scores.items(), key=lambda item: item[1])
+        )
+
+    def clear(self) -> None:
+        with self.lock:
+            self.scores.clear()
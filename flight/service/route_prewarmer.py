@@ -0,0 +1,91 @@
+import logging
+import random
+import threading
+
+from flight.service.flight_adapter import ValidationException
+from flight.service.flight_aggregator import FlightProviderRegistry
+from flight.service.route_popularity import RoutePopularityTracker
+from flight.utils.redact import redact_api_key
+
+
+class RoutePrewarmer:
+    """This class is used to keep the most searched routes fetched and cached ahead of demand.
+
+    Every `interval` seconds (randomized by +/- `jitter`, so workers don't refresh together) the
+    `top_routes` most popular routes whose legs expire before the next run are fetched again,
+    making at most `budget` upstream calls per run.
+    """
+
+    def __init__(
+        self,
+        registry: FlightProviderRegistry,
+        tracker: RoutePopularityTracker,
+        top_routes: int = 20,
+        interval: float = 20,
+        budget: int = 20,
+        jitter: float = 0.2,
+    ):
+        self.registry = registry
+        self.tracker = tracker
+        self.top_routes = top_routes
+        self.interval = interval
+        self.budget = budget
+        self.jitter = jitter
+        self.stopped = threading.Event()
+        self.thread: threading.Thread | None = None
+        self.runs = 0
+        self.upstream_calls = 0
+
+    def start(self) -> None:
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stopped.clear()
+        self.thread = threading.Thread(
+            target=self.run, name="route-prewarmer", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.get_delay()):
+            try:
+                self.run_once()
+            except Exception as error:
+                logging.warning(
+                    f"Could not prewarm the popular routes: {redact_api_key(str(error))}"
+                )
+
+    def get_delay(self) -> float:
+        return self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def run_once(self) -> int:
+        """Method used to prewarm the popular routes once, returning the upstream calls made"""
+        # Legs expiring before the next run would be fetched by a live search instead
+        margin = self.interval * (1 + self.jitter)
+        calls = 0
+        for route, _ in self.tracker.top(self.top_routes):
+            for name, provider in self.registry.get_providers().items():
+                if calls >= self.budget:
+                    break
+                try:
+                    calls += provider.prewarm_search(
+                        *route, budget=self.budget - calls, margin=margin
+                    )
+                except ValidationException:
+                    # Departure dates that have passed
+                    self.tracker.forget(route)
+                    break
+                except Exception as error:
+                    logging.warning(
+                        f"Could not prewarm {route} on {name}: {redact_api_key(str(error))}"
+                    )
+        self.runs += 1
+        self.upstream_calls += calls
+        return calls
+
+    def stats(self) -> dict:
+        return {"runs": self.runs, "upstream_calls": self.upstream_calls}
@@ -0,0 +1,92 @@
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Hashable, TypeVar
+from weakref import WeakKeyDictionary
+import asyncio
+import threading
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """This class is used to share one in-flight call among the concurrent callers asking for the same key.
+
+    The first caller runs the call, and the callers arriving while it runs wait for its result
+    (or its exception) instead of repeating it. Async calls are shared among the callers of the
+    same event loop and keep running if the caller that started them gives up.
+    """
+
+    def __init__(self):
+        self.calls: dict[Hashable, Future] = {}
+        self.tasks: WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[Hashable, asyncio.Task]
+        ] = WeakKeyDictionary()
+        self.lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(
+        self, key: Hashable, function: Callable[[], T], timeout: float | None = None
+    ) -> T:
+        """Returns the result of `function`, or of the identical call in flight.
+
+        Callers that joined a call give up after `timeout` seconds (concurrent.futures.TimeoutError).
+        """
+        with self.lock:
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self.calls[key] = future
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result(timeout=timeout)
+        try:
+            result = function()
+            future.set_result(result)
+            return result
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+
+    async def ado(
+        self,
+        key: Hashable,
+        function: Callable[[], Awaitable[T]],
+        timeout: float | None = None,
+    ) -> T:
+        """Async version of do. Callers give up after `timeout` seconds (asyncio.TimeoutError)"""
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            tasks = self.tasks.setdefault(loop, {})
+            task = tasks.get(key)
+            if task is None:
+                task = loop.create_task(function())
+                tasks[key] = task
+                task.add_done_callback(lambda done: self.forget_task(tasks, key, done))
+                self.executed += 1
+            else:
+                self.coalesced += 1
+        # Shielded, so a caller giving up doesn't cancel the call for the others
+        return await asyncio.wait_for(asyncio.shield(task), timeout)
+
+    def forget_task(self, tasks: dict, key: Hashable, task: asyncio.Task) -> None:
+        with self.lock:
+            if tasks.get(key) is task:
+                del tasks[key]
+        if not task.cancelled():
+            task.exception()  # Retrieved, as every caller may have given up already
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self.calls)
+                + sum(len(tasks) for tasks in self.tasks.values()),
+            }
@@ -0,0 +1,126 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import asyncio
+import pytest
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flight.external.mock_airlines_inc_api import MockAirlineAPIConnector
+
+AIRPORTS = {
+    "GRU": {
+        "iata": "GRU",
+        "city": "São Paulo",
+        "lat": -23.425669,
+        "lon": -46.481926,
+        "state": "SP",
+    },
+    "STM": {
+        "iata": "STM",
+        "city": "Santarem",
+        "lat": -2.424886,
+        "lon": -54.78639,
+        "state": "PA",
+    },
+    "GIG": {
+        "iata": "GIG",
+        "city": "Rio de Janeiro",
+        "lat": -22.81,
+        "lon": -43.2506,
+        "state": "RJ",
+    },
+}
+
+
+def get_date(days: int) -> str:
+    return (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def build_flight_data(
+    origin: str, destination: str, departure_date: str, fares=(500.0, 800.0)
+) -> dict:
+    """Returns the airline API payload of a leg, with one option per fare"""
+    return {
+        "summary": {
+            "departure_date": departure_date,
+            "from": AIRPORTS[origin],
+            "to": AIRPORTS[destination],
+            "currency": "BRL",
+        },
+        "options": [
+            {
+                "departure_time": f"{departure_date}T10:00:00",
+                "arrival_time": f"{departure_date}T13:00:00",
+                "price": {"fare": fare, "fees": 0, "total": 0},
+                "aircraft": {"model": "A 320", "manufacturer": "Airbus"},
+                "meta": {"range": 0, "cruise_speed_kmh": 0, "cost_per_km": 0},
+            }
+            for fare in fares
+        ],
+    }
+
+
+class FakeIataRepository:
+    def get_iata(self, iata: str) -> dict:
+        return {"iata_code": iata if iata in AIRPORTS else ""}
+
+    def get_iata_codes(self) -> frozenset[str]:
+        return frozenset(AIRPORTS)
+
+
+class CountingMockAirlineAPIConnector(MockAirlineAPIConnector):
+    """Airline API answering every leg after `delay` seconds, recording the legs it was asked for"""
+
+    def __init__(self, delay: float = 0, fares=(500.0, 800.0)) -> None:
+        super().__init__()
+        self.delay = delay
+        self.fares = fares
+        self.legs = []
+        self.lock = threading.Lock()
+
+    @property
+    def calls(self) -> int:
+        return len(self.legs)
+
+    def get_flights(self, origin: str, destination: str, departure_date: str) -> dict:
+        with self.lock:
+            self.legs.append((origin, destination, departure_date))
+        time.sleep(self.delay)
+        return self.build_flights(origin, destination, departure_date)
+
+    async def aget_flights(
+        self, origin: str, destination: str, departure_date: str
+    ) -> dict:
+        with self.lock:
+            self.legs.append((origin, destination, departure_date))
+        await asyncio.sleep(self.delay)
+        return self.build_flights(origin, destination, departure_date)
+
+    def build_flights(self, origin: str, destination: str, departure_date: str):
+        return build_flight_data(
+            origin, destination, departure_date, self.get_fares(departure_date)
+        )
+
+    def get_fares(self, departure_date: str) -> tuple:
+        return self.fares
+
+
+@pytest.fixture
+def iata_repository() -> FakeIataRepository:
+    return FakeIataRepository()
+
+
+@pytest.fixture
+def api_connector() -> CountingMockAirlineAPIConnector:
+    return CountingMockAirlineAPIConnector()
+
+
+@pytest.fixture
+def search_dates() -> dict:
+    return {"departure_date": get_date(1), "return_date": get_date(5)}
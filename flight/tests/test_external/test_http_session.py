@@ -0,0 +1,105 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import asyncio
+import pytest
+from django.conf import settings
+
+from flight.external.mock_airlines_inc_api import MockAirlineAPIConnector
+from airport.external.domestic_airports_api import DomesticAirportAPIConnector
+from flightservice.http_session import (
+    aclose_async_http_client,
+    get_async_http_client,
+    get_http_session,
+    get_http_timeout,
+)
+from flightservice.lifespan import LifespanMiddleware
+
+
+class FakeResponse:
+    status_code = 200
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> dict:
+        return {}
+
+
+class RecordingSession:
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        return FakeResponse()
+
+
+@pytest.fixture
+def recording_session() -> RecordingSession:
+    return RecordingSession()
+
+
+def test_connectors_share_the_process_wide_session():
+    airline_connector = MockAirlineAPIConnector()
+    airport_connector = DomesticAirportAPIConnector()
+    assert airline_connector.session is get_http_session()
+    assert airport_connector.session is get_http_session()
+
+
+def test_session_is_pooled_and_retries_idempotent_requests():
+    adapter = get_http_session().get_adapter("https://stub.amopromo.com")
+    assert adapter._pool_maxsize == settings.HTTP_POOL_SIZE
+    assert adapter.max_retries.total == settings.HTTP_MAX_RETRIES
+    assert "GET" in adapter.max_retries.allowed_methods
+    assert "POST" not in adapter.max_retries.allowed_methods
+
+
+def test_airline_connector_sends_timeout(recording_session: RecordingSession):
+    MockAirlineAPIConnector(recording_session).get_flights("GRU", "STM", "2023-08-15")
+    _, kwargs = recording_session.calls[0]
+    assert kwargs["timeout"] == get_http_timeout()
+
+
+def test_airport_connector_sends_timeout(recording_session: RecordingSession):
+    DomesticAirportAPIConnector(recording_session).retrieve_airports()
+    _, kwargs = recording_session.calls[0]
+    assert kwargs["timeout"] == get_http_timeout()
+
+
+def test_async_client_is_closed_with_its_event_loop():
+    async def use_client():
+        client = get_async_http_client()
+        assert get_async_http_client() is client
+        await aclose_async_http_client()
+        assert get_async_http_client() is not client
+        await aclose_async_http_client()
+        return client
+
+    assert asyncio.run(use_client()).is_closed
+
+
+def test_server_shutdown_closes_the_async_client():
+    messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    async def run_server():
+        client = get_async_http_client()
+        await LifespanMiddleware(None)({"type": "lifespan"}, receive, send)
+        return client
+
+    assert asyncio.run(run_server()).is_closed
+    assert [message["type"] for message in sent] == [
+        "lifespan.startup.complete",
+        "lifespan.shutdown.complete",
+    ]
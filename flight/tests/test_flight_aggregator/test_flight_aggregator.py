@@ -0,0 +1,219 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import asyncio
+import pytest
+import time
+from datetime import datetime, timedelta
+
+from flight.entity.flight import (
+    Aircraft,
+    FlightCombination,
+    Location,
+    Meta,
+    Option,
+    OutboundFlight,
+    Price,
+    Summary,
+)
+from flight.service.flight_adapter import IFlightAdapter, ValidationException
+from flight.service.flight_aggregator import (
+    FlightAggregatorService,
+    FlightProviderRegistry,
+)
+
+
+def build_combination(price: float, departure_time: str) -> FlightCombination:
+    location = Location("GRU", "São Paulo", -23.425669, -46.481926, "SP")
+    summary = Summary("2023-08-15", "BRL", location, location)
+    option = Option(
+        departure_time=departure_time,
+        arrival_time="2023-08-15T20:00:00",
+        price=Price(price / 2, 0, price / 2),
+        aircraft=Aircraft("A 320", "Airbus"),
+        meta=Meta(0, 0, 0),
+    )
+    leg = OutboundFlight(summary, option)
+    return FlightCombination(price=price, outbound_flight=leg, return_flight=leg)
+
+
+class FakeFlightAdapter(IFlightAdapter):
+    def __init__(self, combinations: list, delay: float = 0, error=None):
+        self.combinations = combinations
+        self.delay = delay
+        self.error = error
+
+    def search_flights(self, *args, **kwargs) -> list[FlightCombination]:
+        return list(self.iter_flight_combinations(*args, **kwargs))
+
+    def iter_flight_combinations(self, *args, **kwargs):
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return iter(sorted(self.combinations, key=lambda c: c.price))
+
+    def transform_api_data(self, flight_data):
+        pass
+
+    def validate_parameters(self, origin, destination, departure_date, return_date):
+        if origin == destination:
+            raise ValidationException("Origin and destination must be different")
+
+
+def search(aggregator: FlightAggregatorService, **kwargs):
+    return aggregator.search_flights(
+        origin="GRU",
+        destination="STM",
+        departure_date="2023-08-11",
+        return_date="2023-08-15",
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def registry() -> FlightProviderRegistry:
+    registry = FlightProviderRegistry()
+    registry.register(
+        "first",
+        FakeFlightAdapter(
+            [
+                build_combination(300, "2023-08-15T10:00:00"),
+                build_combination(100, "2023-08-15T11:00:00"),
+            ]
+        ),
+    )
+    registry.register(
+        "second",
+        FakeFlightAdapter(
+            [
+                build_combination(200, "2023-08-15T12:00:00"),
+                build_combination(400, "2023-08-15T13:00:00"),
+            ]
+        ),
+    )
+    return registry
+
+
+def test_combinations_of_all_providers_are_merged_by_price(registry):
+    result = search(FlightAggregatorService(registry))
+    assert [c.price for c in result.combinations] == [100, 200, 300, 400]
+    assert result.providers == {"first": {"status": "ok"}, "second": {"status": "ok"}}
+
+
+def test_duplicated_combinations_keep_the_cheapest(registry):
+    registry.register(
+        "third", FakeFlightAdapter([build_combination(150, "2023-08-15T10:00:00")])
+    )
+    result = search(FlightAggregatorService(registry))
+    assert [c.price for c in result.combinations] == [100, 150, 200, 400]
+
+
+def test_combinations_are_paginated_after_merging(registry):
+    result = search(FlightAggregatorService(registry), limit=2, offset=1)
+    assert [c.price for c in result.combinations] == [200, 300]
+
+
+def test_slow_provider_is_left_out_within_the_deadline(registry):
+    registry.register(
+        "slow",
+        FakeFlightAdapter([build_combination(50, "2023-08-15T09:00:00")], delay=1),
+    )
+    start = time.perf_counter()
+    result = search(FlightAggregatorService(registry, provider_timeout=0.2))
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.8
+    assert result.providers["slow"]["status"] == "timeout"
+    assert result.has_results()
+    assert [c.price for c in result.combinations] == [100, 200, 300, 400]
+
+
+def test_failing_provider_is_reported(registry):
+    registry.register("down", FakeFlightAdapter([], error=ConnectionError("down")))
+    result = search(FlightAggregatorService(registry))
+    assert result.providers["down"] == {"status": "error"}
+    assert len(list(result.combinations)) == 4
+
+
+def test_provider_error_is_logged_without_the_api_key(registry, monkeypatch, caplog):
+    monkeypatch.setenv("API_KEY", "secret-key")
+    error = ConnectionError("Max retries exceeded with url: /air/search/secret-key/GRU")
+    registry.register("down", FakeFlightAdapter([], error=error))
+    result = search(FlightAggregatorService(registry))
+    assert result.providers["down"] == {"status": "error"}
+    assert "/air/search/***/GRU" in caplog.text
+    assert "secret-key" not in caplog.text
+
+
+def test_invalid_parameters_raise_exception(registry):
+    with pytest.raises(ValidationException):
+        FlightAggregatorService(registry).search_flights(
+            origin="GRU",
+            destination="GRU",
+            departure_date="2023-08-11",
+            return_date="2023-08-15",
+        )
+
+
+def test_async_search_merges_providers_and_reports_timeouts(registry):
+    registry.register(
+        "slow",
+        FakeFlightAdapter([build_combination(50, "2023-08-15T09:00:00")], delay=1),
+    )
+    aggregator = FlightAggregatorService(registry, provider_timeout=0.2)
+    result = asyncio.run(
+        aggregator.asearch_flights(
+            origin="GRU",
+            destination="STM",
+            departure_date="2023-08-11",
+            return_date="2023-08-15",
+        )
+    )
+    assert result.providers["slow"]["status"] == "timeout"
+    assert [c.price for c in result.combinations] == [100, 200, 300, 400]
+
+
+def test_date_grid_keeps_the_cheapest_combination_of_each_pair(registry):
+    departure_date = (datetime.now() + timedelta(days=5)).strftime("%Y-%m-%d")
+    return_date = (datetime.now() + timedelta(days=6)).strftime("%Y-%m-%d")
+    grid = FlightAggregatorService(registry).search_date_grid(
+        origin="GRU",
+        destination="STM",
+        departure_date=departure_date,
+        return_date=return_date,
+        days=1,
+    )
+    # Pairs returning before the departure are left out
+    assert len(grid.cells) == 8
+    assert (departure_date, return_date) in grid.cells
+    assert {c.price for c in grid.cells.values()} == {100}
+    assert grid.providers == {"first": {"status": "ok"}, "second": {"status": "ok"}}
+
+
+def test_date_grid_leaves_out_past_departures(registry):
+    today = datetime.now().strftime("%Y-%m-%d")
+    grid = FlightAggregatorService(registry).search_date_grid(
+        origin="GRU",
+        destination="STM",
+        departure_date=today,
+        return_date=today,
+        days=1,
+    )
+    assert all(departure >= today for departure, _ in grid.cells)
+    assert len(grid.cells) == 3
+
+
+@pytest.mark.parametrize("days", [-1, 8])
+def test_date_grid_with_invalid_days_raises_exception(registry, days: int):
+    with pytest.raises(ValidationException):
+        FlightAggregatorService(registry).search_date_grid(
+            origin="GRU",
+            destination="STM",
+            departure_date="2023-08-11",
+            return_date="2023-08-15",
+            days=days,
+        )
@@ -0,0 +1,131 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import pytest
+import re
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import Http404, HttpResponse
+from django.test import RequestFactory
+
+from flight.external.mock_airlines_inc_api import MockAirlineAPIConnector
+from flight.service.leg_cache import LegCache
+from flight.service.mock_airlines import MockAirlinesIncService
+from flight.tests.conftest import build_flight_data, get_date
+from flightservice.metrics import Metrics, metrics
+from flightservice.middleware import ServerTimingMiddleware
+from flightservice.views import MetricsView
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, data: dict):
+        self.data = data
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> dict:
+        return self.data
+
+
+class FakeSession:
+    def get(self, url: str, **kwargs) -> FakeResponse:
+        origin, destination, departure_date = url.split("/")[-3:]
+        return FakeResponse(build_flight_data(origin, destination, departure_date))
+
+
+@pytest.fixture
+def enabled_metrics(monkeypatch) -> Metrics:
+    monkeypatch.setattr(metrics, "enabled", True)
+    metrics.clear()
+    yield metrics
+    metrics.clear()
+
+
+def test_histograms_are_rendered_in_prometheus_format():
+    registry = Metrics(enabled=True)
+    for seconds in (0.002, 0.004, 3):
+        registry.observe_stage("transform", seconds)
+    registry.register_collector(
+        lambda: [("cache_entries", "gauge", "Entries", [({"cache": "legs"}, 7)])]
+    )
+    registry.register_collector(
+        lambda: [("cache_entries", "gauge", "Entries", [({"cache": "tokens"}, 3)])]
+    )
+    text = registry.render()
+
+    assert "# TYPE flightservice_stage_seconds histogram" in text
+    assert 'flightservice_stage_seconds_bucket{stage="transform",le="0.0025"} 1' in text
+    assert 'flightservice_stage_seconds_bucket{stage="transform",le="0.005"} 2' in text
+    assert 'flightservice_stage_seconds_bucket{stage="transform",le="+Inf"} 3' in text
+    assert 'flightservice_stage_seconds_count{stage="transform"} 3' in text
+    # Samples of the same family are rendered under a single header
+    assert text.count("# TYPE flightservice_cache_entries gauge") == 1
+    assert 'flightservice_cache_entries{cache="legs"} 7' in text
+    assert 'flightservice_cache_entries{cache="tokens"} 3' in text
+
+
+def test_search_stages_are_sent_in_server_timing_header(
+    enabled_metrics, iata_repository
+):
+    service = MockAirlinesIncService(
+        MockAirlineAPIConnector(FakeSession()),
+        iata_repository,
+        leg_cache=LegCache(ttl=60, max_size=10),
+    )
+
+    def get_response(request):
+        combinations = service.search_flights("GRU", "STM", get_date(1), get_date(5))
+        return HttpResponse(str(len(combinations)))
+
+    response = ServerTimingMiddleware(get_response)(RequestFactory().get("/"))
+    stages = dict(re.findall(r"(\w+);dur=([\d.]+)", response["Server-Timing"]))
+    # The legs are fetched and transformed on the legs pool threads
+    assert {"upstream", "transform", "sort", "total"} <= set(stages)
+
+    text = enabled_metrics.render()
+    assert (
+        'flightservice_upstream_request_seconds_count{provider="mock_airlines",status="200"} 2'
+        in text
+    )
+    assert 'flightservice_result_size_count{kind="leg_options"} 2' in text
+
+
+def test_disabled_metrics_record_nothing():
+    registry = Metrics(enabled=False)
+    with registry.stage("transform"):
+        pass
+    registry.observe_upstream("mock_airlines", 200, 0.1)
+    registry.observe_size("combinations", 10)
+    assert registry.histograms == {}
+
+
+def test_disabled_metrics_skip_middleware_and_endpoint(monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", False)
+    with pytest.raises(MiddlewareNotUsed):
+        ServerTimingMiddleware(lambda request: HttpResponse())
+    with pytest.raises(Http404):
+        MetricsView.as_view()(RequestFactory().get("/metrics"))
+
+
+def test_metrics_endpoint_includes_cache_stats(enabled_metrics):
+    # Registers the collectors of the caches
+    import airport.views  # noqa: F401
+    import flight.views  # noqa: F401
+
+    response = MetricsView.as_view()(RequestFactory().get("/metrics"))
+    text = response.content.decode()
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    for cache in ("flight_legs", "auth_tokens", "airports"):
+        assert (
+            f'flightservice_cache_requests_total{{cache="{cache}",result="hit"}}'
+            in text
+        )
+    assert (
+        'flightservice_coalesced_calls_total{call="searches",result="executed"}' in text
+    )
@@ -0,0 +1,11 @@
+import pytest
+
+from flight.utils import batch_calculations
+
+
+@pytest.fixture(autouse=True, params=["numpy", "python"])
+def calculations_backend(request, monkeypatch) -> str:
+    """Runs every test against both the NumPy and the pure Python calculations"""
+    if request.param == "python":
+        monkeypatch.setattr(batch_calculations, "np", None)
+    return request.param
@@ -0,0 +1,91 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import asyncio
+import pytest
+import time
+
+from flight.service.leg_cache import LegCache
+from flight.service.mock_airlines import (
+    MockAirlinesIncService,
+    UpstreamTimeoutException,
+)
+from flight.tests.conftest import CountingMockAirlineAPIConnector
+
+
+def test_async_search_fetches_legs_concurrently(search_dates: dict, iata_repository):
+    delay = 0.3
+    service = MockAirlinesIncService(
+        CountingMockAirlineAPIConnector(delay=delay), iata_repository
+    )
+
+    async def search():
+        return list(
+            await service.aiter_flight_combinations(
+                origin="GRU", destination="STM", **search_dates
+            )
+        )
+
+    start = time.perf_counter()
+    combinations = asyncio.run(search())
+    assert time.perf_counter() - start < delay * 1.8
+    assert [c.price for c in combinations] == sorted(c.price for c in combinations)
+    assert len(combinations) == 4
+
+
+def test_async_search_is_equal_to_sync_search(
+    search_dates: dict, api_connector, iata_repository
+):
+    service = MockAirlinesIncService(api_connector, iata_repository)
+
+    async def search():
+        return list(
+            await service.aiter_flight_combinations(
+                origin="GRU", destination="STM", limit=3, **search_dates
+            )
+        )
+
+    async_combinations = asyncio.run(search())
+    sync_combinations = service.search_flights(
+        origin="GRU", destination="STM", limit=3, **search_dates
+    )
+    assert [c.to_dict() for c in async_combinations] == [
+        c.to_dict() for c in sync_combinations
+    ]
+
+
+def test_async_search_raises_exception_when_deadline_is_exceeded(
+    search_dates: dict, iata_repository
+):
+    service = MockAirlinesIncService(
+        CountingMockAirlineAPIConnector(delay=1), iata_repository, search_timeout=0.1
+    )
+    with pytest.raises(UpstreamTimeoutException):
+        asyncio.run(
+            service.aiter_flight_combinations(
+                origin="GRU", destination="STM", **search_dates
+            )
+        )
+
+
+def test_async_search_uses_leg_cache(
+    search_dates: dict, api_connector, iata_repository
+):
+    leg_cache = LegCache(ttl=60, max_size=10)
+    service = MockAirlinesIncService(
+        api_connector, iata_repository, leg_cache=leg_cache
+    )
+
+    async def search_twice():
+        for _ in range(2):
+            await service.aiter_flight_combinations(
+                origin="GRU", destination="STM", **search_dates
+            )
+
+    asyncio.run(search_twice())
+    assert api_connector.calls == 2
+    assert leg_cache.stats()["hits"] == 2
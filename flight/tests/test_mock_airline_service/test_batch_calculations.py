@@ -0,0 +1,110 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import pytest
+import random
+
+from flight.entity.flight import Option
+from flight.service.mock_airlines import MockAirlinesIncService
+from flight.external.mock_airlines_inc_api import MockAirlineAPIConnector
+from flight.utils import batch_calculations
+from airport.repository.iata_repository import IataRepository
+
+
+@pytest.fixture
+def mock_airline_service() -> MockAirlinesIncService:
+    return MockAirlinesIncService(MockAirlineAPIConnector(), IataRepository())
+
+
+@pytest.fixture
+def api_data() -> dict:
+    rng = random.Random(7)
+    options = []
+    for _ in range(200):
+        departure_hour = rng.randint(0, 20)
+        options.append(
+            {
+                "departure_time": f"2023-08-15T{departure_hour:02}:00:00",
+                "arrival_time": f"2023-08-15T{departure_hour + rng.randint(1, 3):02}:{rng.choice([0, 15, 45]):02}:00",
+                "price": {
+                    "fare": rng.choice(
+                        [rng.randint(50, 3000), round(rng.uniform(50, 3000), 2)]
+                    ),
+                    "fees": 0,
+                    "total": 0,
+                },
+                "aircraft": {"model": "A 320", "manufacturer": "Airbus"},
+                "meta": {"range": 0, "cruise_speed_kmh": 0, "cost_per_km": 0},
+            }
+        )
+    return {
+        "summary": {
+            "departure_date": "2023-08-15",
+            "from": {
+                "iata": "GRU",
+                "city": "São Paulo",
+                "lat": -23.425669,
+                "lon": -46.481926,
+                "state": "SP",
+            },
+            "to": {
+                "iata": "STM",
+                "city": "Santarem",
+                "lat": -2.424886,
+                "lon": -54.78639,
+                "state": "PA",
+            },
+            "currency": "BRL",
+        },
+        "options": options,
+    }
+
+
+def test_extract_options_builds_one_option_per_api_option(
+    mock_airline_service: MockAirlinesIncService, api_data: dict
+):
+    options = mock_airline_service.extract_options(api_data)
+    assert len(options) == len(api_data["options"])
+    assert all(isinstance(option, Option) for option in options)
+
+
+def test_extract_options_is_equal_to_building_each_option(
+    mock_airline_service: MockAirlinesIncService, api_data: dict
+):
+    options = mock_airline_service.extract_options(api_data)
+    for option, api_option in zip(options, api_data["options"]):
+        price = mock_airline_service.build_price(fare=api_option["price"]["fare"])
+        meta = mock_airline_service.build_meta(
+            range=option.meta.range,
+            cruise_speed_kmh=0,
+            cost_per_km=0,
+            departure_time=api_option["departure_time"],
+            arrival_time=api_option["arrival_time"],
+            fare=price.fare,
+        )
+        assert option.to_dict()["price"] == price.to_dict()
+        assert option.to_dict()["meta"] == meta.to_dict()
+
+
+def test_numpy_and_python_calculations_are_identical(
+    mock_airline_service: MockAirlinesIncService, api_data: dict, monkeypatch
+):
+    if batch_calculations.np is None:
+        pytest.skip("NumPy is not installed")
+    numpy_options = mock_airline_service.extract_options(api_data)
+    monkeypatch.setattr(batch_calculations, "np", None)
+    python_options = mock_airline_service.extract_options(api_data)
+
+    for numpy_option, python_option in zip(numpy_options, python_options):
+        for attribute in ("fare", "fees", "total"):
+            assert getattr(numpy_option.price, attribute) == getattr(
+                python_option.price, attribute
+            )
+        for attribute in ("range", "cruise_speed_kmh", "cost_per_km"):
+            assert getattr(numpy_option.meta, attribute) == getattr(
+                python_option.meta, attribute
+            )
@@ -0,0 +1,97 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+from flight.service.flight_aggregator import (
+    FlightAggregatorService,
+    FlightProviderRegistry,
+)
+from flight.service import mock_airlines
+from flight.service.mock_airlines import MockAirlinesIncService
+from flight.tests.conftest import CountingMockAirlineAPIConnector, get_date
+
+
+class DatedFaresMockAirlineAPIConnector(CountingMockAirlineAPIConnector):
+    def get_fares(self, departure_date: str) -> tuple:
+        # Fares change with the date, so each pair has its own cheapest combination
+        day = int(departure_date[-2:])
+        return tuple(fare + day * 10 for fare in (900.0, 500.0, 700.0))
+
+
+def test_each_distinct_leg_is_fetched_once(iata_repository):
+    connector = DatedFaresMockAirlineAPIConnector()
+    registry = FlightProviderRegistry()
+    registry.register(
+        "mock_airlines", MockAirlinesIncService(connector, iata_repository)
+    )
+    grid = FlightAggregatorService(registry).search_date_grid(
+        origin="GRU",
+        destination="STM",
+        departure_date=get_date(5),
+        return_date=get_date(15),
+        days=3,
+    )
+    assert len(grid.cells) == 49
+    assert len(connector.legs) == 14
+    assert len(set(connector.legs)) == 14
+
+
+def test_each_pair_has_the_cheapest_combination_of_its_search(iata_repository):
+    connector = DatedFaresMockAirlineAPIConnector()
+    service = MockAirlinesIncService(connector, iata_repository)
+    dates = [(get_date(5), get_date(9)), (get_date(6), get_date(9))]
+    cheapest = service.get_cheapest_combinations("GRU", "STM", dates)
+
+    for departure_date, return_date in dates:
+        expected = service.search_flights(
+            origin="GRU",
+            destination="STM",
+            departure_date=departure_date,
+            return_date=return_date,
+            limit=1,
+        )[0]
+        assert cheapest[(departure_date, return_date)].to_dict() == expected.to_dict()
+
+
+def test_each_leg_is_ranked_once(iata_repository, monkeypatch):
+    service = MockAirlinesIncService(
+        DatedFaresMockAirlineAPIConnector(), iata_repository
+    )
+    ranked = []
+    get_cheapest_leg = service.get_cheapest_leg
+
+    def counting_get_cheapest_leg(flights):
+        ranked.append(flights.resume.departure_date)
+        return get_cheapest_leg(flights)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the legs must not be sorted for each pair")
+
+    monkeypatch.setattr(service, "get_cheapest_leg", counting_get_cheapest_leg)
+    monkeypatch.setattr(service, "mount_flight_combination", fail)
+    dates = [
+        (get_date(departure), get_date(arrival))
+        for departure in range(5, 12)
+        for arrival in range(15, 22)
+    ]
+    cheapest = service.get_cheapest_combinations("GRU", "STM", dates)
+    assert len(cheapest) == 49
+    assert len(ranked) == 14
+
+
+def test_grid_legs_are_not_fetched_on_the_search_legs_pool(
+    iata_repository, monkeypatch
+):
+    class UnusedExecutor:
+        def submit(self, *args, **kwargs):
+            raise AssertionError("the grid must not queue the searches legs")
+
+    monkeypatch.setattr(mock_airlines, "legs_executor", UnusedExecutor())
+    connector = DatedFaresMockAirlineAPIConnector()
+    service = MockAirlinesIncService(connector, iata_repository)
+    dates = [(get_date(5), get_date(9)), (get_date(6), get_date(9))]
+    assert all(service.get_cheapest_combinations("GRU", "STM", dates).values())
+    assert len(connector.legs) == 3
@@ -0,0 +1,115 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import pytest
+import random
+from datetime import datetime, timedelta
+
+from flight.entity.flight import Aircraft, Flight, Location, Meta, Option, Price, Summary
+from flight.service.mock_airlines import MockAirlinesIncService, ValidationException
+from flight.external.mock_airlines_inc_api import MockAirlineAPIConnector
+from airport.repository.iata_repository import IataRepository
+
+
+def build_flight(totals: list[float]) -> Flight:
+    location = Location("GRU", "São Paulo", -23.425669, -46.481926, "SP")
+    summary = Summary("2023-08-15", "BRL", location, location)
+    options = [
+        Option(
+            departure_time="2023-08-15T10:00:00",
+            arrival_time="2023-08-15T13:00:00",
+            price=Price(total, 0, total),
+            aircraft=Aircraft("A 320", "Airbus"),
+            meta=Meta(0, 0, 0),
+        )
+        for total in totals
+    ]
+    return Flight(resume=summary, options=options)
+
+
+@pytest.fixture
+def mock_airline_service() -> MockAirlinesIncService:
+    return MockAirlinesIncService(MockAirlineAPIConnector(), IataRepository())
+
+
+@pytest.fixture
+def outbound_totals():
+    rng = random.Random(1)
+    return [round(rng.uniform(100, 2000), 2) for _ in range(30)]
+
+
+@pytest.fixture
+def return_totals():
+    rng = random.Random(2)
+    return [round(rng.uniform(100, 2000), 2) for _ in range(25)]
+
+
+def test_flight_combinations_are_yielded_in_price_order(
+    mock_airline_service: MockAirlinesIncService,
+    outbound_totals: list[float],
+    return_totals: list[float],
+):
+    combinations = list(
+        mock_airline_service.mount_flight_combination(
+            build_flight(outbound_totals), build_flight(return_totals)
+        )
+    )
+    expected = sorted(o + r for o in outbound_totals for r in return_totals)
+    assert [c.price for c in combinations] == expected
+
+
+def test_flight_combinations_are_built_lazily(
+    mock_airline_service: MockAirlinesIncService,
+):
+    combinations = mock_airline_service.mount_flight_combination(
+        build_flight([300, 100, 200]), build_flight([50, 10])
+    )
+    cheapest = next(combinations)
+    assert cheapest.price == 110
+    assert cheapest.outbound_flight.flight_data["price"]["total"] == 100
+    assert cheapest.return_flight.flight_data["price"]["total"] == 10
+
+
+def test_flight_combinations_with_empty_leg_are_empty(
+    mock_airline_service: MockAirlinesIncService,
+):
+    combinations = mock_airline_service.mount_flight_combination(
+        build_flight([100]), build_flight([])
+    )
+    assert list(combinations) == []
+
+
+@pytest.mark.parametrize("limit, offset", [(-1, 0), (10, -1), ("10", 0)])
+def test_invalid_pagination_raises_exception(
+    mock_airline_service: MockAirlinesIncService, limit, offset
+):
+    with pytest.raises(ValidationException):
+        mock_airline_service.validate_pagination(limit=limit, offset=offset)
+
+
+def test_search_flights_returns_requested_page(
+    mock_airline_service: MockAirlinesIncService, monkeypatch
+):
+    monkeypatch.setattr(mock_airline_service, "validate_parameters", lambda **_: None)
+    monkeypatch.setattr(
+        mock_airline_service, "get_api_legs_data", lambda legs: [{}, {}]
+    )
+    legs = iter([build_flight([100, 300, 200]), build_flight([10, 30, 20])])
+    monkeypatch.setattr(
+        mock_airline_service, "transform_api_data", lambda flight_data: next(legs)
+    )
+    tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+
+    page = mock_airline_service.search_flights(
+        origin="GRU",
+        destination="STM",
+        departure_date=tomorrow,
+        return_date=tomorrow,
+        limit=3,
+        offset=2,
+    )
+    assert [c.price for c in page] == [130, 210, 220]
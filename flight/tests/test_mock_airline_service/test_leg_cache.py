@@ -0,0 +1,65 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import time
+
+from flight.service.leg_cache import LegCache
+from flight.service.mock_airlines import MockAirlinesIncService
+from flight.tests.conftest import CountingMockAirlineAPIConnector
+
+
+def test_service_fetches_each_leg_once_while_fresh(
+    api_connector: CountingMockAirlineAPIConnector, iata_repository
+):
+    leg_cache = LegCache(ttl=60, max_size=10)
+    service = MockAirlinesIncService(
+        api_connector, iata_repository, leg_cache=leg_cache
+    )
+    for _ in range(3):
+        service.get_api_flight_data("GRU", "STM", "2023-08-15")
+    service.get_api_flight_data("STM", "GRU", "2023-08-15")
+
+    assert api_connector.calls == 2
+    assert leg_cache.stats() == {"size": 2, "hits": 2, "stale_hits": 0, "misses": 2}
+
+
+def test_expired_leg_is_fetched_again():
+    leg_cache = LegCache(ttl=0, max_size=10)
+    leg_cache.get_or_fetch(("GRU", "STM", "2023-08-15"), lambda: {"call": 1})
+    data = leg_cache.get_or_fetch(("GRU", "STM", "2023-08-15"), lambda: {"call": 2})
+    assert data == {"call": 2}
+    assert leg_cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_leg_is_evicted():
+    leg_cache = LegCache(ttl=60, max_size=2)
+    leg_cache.get_or_fetch("a", lambda: {"leg": "a"})
+    leg_cache.get_or_fetch("b", lambda: {"leg": "b"})
+    leg_cache.get_or_fetch("a", lambda: {"leg": "a"})
+    leg_cache.get_or_fetch("c", lambda: {"leg": "c"})
+
+    assert list(leg_cache.entries) == ["a", "c"]
+
+
+def test_stale_leg_is_served_and_refreshed_in_background():
+    leg_cache = LegCache(ttl=0, max_size=10, stale_ttl=60)
+    leg_cache.set("a", {"version": 1})
+
+    def slow_fetch():
+        time.sleep(0.2)
+        return {"version": 2}
+
+    start = time.perf_counter()
+    data = leg_cache.get_or_fetch("a", slow_fetch)
+    assert time.perf_counter() - start < 0.2
+    assert data == {"version": 1}
+
+    deadline = time.monotonic() + 2
+    while leg_cache.entries["a"][0] != {"version": 2} and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert leg_cache.entries["a"][0] == {"version": 2}
+    assert leg_cache.stats()["stale_hits"] == 1
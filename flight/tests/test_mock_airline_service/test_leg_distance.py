@@ -0,0 +1,50 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import pytest
+
+from flight.service.mock_airlines import MockAirlinesIncService
+from flight.external.mock_airlines_inc_api import MockAirlineAPIConnector
+from flight.utils.haversine_formula import haversine_distance
+from airport.repository.iata_repository import IataRepository
+
+
+class FakeDistanceService:
+    def get_distance(self, origin: str, destination: str) -> float | None:
+        return 2500.5 if {origin, destination} == {"GRU", "STM"} else None
+
+    def get_distances_from(self, origin: str) -> dict[str, float]:
+        return {}
+
+
+@pytest.fixture
+def mock_airline_service() -> MockAirlinesIncService:
+    return MockAirlinesIncService(
+        MockAirlineAPIConnector(),
+        IataRepository(),
+        distance_service=FakeDistanceService(),
+    )
+
+
+def build_summary(origin: str, destination: str) -> dict:
+    return {
+        "from": {"iata": origin, "lat": -23.425669, "lon": -46.481926},
+        "to": {"iata": destination, "lat": -2.424886, "lon": -54.78639},
+    }
+
+
+def test_leg_distance_comes_from_distance_service(
+    mock_airline_service: MockAirlinesIncService,
+):
+    assert mock_airline_service.get_leg_distance(build_summary("GRU", "STM")) == 2500.5
+
+
+def test_unknown_leg_distance_is_calculated_from_summary(
+    mock_airline_service: MockAirlinesIncService,
+):
+    distance = mock_airline_service.get_leg_distance(build_summary("GRU", "XXX"))
+    assert distance == haversine_distance(-23.425669, -46.481926, -2.424886, -54.78639)
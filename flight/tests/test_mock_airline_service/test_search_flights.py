@@ -0,0 +1,120 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import pytest
+import time
+from datetime import datetime, timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from flight.entity.flight import FlightCombination
+from flight.service.mock_airlines import (
+    MockAirlinesIncService,
+    UpstreamTimeoutException,
+)
+from flight.external.mock_airlines_inc_api import MockAirlineAPIConnector
+from airport.repository.airport_repository import AirportRepository
+from airport.repository.iata_index_repository import IataIndexRepository
+from flight.tests.conftest import CountingMockAirlineAPIConnector, FakeIataRepository
+
+
+class FailingMockAirlineAPIConnector(MockAirlineAPIConnector):
+    def get_flights(self, origin: str, destination: str, departure_date: str) -> dict:
+        raise ConnectionError("Airline API is down")
+
+
+@pytest.fixture
+def departure_date():
+    return (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+@pytest.fixture
+def return_date():
+    return (datetime.now() + timedelta(days=5)).strftime("%Y-%m-%d")
+
+
+def test_search_flights_fetches_legs_concurrently(
+    departure_date: str, return_date: str
+):
+    delay = 0.5
+    service = MockAirlinesIncService(
+        CountingMockAirlineAPIConnector(delay=delay), FakeIataRepository()
+    )
+    start = time.perf_counter()
+    combinations = service.search_flights(
+        origin="GRU",
+        destination="STM",
+        departure_date=departure_date,
+        return_date=return_date,
+    )
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < delay * 1.8  # Sequential fetching would take at least 2x delay
+    assert len(combinations) == 4
+    assert all(isinstance(c, FlightCombination) for c in combinations)
+
+
+def test_get_api_legs_data_keeps_legs_order():
+    service = MockAirlinesIncService(
+        CountingMockAirlineAPIConnector(), FakeIataRepository()
+    )
+    legs_data = service.get_api_legs_data(
+        legs=[("GRU", "STM", "2023-08-10"), ("STM", "GRU", "2023-08-15")]
+    )
+    assert legs_data[0]["summary"]["from"]["iata"] == "GRU"
+    assert legs_data[1]["summary"]["departure_date"] == "2023-08-15"
+
+
+def test_search_flights_raises_exception_when_deadline_is_exceeded(
+    departure_date: str, return_date: str
+):
+    service = MockAirlinesIncService(
+        CountingMockAirlineAPIConnector(delay=1),
+        FakeIataRepository(),
+        search_timeout=0.1,
+    )
+    with pytest.raises(UpstreamTimeoutException):
+        service.search_flights(
+            origin="GRU",
+            destination="STM",
+            departure_date=departure_date,
+            return_date=return_date,
+        )
+
+
+def test_search_flights_propagates_upstream_exception(
+    departure_date: str, return_date: str
+):
+    service = MockAirlinesIncService(
+        FailingMockAirlineAPIConnector(), FakeIataRepository()
+    )
+    with pytest.raises(ConnectionError):
+        service.search_flights(
+            origin="GRU",
+            destination="STM",
+            departure_date=departure_date,
+            return_date=return_date,
+        )
+
+
+def test_search_flights_validation_does_not_query_the_database(
+    departure_date: str, return_date: str
+):
+    iata_repository = IataIndexRepository(
+        FakeIataRepository(), AirportRepository(FakeIataRepository())
+    )
+    iata_repository.get_iata_codes()  # Loads the index
+    service = MockAirlinesIncService(CountingMockAirlineAPIConnector(), iata_repository)
+
+    with CaptureQueriesContext(connection) as queries:
+        service.search_flights(
+            origin="GRU",
+            destination="STM",
+            departure_date=departure_date,
+            return_date=return_date,
+        )
+    assert len(queries) == 0
@@ -0,0 +1,133 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import asyncio
+import pytest
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from flight.service.mock_airlines import MockAirlinesIncService
+from flight.service.single_flight import SingleFlight
+from flight.tests.conftest import CountingMockAirlineAPIConnector
+
+
+def test_concurrent_calls_share_one_execution():
+    single_flight = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: single_flight.do("key", slow), range(8)))
+    assert results == ["result"] * 8
+    assert len(calls) == 1
+    assert single_flight.stats() == {"executed": 1, "coalesced": 7, "in_flight": 0}
+
+
+def test_exception_is_raised_to_every_caller():
+    single_flight = SingleFlight()
+
+    def failing():
+        time.sleep(0.2)
+        raise ValueError("upstream error")
+
+    def call(_):
+        with pytest.raises(ValueError):
+            single_flight.do("key", failing)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(call, range(4)))
+    assert single_flight.stats()["executed"] == 1
+    # The failed call isn't kept, the next caller retries it
+    assert single_flight.do("key", lambda: "retried") == "retried"
+
+
+def test_waiting_caller_gives_up_after_timeout():
+    single_flight = SingleFlight()
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        time.sleep(0.5)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        leader = executor.submit(single_flight.do, "key", slow)
+        started.wait()
+        with pytest.raises(TimeoutError):
+            single_flight.do("key", slow, timeout=0.05)
+        assert leader.result() == "result"
+
+
+def test_async_calls_share_one_execution_and_survive_cancellation():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return "result"
+
+    async def main():
+        leader = asyncio.create_task(single_flight.ado("key", slow))
+        await asyncio.sleep(0)
+        followers = [single_flight.ado("key", slow) for _ in range(4)]
+        leader.cancel()
+        return await asyncio.gather(*followers)
+
+    assert asyncio.run(main()) == ["result"] * 4
+    assert len(calls) == 1
+    assert single_flight.stats() == {"executed": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_concurrent_identical_searches_fetch_each_leg_once(
+    search_dates: dict, iata_repository
+):
+    connector = CountingMockAirlineAPIConnector(delay=0.2)
+    service = MockAirlinesIncService(connector, iata_repository)
+
+    def search(offset: int):
+        return service.search_flights(
+            origin="GRU", destination="STM", limit=2, offset=offset, **search_dates
+        )
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        pages = list(executor.map(search, [0, 2] * 3))
+    assert [len(page) for page in pages] == [2, 2] * 3
+    assert [c.to_dict() for c in pages[0]] == [c.to_dict() for c in pages[2]]
+    assert connector.calls == 2
+    assert service.coalescing_stats()["searches"]["coalesced"] == 5
+
+
+def test_concurrent_identical_async_searches_fetch_each_leg_once(
+    search_dates: dict, iata_repository
+):
+    connector = CountingMockAirlineAPIConnector(delay=0.2)
+    service = MockAirlinesIncService(connector, iata_repository)
+
+    async def search():
+        return list(
+            await service.aiter_flight_combinations(
+                origin="GRU", destination="STM", **search_dates
+            )
+        )
+
+    async def main():
+        return await asyncio.gather(*[search() for _ in range(5)])
+
+    results = asyncio.run(main())
+    assert [len(combinations) for combinations in results] == [4] * 5
+    assert connector.calls == 2
+    assert service.coalescing_stats()["searches"] == {
+        "executed": 1,
+        "coalesced": 4,
+        "in_flight": 0,
+    }
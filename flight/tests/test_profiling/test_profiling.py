@@ -0,0 +1,125 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import asyncio
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from flightservice import profiling, views
+from flightservice.profiling import RequestProfiler, profiled
+
+
+class FakeView:
+    @profiled("fake_list")
+    def list(self, request, size: int):
+        return Response(sorted(range(size), key=lambda n: -n), 200)
+
+    @profiled("fake_async_list")
+    async def alist(self, request, size: int):
+        await asyncio.sleep(0)
+        return Response(sorted(range(size), key=lambda n: -n), 200)
+
+
+@pytest.fixture
+def cache() -> LocMemCache:
+    cache = LocMemCache("profiles", {})
+    cache.clear()
+    return cache
+
+
+@pytest.fixture
+def profiler(cache, monkeypatch) -> RequestProfiler:
+    profiler = RequestProfiler(enabled=True, max_profiles=2, cache=cache)
+    monkeypatch.setattr(profiling, "request_profiler", profiler)
+    monkeypatch.setattr(views, "request_profiler", profiler)
+    return profiler
+
+
+def build_request(is_staff: bool, profile_header: bool = True):
+    headers = {"HTTP_X_PROFILE": "1"} if profile_header else {}
+    request = APIRequestFactory().get("/flight/consult?limit=1", **headers)
+    request.user = User(username="profiled_user", is_staff=is_staff)
+    return request
+
+
+def test_staff_request_is_profiled_and_stored(profiler: RequestProfiler):
+    response = FakeView().list(build_request(is_staff=True), size=1000)
+    assert response.data[0] == 999
+
+    info, data = profiler.get_profile(response["X-Profile-Id"])
+    assert info["view"] == "fake_list"
+    assert info["path"] == "/flight/consult?limit=1"
+    assert info["status"] == 200
+    assert profiler.list_profiles() == [info]
+    assert "<lambda>" in profiler.get_summary(data)
+
+
+def test_async_staff_request_is_profiled_and_stored(profiler: RequestProfiler):
+    response = asyncio.run(FakeView().alist(build_request(is_staff=True), size=1000))
+    assert response.data[0] == 999
+
+    info, data = profiler.get_profile(response["X-Profile-Id"])
+    assert info["view"] == "fake_async_list"
+    assert "<lambda>" in profiler.get_summary(data)
+
+
+def test_profile_header_of_other_users_is_ignored(profiler: RequestProfiler):
+    response = FakeView().list(build_request(is_staff=False), size=10)
+    assert "X-Profile-Id" not in response
+    assert profiler.list_profiles() == []
+
+
+def test_sample_rate_is_shared_by_every_worker(profiler: RequestProfiler, cache):
+    other_worker = RequestProfiler(enabled=True, refresh_interval=0, cache=cache)
+    profiler.set_sample_rate(1)
+
+    assert other_worker.should_profile(build_request(False, profile_header=False))
+    response = FakeView().list(build_request(False, profile_header=False), size=10)
+    assert "X-Profile-Id" in response
+
+
+def test_only_the_last_profiles_are_kept(profiler: RequestProfiler):
+    ids = [
+        FakeView().list(build_request(is_staff=True), size=10)["X-Profile-Id"]
+        for _ in range(3)
+    ]
+    assert [profile["id"] for profile in profiler.list_profiles()] == ids[:0:-1]
+    assert profiler.get_profile(ids[0]) is None
+
+
+def test_disabled_profiler_runs_the_view_as_is(profiler: RequestProfiler):
+    profiler.enabled = False
+    response = FakeView().list(build_request(is_staff=True), size=10)
+    assert "X-Profile-Id" not in response
+
+
+def test_profiles_are_downloaded_by_staff_users(profiler: RequestProfiler):
+    profile_id = FakeView().list(build_request(is_staff=True), size=10)["X-Profile-Id"]
+    factory = APIRequestFactory()
+
+    request = factory.get(f"/profiles/{profile_id}")
+    force_authenticate(request, user=User(username="user", is_staff=False))
+    assert views.ProfileDetailView.as_view()(request, profile_id).status_code == 403
+
+    request = factory.get(f"/profiles/{profile_id}")
+    force_authenticate(request, user=User(username="admin", is_staff=True))
+    response = views.ProfileDetailView.as_view()(request, profile_id=profile_id)
+    assert response.status_code == 200
+    assert response["Content-Disposition"].endswith(f'"{profile_id}.prof"')
+
+    for body in ({"sample_rate": 2}, [], "0.1"):
+        request = factory.post("/profiles", body, format="json")
+        force_authenticate(request, user=User(username="admin", is_staff=True))
+        assert views.ProfileListView.as_view()(request).status_code == 400
+
+    request = factory.post("/profiles", {"sample_rate": 0.1}, format="json")
+    force_authenticate(request, user=User(username="admin", is_staff=True))
+    assert views.ProfileListView.as_view()(request).status_code == 200
+    assert profiler.get_sample_rate() == 0.1
@@ -0,0 +1,150 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import pytest
+import time
+
+from flight.service.flight_aggregator import FlightProviderRegistry
+from flight.service.leg_cache import LegCache
+from flight.service.mock_airlines import MockAirlinesIncService
+from flight.service.route_popularity import RoutePopularityTracker
+from flight.service.route_prewarmer import RoutePrewarmer
+from flight.tests.conftest import get_date
+
+
+@pytest.fixture
+def service(api_connector, iata_repository) -> MockAirlinesIncService:
+    return MockAirlinesIncService(
+        api_connector, iata_repository, leg_cache=LegCache(ttl=60, max_size=10)
+    )
+
+
+@pytest.fixture
+def tracker() -> RoutePopularityTracker:
+    return RoutePopularityTracker(half_life=600)
+
+
+def build_prewarmer(service, tracker, budget: int = 20) -> RoutePrewarmer:
+    registry = FlightProviderRegistry()
+    registry.register("mock_airlines", service)
+    return RoutePrewarmer(registry, tracker, top_routes=10, interval=5, budget=budget)
+
+
+def test_routes_are_ranked_by_search_count(tracker: RoutePopularityTracker):
+    popular = ("GRU", "STM", get_date(1), get_date(5))
+    other = ("GRU", "GIG", get_date(1), get_date(5))
+    for _ in range(3):
+        tracker.record(popular)
+    tracker.record(other)
+
+    assert tracker.top(2) == [(popular, pytest.approx(3)), (other, pytest.approx(1))]
+    assert tracker.top(1) == [(popular, pytest.approx(3))]
+
+
+def test_older_searches_count_less(monkeypatch):
+    tracker = RoutePopularityTracker(half_life=10)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    tracker.record(("GRU", "STM", "2030-01-01", "2030-01-05"))
+    tracker.record(("GRU", "STM", "2030-01-01", "2030-01-05"))
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 20)
+    tracker.record(("GRU", "GIG", "2030-01-01", "2030-01-05"))
+    assert tracker.top(2) == [
+        (("GRU", "GIG", "2030-01-01", "2030-01-05"), pytest.approx(1)),
+        (("GRU", "STM", "2030-01-01", "2030-01-05"), pytest.approx(0.5)),
+    ]
+
+
+def test_least_popular_routes_are_dropped():
+    tracker = RoutePopularityTracker(max_routes=10)
+    for day in range(11):
+        route = ("GRU", "STM", f"2030-01-{day + 1:02}", "2030-02-01")
+        for _ in range(day + 1):
+            tracker.record(route)
+    assert len(tracker.scores) <= 10
+    assert ("GRU", "STM", "2030-01-01", "2030-02-01") not in tracker.scores
+    assert tracker.top(1)[0][0] == ("GRU", "STM", "2030-01-11", "2030-02-01")
+
+
+def test_prewarmed_search_is_served_without_upstream_calls(
+    service, api_connector, tracker
+):
+    route = ("GRU", "STM", get_date(1), get_date(5))
+    tracker.record(route)
+    assert build_prewarmer(service, tracker).run_once() == 2
+    assert api_connector.calls == 2
+
+    combinations = service.search_flights(*route)
+    assert len(combinations) == 4
+    assert api_connector.calls == 2
+
+
+def test_prewarmed_legs_are_transformed_once(service, tracker, monkeypatch):
+    route = ("GRU", "STM", get_date(1), get_date(5))
+    tracker.record(route)
+    build_prewarmer(service, tracker).run_once()
+
+    def fail(flight_data):
+        raise AssertionError("warm legs must not be transformed again")
+
+    monkeypatch.setattr(service, "transform_api_data", fail)
+    assert len(service.search_flights(*route)) == 4
+
+
+def test_fresh_legs_are_not_fetched_again(service, api_connector, tracker):
+    tracker.record(("GRU", "STM", get_date(1), get_date(5)))
+    prewarmer = build_prewarmer(service, tracker)
+    prewarmer.run_once()
+    assert prewarmer.run_once() == 0
+    assert api_connector.calls == 2
+
+
+def test_legs_about_to_expire_are_refreshed(api_connector, iata_repository, tracker):
+    # Every leg expires before the next run
+    service = MockAirlinesIncService(
+        api_connector, iata_repository, leg_cache=LegCache(ttl=1, max_size=10)
+    )
+    tracker.record(("GRU", "STM", get_date(1), get_date(5)))
+    prewarmer = build_prewarmer(service, tracker)
+    prewarmer.run_once()
+    assert prewarmer.run_once() == 2
+    assert api_connector.calls == 4
+
+
+def test_upstream_calls_stay_within_budget(service, api_connector, tracker):
+    for _ in range(2):
+        tracker.record(("GRU", "STM", get_date(1), get_date(5)))
+    tracker.record(("GRU", "GIG", get_date(1), get_date(5)))
+
+    assert build_prewarmer(service, tracker, budget=3).run_once() == 3
+    assert api_connector.calls == 3
+    # The most popular route is warmed first
+    assert service.leg_cache.expires_in(("STM", "GRU", get_date(5))) is not None
+    assert service.leg_cache.expires_in(("GIG", "GRU", get_date(5))) is None
+
+
+def test_past_routes_are_forgotten(service, api_connector, tracker):
+    tracker.record(("GRU", "STM", get_date(-2), get_date(5)))
+    assert build_prewarmer(service, tracker).run_once() == 0
+    assert api_connector.calls == 0
+    assert tracker.top(1) == []
+
+
+def test_prewarmer_runs_in_background(service, api_connector, tracker):
+    tracker.record(("GRU", "STM", get_date(1), get_date(5)))
+    prewarmer = build_prewarmer(service, tracker)
+    prewarmer.interval = 0.01
+    prewarmer.start()
+    try:
+        deadline = time.monotonic() + 2
+        while prewarmer.runs == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        prewarmer.stop(timeout=2)
+    assert prewarmer.runs > 0
+    assert api_connector.calls == 2
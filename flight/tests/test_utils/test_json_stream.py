@@ -0,0 +1,96 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import json
+import pytest
+from django.contrib.auth.models import User
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from flight.entity.flight import Aircraft, Flight, Location, Meta, Option, Price, Summary
+from flight.service.mock_airlines import MockAirlinesIncService
+from flight.external.mock_airlines_inc_api import MockAirlineAPIConnector
+from flight.utils.json_stream import stream_flight_combinations
+from flight.views import FlightsListAPIView
+from airport.repository.iata_repository import IataRepository
+
+
+def build_flight(totals: list[float]) -> Flight:
+    origin = Location("GRU", "São Paulo", -23.425669, -46.481926, "SP")
+    destination = Location("STM", "Santarem", -2.424886, -54.78639, "PA")
+    options = [
+        Option(
+            departure_time="2023-08-15T10:00:00",
+            arrival_time="2023-08-15T13:00:00",
+            price=Price(total / 1.1, total / 11, total),
+            aircraft=Aircraft("A 320", "Airbus"),
+            meta=Meta(2500.5, 833.5, total / 2500.5),
+        )
+        for total in totals
+    ]
+    return Flight(Summary("2023-08-15", "BRL", origin, destination), options)
+
+
+@pytest.fixture
+def mock_airline_service() -> MockAirlinesIncService:
+    return MockAirlinesIncService(MockAirlineAPIConnector(), IataRepository())
+
+
+@pytest.fixture
+def flight_combinations(mock_airline_service: MockAirlinesIncService) -> list:
+    return list(
+        mock_airline_service.mount_flight_combination(
+            build_flight([1507.741, 300.5, 800]), build_flight([1865.4133, 99.99])
+        )
+    )
+
+
+def test_stream_is_equal_to_serialized_combinations(flight_combinations: list):
+    content = b"".join(stream_flight_combinations(flight_combinations, chunk_size=4))
+    assert json.loads(content) == [c.to_dict() for c in flight_combinations]
+
+
+def test_stream_yields_one_chunk_per_chunk_size(flight_combinations: list):
+    chunks = list(stream_flight_combinations(flight_combinations, chunk_size=2))
+    assert len(chunks) == 4  # 6 combinations in chunks of 2 plus the closing bracket
+
+
+def test_stream_of_no_combinations_is_an_empty_list():
+    assert b"".join(stream_flight_combinations([])) == b"[]"
+
+
+def test_streaming_view_returns_same_data_as_regular_view(
+    flight_combinations: list, monkeypatch
+):
+    monkeypatch.setattr(
+        MockAirlinesIncService,
+        "iter_flight_combinations",
+        lambda self, **kwargs: iter(flight_combinations),
+    )
+    monkeypatch.setattr(
+        MockAirlinesIncService, "validate_parameters", lambda self, **kwargs: None
+    )
+    view = FlightsListAPIView.as_view()
+    factory = APIRequestFactory()
+    url_kwargs = {
+        "origin": "gru",
+        "destination": "stm",
+        "departure_date": "2023-08-11",
+        "return_date": "2023-08-15",
+    }
+
+    responses = []
+    for query in ("", "?stream=true"):
+        request = factory.get(f"/flight/consult/GRU/STM/2023-08-11/2023-08-15{query}")
+        force_authenticate(request, user=User(username="john_doe"))
+        responses.append(view(request, **url_kwargs))
+    regular, streaming = responses
+    regular.render()
+
+    assert streaming.streaming
+    assert json.loads(b"".join(streaming.streaming_content)) == json.loads(
+        regular.content
+    )
@@ -0,0 +1,85 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import asyncio
+import json
+import pytest
+from django.test import RequestFactory
+
+from flight.entity.flight import (
+    Aircraft,
+    FlightCombination,
+    Location,
+    Meta,
+    Option,
+    OutboundFlight,
+    Price,
+    Summary,
+)
+from flight.service.flight_aggregator import AggregatedSearch
+from flight.views import AsyncFlightsListView, flight_aggregator_service
+
+URL_KWARGS = {
+    "origin": "gru",
+    "destination": "stm",
+    "departure_date": "2023-08-11",
+    "return_date": "2023-08-15",
+}
+
+
+def build_combination(price: float) -> FlightCombination:
+    location = Location("GRU", "São Paulo", -23.425669, -46.481926, "SP")
+    option = Option(
+        departure_time="2023-08-15T10:00:00",
+        arrival_time="2023-08-15T13:00:00",
+        price=Price(price / 2, 0, price / 2),
+        aircraft=Aircraft("A 320", "Airbus"),
+        meta=Meta(0, 0, 0),
+    )
+    leg = OutboundFlight(Summary("2023-08-15", "BRL", location, location), option)
+    return FlightCombination(price=price, outbound_flight=leg, return_flight=leg)
+
+
+@pytest.fixture
+def authenticated(monkeypatch):
+    monkeypatch.setattr(AsyncFlightsListView, "authenticate", lambda self, r: None)
+
+
+def get(query: str = ""):
+    request = RequestFactory().get(
+        f"/flight/consult/GRU/STM/2023-08-11/2023-08-15{query}"
+    )
+    return asyncio.run(AsyncFlightsListView.as_view()(request, **URL_KWARGS))
+
+
+def test_async_view_requires_token():
+    response = get()
+    assert response.status_code == 401
+
+
+def test_async_view_returns_combinations(authenticated, monkeypatch):
+    async def asearch_flights(**kwargs):
+        combinations = [build_combination(100), build_combination(200)]
+        return AggregatedSearch(iter(combinations), {"mock_airlines": {"status": "ok"}})
+
+    monkeypatch.setattr(flight_aggregator_service, "asearch_flights", asearch_flights)
+    response = get()
+
+    assert response.status_code == 200
+    assert [c["price"] for c in json.loads(response.content)] == [100, 200]
+
+
+def test_async_view_returns_timeout_when_no_airline_answers(authenticated, monkeypatch):
+    async def asearch_flights(**kwargs):
+        return AggregatedSearch(iter([]), {"mock_airlines": {"status": "timeout"}})
+
+    monkeypatch.setattr(flight_aggregator_service, "asearch_flights", asearch_flights)
+    assert get().status_code == 504
+
+
+def test_async_view_validates_pagination(authenticated):
+    assert get("?limit=abc").status_code == 400
@@ -0,0 +1,106 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import pytest
+from datetime import datetime, timedelta
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from airport.repository.airport_repository import AirportRepository
+from airport.repository.iata_repository import IataRepository
+from flight import views
+from flight.tests.conftest import AIRPORTS, build_flight_data
+
+
+def get_flights(origin: str, destination: str, departure_date: str) -> dict:
+    return build_flight_data(origin, destination, departure_date, fares=(500.0,))
+
+
+pytestmark = pytest.mark.usefixtures("db")
+
+
+@pytest.fixture
+def token() -> Token:
+    AirportRepository(IataRepository()).update_airports(
+        [
+            {
+                "iata": iata,
+                "city": airport["city"],
+                "latitude": airport["lat"],
+                "longitude": airport["lon"],
+                "state": airport["state"],
+            }
+            for iata, airport in AIRPORTS.items()
+        ]
+    )
+    user = User.objects.create(username="flights_list_user")
+    return Token.objects.create(user=user)
+
+
+def test_cached_search_does_not_query_the_database(token: Token, monkeypatch):
+    monkeypatch.setattr(views.mock_airline_api_connector, "get_flights", get_flights)
+    # Reads the airports version the fixture just bumped
+    views.iata_index_repository.iata_codes.expire()
+    views.airport_distance_service.coordinates.expire()
+    departure_date = (datetime.now() + timedelta(days=3)).strftime("%Y-%m-%d")
+    return_date = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
+    url_kwargs = {
+        "origin": "GRU",
+        "destination": "STM",
+        "departure_date": departure_date,
+        "return_date": return_date,
+    }
+
+    def search():
+        request = APIRequestFactory().get(
+            f"/flight/consult/GRU/STM/{departure_date}/{return_date}",
+            HTTP_AUTHORIZATION=f"Token {token.key}",
+        )
+        return views.FlightsListAPIView.as_view()(request, **url_kwargs)
+
+    assert search().status_code == 200  # Warms up every cache
+    with CaptureQueriesContext(connection) as queries:
+        response = search()
+    assert response.status_code == 200
+    assert len(response.data) == 1
+    assert len(queries) == 0
+
+
+def test_date_grid_returns_the_cheapest_combination_of_each_pair(
+    token: Token, monkeypatch
+):
+    monkeypatch.setattr(views.mock_airline_api_connector, "get_flights", get_flights)
+    views.iata_index_repository.iata_codes.expire()
+    views.airport_distance_service.coordinates.expire()
+    departure_date = (datetime.now() + timedelta(days=3)).strftime("%Y-%m-%d")
+    return_date = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
+    request = APIRequestFactory().get(
+        f"/flight/grid/GRU/STM/{departure_date}/{return_date}",
+        {"days": 1},
+        HTTP_AUTHORIZATION=f"Token {token.key}",
+    )
+    response = views.FlightsDateGridAPIView.as_view()(
+        request,
+        origin="GRU",
+        destination="STM",
+        departure_date=departure_date,
+        return_date=return_date,
+    )
+    assert response.status_code == 200
+    assert response.data["providers"] == {"mock_airlines": {"status": "ok"}}
+    assert len(response.data["cells"]) == 9
+    cell = response.data["cells"][4]
+    assert (cell["departure_date"], cell["return_date"]) == (
+        departure_date,
+        return_date,
+    )
+    assert cell["combination"]["outbound_flight"]["departure_time"] == (
+        f"{departure_date}T10:00:00"
+    )
@@ -0,0 +1,123 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import pytest
+import requests
+import threading
+from django.conf import settings
+
+import airport.views
+import flight.views
+from flightservice import warm_up
+
+
+class FailingSession:
+    def __init__(self):
+        self.calls = 0
+
+    def head(self, url: str, **kwargs):
+        self.calls += 1
+        raise requests.ConnectionError("Connection refused")
+
+
+class FakeConnector:
+    base_url = "http://airline.test"
+
+    def __init__(self):
+        self.session = FailingSession()
+
+
+class CountingPrewarmer:
+    def __init__(self):
+        self.starts = 0
+
+    def start(self) -> None:
+        self.starts += 1
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    monkeypatch.setattr(settings, "WARM_START", True)
+    monkeypatch.setattr(settings, "FLIGHT_PREWARM_ENABLED", True)
+    connector = FakeConnector()
+    prewarmer = CountingPrewarmer()
+    monkeypatch.setattr(flight.views, "mock_airline_api_connector", connector)
+    monkeypatch.setattr(flight.views, "route_prewarmer", prewarmer)
+    monkeypatch.setattr(warm_up, "_worker_pid", None)
+    return connector, prewarmer
+
+
+def join_http_warm_up() -> None:
+    for thread in threading.enumerate():
+        if thread.name == "http-warm-up":
+            thread.join()
+
+
+def test_worker_is_started_once_per_process(worker, monkeypatch):
+    connector, prewarmer = worker
+    warm_up.start_worker()
+    warm_up.start_worker()
+    assert prewarmer.starts == 1
+    join_http_warm_up()
+    # The airline API being down doesn't stop the worker from starting
+    assert connector.session.calls == 1
+
+    # A forked worker has another pid
+    monkeypatch.setattr(os, "getpid", lambda: -1)
+    warm_up.start_worker()
+    assert prewarmer.starts == 2
+
+
+def test_worker_start_does_not_wait_for_the_airline_api(worker):
+    connector, prewarmer = worker
+    answer = threading.Event()
+    connector.session.head = lambda url, **kwargs: answer.wait()
+    warm_up.start_worker()
+    assert prewarmer.starts == 1
+    answer.set()
+    join_http_warm_up()
+
+
+@pytest.mark.parametrize("preload_app, worker_starts", [(False, 1), (True, 0)])
+def test_server_warms_up_and_starts_the_worker_unless_preloaded(
+    monkeypatch, preload_app, worker_starts
+):
+    calls = []
+    monkeypatch.setattr(settings, "WARM_START", True)
+    monkeypatch.setattr(settings, "SERVER_PRELOAD_APP", preload_app)
+    monkeypatch.setattr(warm_up, "warm_up_state", lambda: calls.append("state"))
+    monkeypatch.setattr(warm_up, "start_worker", lambda: calls.append("worker"))
+    warm_up.start_server()
+    assert calls == ["state"] + ["worker"] * worker_starts
+
+
+def test_loading_the_apps_does_not_start_the_worker():
+    # Management commands only load the apps, the servers load flightservice.wsgi/asgi
+    assert warm_up._worker_pid != os.getpid()
+
+
+def test_warm_up_loads_the_airports_state(monkeypatch):
+    loaded = []
+    for module, name, method in (
+        (flight.views, "iata_index_repository", "get_iata_codes"),
+        (airport.views, "airport_cache_repository", "get_entry"),
+        (flight.views, "airport_distance_service", "get_coordinates"),
+        (airport.views, "nearby_airports_service", "get_index"),
+    ):
+        monkeypatch.setattr(
+            getattr(module, name), method, lambda method=method: loaded.append(method)
+        )
+    warm_up.warm_up_state()
+    assert loaded == ["get_iata_codes", "get_entry", "get_coordinates", "get_index"]
+
+
+def test_warm_up_failure_is_left_to_the_requests(monkeypatch):
+    def fail():
+        raise RuntimeError("no such table: airport_airport")
+
+    monkeypatch.setattr(flight.views.iata_index_repository, "get_iata_codes", fail)
+    warm_up.warm_up_state()
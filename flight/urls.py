@@ -1,10 +1,28 @@
+from django.conf import settings
 from django.urls import path
 
-from flight.views import FlightsListAPIView
+from flight.views import (
+    AsyncFlightsListView,
+    FlightsDateGridAPIView,
+    FlightsListAPIView,
+    FlightsSearchAPIView,
+)
+
+flights_list_view = (
+    AsyncFlightsListView if settings.FLIGHT_ASYNC_SEARCH else FlightsListAPIView
+)
 
 urlpatterns = [
     path(
         "consult/<str:origin>/<str:destination>/<str:departure_date>/<str:return_date>",
-        FlightsListAPIView.as_view(),
+        flights_list_view.as_view(),
+    ),
+    path(
+        "search/<str:origin>/<str:destination>/<str:departure_date>/<str:return_date>",
+        FlightsSearchAPIView.as_view(),
+    ),
+    path(
+        "grid/<str:origin>/<str:destination>/<str:departure_date>/<str:return_date>",
+        FlightsDateGridAPIView.as_view(),
     ),
 ]
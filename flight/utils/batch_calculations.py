@@ -0,0 +1,54 @@
+"""Calculations over all the options of a flight leg at once.
+
+NumPy is used when available, otherwise the pure Python implementation produces the same results.
+"""
+
+from flight.utils.calculate_cost_per_km import calculate_cost_per_km
+from flight.utils.calculate_flight_speed import calculate_flight_speed
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def calculate_fees(
+    fares: list[float], fee_rate: float, minimum_fee: float
+) -> tuple[list[float], list[float]]:
+    """Returns the fees and totals of the fares, the fee being `fee_rate` of the fare but never less than `minimum_fee`"""
+    if np is None:
+        fees = [max(round(fare * fee_rate, 4), minimum_fee) for fare in fares]
+        totals = [fare + fee for fare, fee in zip(fares, fees)]
+        return fees, totals
+
+    fares_array = np.asarray(fares, dtype=np.float64)
+    # Python's round is used so both implementations round halfway cases the same way
+    rounded_fees = [round(fee, 4) for fee in (fares_array * fee_rate).tolist()]
+    fees_array = np.maximum(np.asarray(rounded_fees, dtype=np.float64), minimum_fee)
+    return fees_array.tolist(), (fares_array + fees_array).tolist()
+
+
+def calculate_flight_speeds(
+    distance: float, departure_times: list[str], arrival_times: list[str]
+) -> list[float]:
+    if np is None:
+        return [
+            calculate_flight_speed(distance, departure_time, arrival_time)
+            for departure_time, arrival_time in zip(departure_times, arrival_times)
+        ]
+
+    departures = np.asarray(departure_times, dtype="datetime64[s]")
+    arrivals = np.asarray(arrival_times, dtype="datetime64[s]")
+    time_diff_hours = (arrivals - departures).astype(np.float64) / 3600
+    if not time_diff_hours.all():
+        raise ZeroDivisionError("float division by zero")
+    return (distance / time_diff_hours).tolist()
+
+
+def calculate_costs_per_km(fares: list[float], distance: float) -> list[float]:
+    if np is None:
+        return [calculate_cost_per_km(fare, distance) for fare in fares]
+
+    if distance == 0:
+        raise ZeroDivisionError("float division by zero")
+    return (np.asarray(fares, dtype=np.float64) / distance).tolist()
@@ -0,0 +1,40 @@
+import json
+from typing import Iterable, Iterator
+
+from flight.entity.flight import FlightCombination, OutboundFlight
+
+
+def dumps(data) -> str:
+    # Same output format as the rest_framework JSONRenderer
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def stream_flight_combinations(
+    flight_combinations: Iterable[FlightCombination], chunk_size: int = 100
+) -> Iterator[bytes]:
+    """Encodes the flight combinations as a JSON list, yielding chunks of `chunk_size` combinations.
+
+    Each leg option is encoded only once and its JSON fragment is reused by every combination.
+    """
+    fragments: dict[int, str] = {}
+
+    def leg_fragment(leg: OutboundFlight) -> str:
+        fragment = fragments.get(id(leg))
+        if fragment is None:
+            fragment = fragments[id(leg)] = dumps(leg.flight_data)
+        return fragment
+
+    chunk = ["["]
+    separator = ""
+    for i, combination in enumerate(flight_combinations, start=1):
+        chunk.append(
+            f'{separator}{{"price":{dumps(round(combination.price, 4))},'
+            f'"outbound_flight":{leg_fragment(combination.outbound_flight)},'
+            f'"return_flight":{leg_fragment(combination.return_flight)}}}'
+        )
+        separator = ","
+        if i % chunk_size == 0:
+            yield "".join(chunk).encode()
+            chunk = []
+    chunk.append("]")
+    yield "".join(chunk).encode()
@@ -0,0 +1,11 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def redact_api_key(message: str) -> str:
+    """Method used to strip the airline API key from a message, e.g. the URL of a failed request"""
+    api_key = os.getenv("API_KEY", "")
+    return message.replace(api_key, "***") if api_key else message
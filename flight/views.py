@@ -1,15 +1,252 @@
-from rest_framework.authentication import TokenAuthentication
+from asgiref.sync import sync_to_async
+from typing import Iterator
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework import exceptions
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.generics import ListAPIView
 from rest_framework.response import Response
 
-from flight.service.mock_airlines import MockAirlinesIncService, ValidationException
+from flight.service.flight_adapter import (
+    UpstreamTimeoutException,
+    ValidationException,
+)
+from flight.service.flight_aggregator import (
+    AggregatedDateGrid,
+    AggregatedSearch,
+    FlightAggregatorService,
+    FlightProviderRegistry,
+)
+from flight.service.mock_airlines import MockAirlinesIncService
+from flight.service.route_popularity import RoutePopularityTracker
+from flight.service.route_prewarmer import RoutePrewarmer
 from flight.external.mock_airlines_inc_api import MockAirlineAPIConnector
+from flight.entity.flight import FlightCombination
+from flight.service.leg_cache import LegCache
+from flight.utils.json_stream import stream_flight_combinations
+from airport.repository.airport_repository import AirportRepository
+from airport.repository.airports_version import airports_version_watcher
+from airport.repository.iata_index_repository import IataIndexRepository
 from airport.repository.iata_repository import IataRepository
+from airport.service.distance_service import AirportDistanceService
+from flightservice.metrics import metrics
+from flightservice.profiling import profiled
+from user.authentication import CachedTokenAuthentication
+
+# Connectors are shared across requests so the pooled HTTP connections are reused
+mock_airline_api_connector = MockAirlineAPIConnector()
+mock_airline_leg_cache = LegCache(
+    ttl=settings.FLIGHT_LEG_CACHE_TTL,
+    max_size=settings.FLIGHT_LEG_CACHE_MAX_SIZE,
+    stale_ttl=settings.FLIGHT_LEG_CACHE_STALE_TTL,
+)
+airport_distance_service = AirportDistanceService(
+    AirportRepository(IataRepository()),
+    version_watcher=airports_version_watcher,
+)
+# Validates the requested airports without querying the database on every search
+iata_index_repository = IataIndexRepository(
+    IataRepository(),
+    AirportRepository(IataRepository()),
+    version_watcher=airports_version_watcher,
+)
+
+mock_airlines_service = MockAirlinesIncService(
+    mock_airline_api_connector,
+    iata_index_repository,
+    leg_cache=mock_airline_leg_cache,
+    distance_service=airport_distance_service,
+)
+# Every registered airline is searched concurrently
+flight_providers = FlightProviderRegistry()
+flight_providers.register("mock_airlines", mock_airlines_service)
+flight_aggregator_service = FlightAggregatorService(
+    flight_providers, provider_timeout=settings.FLIGHT_PROVIDER_TIMEOUT
+)
+
+# Fed by the searches, started by flightservice.warm_up.start_worker in the server processes
+# when FLIGHT_PREWARM_ENABLED is set
+route_popularity_tracker = RoutePopularityTracker(
+    half_life=settings.FLIGHT_ROUTE_POPULARITY_HALF_LIFE,
+    max_routes=settings.FLIGHT_ROUTE_POPULARITY_MAX_ROUTES,
+)
+route_prewarmer = RoutePrewarmer(
+    flight_providers,
+    route_popularity_tracker,
+    top_routes=settings.FLIGHT_PREWARM_TOP_ROUTES,
+    interval=settings.FLIGHT_PREWARM_INTERVAL,
+    budget=settings.FLIGHT_PREWARM_BUDGET,
+    jitter=settings.FLIGHT_PREWARM_JITTER,
+)
+
+
+def collect_flight_metrics() -> list:
+    leg_cache = mock_airline_leg_cache.stats()
+    coalescing = mock_airlines_service.coalescing_stats()
+    prewarmer = route_prewarmer.stats()
+    return [
+        (
+            "cache_requests_total",
+            "counter",
+            "Requests to the in-process caches, by result",
+            [
+                ({"cache": "flight_legs", "result": result}, leg_cache[key])
+                for result, key in (
+                    ("hit", "hits"),
+                    ("stale_hit", "stale_hits"),
+                    ("miss", "misses"),
+                )
+            ],
+        ),
+        (
+            "cache_entries",
+            "gauge",
+            "Entries kept by the in-process caches",
+            [({"cache": "flight_legs"}, leg_cache["size"])],
+        ),
+        (
+            "coalesced_calls_total",
+            "counter",
+            "Searches and leg fetches that ran, or joined an identical call in flight",
+            [
+                ({"call": call, "result": result}, stats[result])
+                for call, stats in coalescing.items()
+                for result in ("executed", "coalesced")
+            ],
+        ),
+        (
+            "in_flight_calls",
+            "gauge",
+            "Searches and leg fetches in flight",
+            [
+                ({"call": call}, stats["in_flight"])
+                for call, stats in coalescing.items()
+            ],
+        ),
+        (
+            "prewarm_runs_total",
+            "counter",
+            "Runs of the popular routes prewarmer",
+            [({}, prewarmer["runs"])],
+        ),
+        (
+            "prewarm_upstream_calls_total",
+            "counter",
+            "Airline API calls made by the popular routes prewarmer",
+            [({}, prewarmer["upstream_calls"])],
+        ),
+    ]
+
+
+metrics.register_collector(collect_flight_metrics)
+
+
+def get_int_query_param(query_params, name: str, default: int | None) -> int | None:
+    value = query_params.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationException(f"'{name}' must be an integer")
+
+
+def search_flights(
+    request, origin: str, destination: str, departure_date: str, return_date: str
+) -> AggregatedSearch:
+    search = flight_aggregator_service.search_flights(
+        origin=origin.upper(),
+        destination=destination.upper(),
+        departure_date=departure_date,
+        return_date=return_date,
+        limit=get_int_query_param(request.query_params, "limit", None),
+        offset=get_int_query_param(request.query_params, "offset", 0),
+    )
+    check_search_results(search)
+    record_search(origin, destination, departure_date, return_date)
+    return search
+
+
+async def asearch_flights(
+    request, origin: str, destination: str, departure_date: str, return_date: str
+) -> AggregatedSearch:
+    search = await flight_aggregator_service.asearch_flights(
+        origin=origin.upper(),
+        destination=destination.upper(),
+        departure_date=departure_date,
+        return_date=return_date,
+        limit=get_int_query_param(request.GET, "limit", None),
+        offset=get_int_query_param(request.GET, "offset", 0),
+    )
+    check_search_results(search)
+    record_search(origin, destination, departure_date, return_date)
+    return search
+
+
+def check_search_results(
+    search: AggregatedSearch | AggregatedDateGrid,
+) -> AggregatedSearch | AggregatedDateGrid:
+    if not search.has_results():
+        if search.timed_out():
+            raise UpstreamTimeoutException("Airlines did not respond in time")
+        raise ConnectionError("Airlines are unavailable")
+    return search
+
+
+def serialize_combinations(combinations: Iterator[FlightCombination]) -> list[dict]:
+    with metrics.stage("combine"):
+        combinations = list(combinations)
+    metrics.observe_size("combinations", len(combinations))
+    with metrics.stage("serialize"):
+        return [combination.to_dict() for combination in combinations]
+
+
+def record_search(
+    origin: str, destination: str, departure_date: str, return_date: str
+) -> None:
+    route_popularity_tracker.record(
+        (origin.upper(), destination.upper(), departure_date, return_date)
+    )
 
 
 class FlightsListAPIView(ListAPIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @profiled("flights_list")
+    def list(
+        self,
+        request,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: str,
+    ):
+        try:
+            search = search_flights(
+                request, origin, destination, departure_date, return_date
+            )
+        except ValidationException as error:
+            return Response({"error": str(error)}, 400)
+        except UpstreamTimeoutException as error:
+            return Response({"error": str(error)}, 504)
+        except ConnectionError as error:
+            return Response({"error": str(error)}, 502)
+
+        if request.query_params.get("stream") in ("1", "true"):
+            return StreamingHttpResponse(
+                stream_flight_combinations(search.combinations),
+                content_type="application/json",
+                status=200,
+            )
+        return Response(serialize_combinations(search.combinations), 200)
+
+
+class FlightsSearchAPIView(ListAPIView):
+    """Same search as FlightsListAPIView, also returning the status of each airline"""
+
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def list(
@@ -20,19 +257,127 @@ class FlightsListAPIView(ListAPIView):
         departure_date: str,
         return_date: str,
     ):
-        mock_airline_api_connector = MockAirlineAPIConnector()
-        iata_repository = IataRepository()
-        flight_service = MockAirlinesIncService(
-            mock_airline_api_connector, iata_repository
+        try:
+            search = search_flights(
+                request, origin, destination, departure_date, return_date
+            )
+        except ValidationException as error:
+            return Response({"error": str(error)}, 400)
+        except UpstreamTimeoutException as error:
+            return Response({"error": str(error)}, 504)
+        except ConnectionError as error:
+            return Response({"error": str(error)}, 502)
+
+        return Response(
+            {
+                "providers": search.providers,
+                "combinations": serialize_combinations(search.combinations),
+            },
+            200,
         )
+
+
+class FlightsDateGridAPIView(ListAPIView):
+    """Cheapest combination of every departure and return dates pair within `days` (3 by default) of the requested dates"""
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def list(
+        self,
+        request,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: str,
+    ):
         try:
-            flight_combinations = flight_service.search_flights(
+            grid = flight_aggregator_service.search_date_grid(
                 origin=origin.upper(),
                 destination=destination.upper(),
                 departure_date=departure_date,
                 return_date=return_date,
+                days=get_int_query_param(request.query_params, "days", 3),
             )
-            flight_combinations = [f.to_dict() for f in flight_combinations]
+            check_search_results(grid)
         except ValidationException as error:
             return Response({"error": str(error)}, 400)
-        return Response(flight_combinations, 200)
+        except UpstreamTimeoutException as error:
+            return Response({"error": str(error)}, 504)
+        except ConnectionError as error:
+            return Response({"error": str(error)}, 502)
+
+        metrics.observe_size("grid_cells", len(grid.cells))
+        with metrics.stage("serialize"):
+            cells = [
+                {
+                    "departure_date": departure,
+                    "return_date": arrival,
+                    "combination": None if cheapest is None else cheapest.to_dict(),
+                }
+                for (departure, arrival), cheapest in grid.cells.items()
+            ]
+        return Response({"providers": grid.providers, "cells": cells}, 200)
+
+
+class AsyncFlightsListView(View):
+    """Async version of FlightsListAPIView, keeping the upstream searches on the event loop under ASGI"""
+
+    async def get(
+        self,
+        request,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: str,
+    ):
+        try:
+            await sync_to_async(self.authenticate)(request)
+        except exceptions.APIException as error:
+            return JsonResponse({"detail": str(error.detail)}, status=401)
+        return await self.list(
+            request, origin, destination, departure_date, return_date
+        )
+
+    @profiled("flights_list")
+    async def list(
+        self,
+        request,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: str,
+    ):
+        try:
+            search = await asearch_flights(
+                request, origin, destination, departure_date, return_date
+            )
+        except ValidationException as error:
+            return JsonResponse({"error": str(error)}, status=400)
+        except UpstreamTimeoutException as error:
+            return JsonResponse({"error": str(error)}, status=504)
+        except ConnectionError as error:
+            return JsonResponse({"error": str(error)}, status=502)
+
+        if request.GET.get("stream") in ("1", "true"):
+            return StreamingHttpResponse(
+                self.aiter_chunks(stream_flight_combinations(search.combinations)),
+                content_type="application/json",
+            )
+        with metrics.stage("combine"):
+            combinations = list(search.combinations)
+        metrics.observe_size("combinations", len(combinations))
+        with metrics.stage("serialize"):
+            body = b"".join(stream_flight_combinations(combinations))
+        return HttpResponse(body, content_type="application/json")
+
+    def authenticate(self, request) -> None:
+        credentials = CachedTokenAuthentication().authenticate(request)
+        if credentials is None:
+            raise exceptions.NotAuthenticated()
+        # Read by the profiler, without loading the session user on the event loop
+        request.user = credentials[0]
+
+    async def aiter_chunks(self, chunks):
+        for chunk in chunks:
+            yield chunk
@@ -11,6 +11,13 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from flightservice.lifespan import LifespanMiddleware
+from flightservice.warm_up import start_server
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'flightservice.settings')
 
-application = get_asgi_application()
+# Closes the async HTTP client when the server shuts down
+application = LifespanMiddleware(get_asgi_application())
+
+# Only the servers load this module, so management commands don't warm up nor start threads
+start_server()
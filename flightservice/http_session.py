@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import weakref
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+# An async client can only be used by the event loop it was created on
+_async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def build_http_session() -> requests.Session:
+    """Builds a connection-pooled session that retries idempotent requests with backoff"""
+    retry = Retry(
+        total=settings.HTTP_MAX_RETRIES,
+        backoff_factor=settings.HTTP_RETRY_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=settings.HTTP_POOL_SIZE,
+        pool_maxsize=settings.HTTP_POOL_SIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """Returns the process-wide session shared by the external API connectors"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_http_session()
+    return _session
+
+
+def get_http_timeout() -> tuple[float, float]:
+    return (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT)
+
+
+def build_async_http_client() -> httpx.AsyncClient:
+    """Builds a connection-pooled async client, retrying requests that failed to connect"""
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_ASYNC_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_POOL_SIZE,
+    )
+    transport = httpx.AsyncHTTPTransport(
+        limits=limits, retries=settings.HTTP_MAX_RETRIES
+    )
+    timeout = httpx.Timeout(
+        settings.HTTP_READ_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT
+    )
+    return httpx.AsyncClient(transport=transport, timeout=timeout)
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Returns the async client shared by the external API connectors on the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = build_async_http_client()
+    return client
+
+
+async def aclose_async_http_client() -> None:
+    """Closes the async client of the running event loop, if any, before the loop ends"""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
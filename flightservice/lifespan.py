@@ -0,0 +1,24 @@
+from flightservice.http_session import aclose_async_http_client
+
+
+class LifespanMiddleware:
+    """ASGI middleware answering the server lifespan events, which Django doesn't handle.
+
+    On shutdown it closes the async HTTP client of the server's event loop, so its pooled
+    connections aren't left open. Every other connection is passed to the application.
+    """
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "lifespan":
+            return await self.application(scope, receive, send)
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await aclose_async_http_client()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
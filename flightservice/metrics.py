@@ -0,0 +1,227 @@
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Callable, Iterable
+import threading
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+SIZE_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 100000)
+
+# (name, type, help, [(labels, value)]) samples of a collector
+Family = tuple[str, str, str, list[tuple[dict, float]]]
+
+# Stage durations of the current request, sent back in the Server-Timing header
+request_timings: ContextVar["RequestTimings | None"] = ContextVar(
+    "request_timings", default=None
+)
+
+
+class Histogram:
+    """This class is used to count observations into cumulative buckets, Prometheus style"""
+
+    __slots__ = ("buckets", "counts", "sum", "count", "lock")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> tuple[list[int], float, int]:
+        with self.lock:
+            return list(self.counts), self.sum, self.count
+
+
+class RequestTimings:
+    """This class is used to add up the duration of each stage of a request, from any thread"""
+
+    __slots__ = ("durations", "lock")
+
+    def __init__(self):
+        self.durations: dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self.lock:
+            self.durations[stage] = self.durations.get(stage, 0.0) + seconds
+
+    def to_header(self, total: float) -> str:
+        """Returns the Server-Timing header. Stages run concurrently (the legs fetch) are summed"""
+        with self.lock:
+            durations = list(self.durations.items())
+        durations.append(("total", total))
+        return ", ".join(
+            f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in durations
+        )
+
+
+class StageTimer:
+    """This class is used to time a block as a stage of the current request"""
+
+    __slots__ = ("metrics", "stage", "started_at")
+
+    def __init__(self, metrics: "Metrics", stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.started_at = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe_stage(self.stage, perf_counter() - self.started_at)
+
+
+class Metrics:
+    """This class is used to keep the in-process metrics and render them in the Prometheus text format.
+
+    Stage durations, upstream latencies and result sizes are kept in histograms. The stats
+    other components already count (caches, coalescing) are read from collectors when
+    rendering. When disabled, every method returns right away.
+    """
+
+    def __init__(self, enabled: bool, prefix: str = "flightservice"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self.histograms: dict[tuple[str, tuple], Histogram] = {}
+        self.help: dict[str, str] = {}
+        self.collectors: list[Callable[[], Iterable[Family]]] = []
+        self.lock = threading.Lock()
+        self.null_timer = nullcontext()
+
+    def stage(self, name: str) -> StageTimer | nullcontext:
+        """Returns a context manager timing its block as the `name` stage"""
+        if not self.enabled:
+            return self.null_timer
+        return StageTimer(self, name)
+
+    def observe_stage(self, name: str, seconds: float) -> None:
+        self.observe(
+            "stage_seconds",
+            seconds,
+            labels=(("stage", name),),
+            help="Duration of each search stage",
+        )
+        timings = request_timings.get()
+        if timings is not None:
+            timings.add(name, seconds)
+
+    def observe_upstream(self, provider: str, status: int | str, seconds: float):
+        """Method used to record an upstream request, also timed as the `upstream` stage"""
+        if not self.enabled:
+            return
+        self.observe_stage("upstream", seconds)
+        self.observe(
+            "upstream_request_seconds",
+            seconds,
+            labels=(("provider", provider), ("status", str(status))),
+            help="Latency of the airline API requests, by response status",
+        )
+
+    def observe_size(self, kind: str, size: int) -> None:
+        if not self.enabled:
+            return
+        self.observe(
+            "result_size",
+            size,
+            labels=(("kind", kind),),
+            buckets=SIZE_BUCKETS,
+            help="Number of items of each result",
+        )
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        labels: tuple = (),
+        buckets: tuple = LATENCY_BUCKETS,
+        help: str = "",
+    ) -> None:
+        key = (name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(key, Histogram(buckets))
+                self.help.setdefault(name, help)
+        histogram.observe(value)
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+        rendered_help = set()
+        for (name, labels), histogram in histograms:
+            full_name = f"{self.prefix}_{name}"
+            if name not in rendered_help:
+                rendered_help.add(name)
+                lines.append(f"# HELP {full_name} {self.help[name]}")
+                lines.append(f"# TYPE {full_name} histogram")
+            counts, total, count = histogram.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                bucket_labels = dict(labels, le=str(bound))
+                lines.append(
+                    f"{full_name}_bucket{format_labels(bucket_labels)} {cumulative}"
+                )
+            lines.append(f"{full_name}_sum{format_labels(dict(labels))} {total}")
+            lines.append(f"{full_name}_count{format_labels(dict(labels))} {count}")
+
+        # Several collectors may report samples of the same family (each cache its hits)
+        families: dict[str, tuple[str, str, list]] = {}
+        for collector in self.collectors:
+            for name, kind, help, samples in collector():
+                families.setdefault(name, (kind, help, []))[2].extend(samples)
+        for name, (kind, help, samples) in families.items():
+            full_name = f"{self.prefix}_{name}"
+            lines.append(f"# HELP {full_name} {help}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for sample_labels, value in samples:
+                lines.append(f"{full_name}{format_labels(sample_labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        with self.lock:
+            self.histograms.clear()
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+metrics = Metrics(enabled=settings.METRICS_ENABLED)
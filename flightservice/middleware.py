@@ -0,0 +1,48 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+from time import perf_counter
+
+from flightservice.metrics import RequestTimings, metrics, request_timings
+
+
+class ServerTimingMiddleware:
+    """Adds the duration of each stage of the request to the Server-Timing response header.
+
+    Not used at all when the metrics are disabled.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not metrics.enabled:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        started_at = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            request_timings.reset(token)
+        return self.add_header(response, timings, started_at)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        started_at = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_timings.reset(token)
+        return self.add_header(response, timings, started_at)
+
+    def add_header(self, response, timings: RequestTimings, started_at: float):
+        response["Server-Timing"] = timings.to_header(perf_counter() - started_at)
+        return response
@@ -0,0 +1,211 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache as default_cache
+from django.core.cache.backends.base import BaseCache
+from functools import wraps
+import asyncio
+import cProfile
+import io
+import marshal
+import pstats
+import random
+import tempfile
+import threading
+import time
+import uuid
+
+
+class RequestProfiler:
+    """This class is used to profile the requests of the wrapped views, storing each profile for download.
+
+    A request is profiled when a staff user sends the `X-Profile` header, or at random, for
+    `sample_rate` of the requests. The sample rate is kept in the shared cache, so changing it
+    reaches every worker within `refresh_interval` seconds. So are the profiles, the last
+    `max_profiles` of them, so any worker can serve them. Only the thread running the view is
+    profiled, the legs fetched on the pools show as the time waiting for them. Async views are
+    profiled on the event loop, together with the other requests it runs meanwhile.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        sample_rate: float = 0,
+        max_profiles: int = 20,
+        ttl: float = 3600,
+        refresh_interval: float = 5,
+        cache: BaseCache = default_cache,
+    ):
+        self.enabled = enabled
+        self.default_sample_rate = sample_rate
+        self.max_profiles = max_profiles
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.cache = cache
+        self.sample_rate = sample_rate
+        self.checked_at = 0.0
+        # A single profiler per process may be active at once
+        self.lock = threading.Lock()
+
+    def should_profile(self, request) -> bool:
+        if not self.enabled:
+            return False
+        if "HTTP_X_PROFILE" in request.META and request.user.is_staff:
+            return True
+        sample_rate = self.get_sample_rate()
+        return sample_rate > 0 and random.random() < sample_rate
+
+    async def ashould_profile(self, request) -> bool:
+        # The sample rate is read from the shared cache off the event loop, when it is due
+        if self.enabled and time.monotonic() - self.checked_at >= self.refresh_interval:
+            await sync_to_async(self.get_sample_rate)()
+        return self.should_profile(request)
+
+    def profile(self, name: str, request, function, *args, **kwargs):
+        """Method used to run the view, profiling it when asked to. The profile id is sent in X-Profile-Id"""
+        if not self.should_profile(request) or not self.lock.acquire(blocking=False):
+            return function(request, *args, **kwargs)
+        try:
+            profiler = cProfile.Profile()
+            started_at = time.perf_counter()
+            profiler.enable()
+            try:
+                response = function(request, *args, **kwargs)
+            finally:
+                profiler.disable()
+            duration = time.perf_counter() - started_at
+        finally:
+            self.lock.release()
+
+        response["X-Profile-Id"] = self.save_profile(
+            name, request, response, profiler, duration
+        )
+        return response
+
+    async def aprofile(self, name: str, request, function, *args, **kwargs):
+        """Async version of profile, for views that are coroutines"""
+        if not await self.ashould_profile(request) or not self.lock.acquire(
+            blocking=False
+        ):
+            return await function(request, *args, **kwargs)
+        try:
+            profiler = cProfile.Profile()
+            started_at = time.perf_counter()
+            profiler.enable()
+            try:
+                response = await function(request, *args, **kwargs)
+            finally:
+                profiler.disable()
+            duration = time.perf_counter() - started_at
+        finally:
+            self.lock.release()
+
+        response["X-Profile-Id"] = await sync_to_async(self.save_profile)(
+            name, request, response, profiler, duration
+        )
+        return response
+
+    def save_profile(
+        self, name: str, request, response, profiler: cProfile.Profile, duration: float
+    ) -> str:
+        profiler.create_stats()
+        return self.save(
+            {
+                "view": name,
+                "path": request.get_full_path(),
+                "status": response.status_code,
+                "duration_ms": round(duration * 1000, 3),
+                "created_at": time.time(),
+            },
+            marshal.dumps(profiler.stats),
+        )
+
+    def save(self, info: dict, data: bytes) -> str:
+        profile_id = uuid.uuid4().hex
+        info = {"id": profile_id, **info}
+        self.cache.set(f"profiles:{profile_id}", (info, data), self.ttl)
+        # Concurrent saves from other workers may drop an id from the index, the profile expires anyway
+        index = [info] + [
+            profile
+            for profile in self.cache.get("profiles:index", [])
+            if time.time() - profile["created_at"] < self.ttl
+        ]
+        for profile in index[self.max_profiles :]:
+            self.cache.delete(f"profiles:{profile['id']}")
+        self.cache.set("profiles:index", index[: self.max_profiles], self.ttl)
+        return profile_id
+
+    def list_profiles(self) -> list[dict]:
+        return self.cache.get("profiles:index", [])
+
+    def get_profile(self, profile_id: str) -> tuple[dict, bytes] | None:
+        return self.cache.get(f"profiles:{profile_id}")
+
+    def get_summary(self, data: bytes, limit: int = 50) -> str:
+        """Method used to render the most expensive functions of a profile, by cumulative time"""
+        with tempfile.NamedTemporaryFile(suffix=".prof") as file:
+            file.write(data)
+            file.flush()
+            output = io.StringIO()
+            stats = pstats.Stats(file.name, stream=output)
+            stats.sort_stats("cumulative").print_stats(limit)
+        return output.getvalue()
+
+    def get_sample_rate(self) -> float:
+        now = time.monotonic()
+        if now - self.checked_at >= self.refresh_interval:
+            self.sample_rate = self.cache.get(
+                "profiles:sample_rate", self.default_sample_rate
+            )
+            self.checked_at = now
+        return self.sample_rate
+
+    def set_sample_rate(self, sample_rate: float) -> None:
+        self.cache.set("profiles:sample_rate", sample_rate, None)
+        self.sample_rate = sample_rate
+
+
+request_profiler = RequestProfiler(
+    enabled=settings.PROFILING_ENABLED,
+    sample_rate=settings.PROFILING_SAMPLE_RATE,
+    max_profiles=settings.PROFILING_MAX_PROFILES,
+    ttl=settings.PROFILING_TTL,
+)
+
+
+def profiled(name: str):
+    """Decorator profiling a view method (self, request, ...) with the request profiler"""
+
+    def decorator(method):
+        if asyncio.iscoroutinefunction(method):
+
+            @wraps(method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                if not request_profiler.enabled:
+                    return await method(self, request, *args, **kwargs)
+                return await request_profiler.aprofile(
+                    name,
+                    request,
+                    lambda request, *args, **kwargs: method(
+                        self, request, *args, **kwargs
+                    ),
+                    *args,
+                    **kwargs,
+                )
+
+            return async_wrapper
+
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if not request_profiler.enabled:
+                return method(self, request, *args, **kwargs)
+            return request_profiler.profile(
+                name,
+                request,
+                lambda request, *args, **kwargs: method(self, request, *args, **kwargs),
+                *args,
+                **kwargs,
+            )
+
+        return wrapper
+
+    return decorator
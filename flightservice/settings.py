@@ -52,6 +52,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "flightservice.middleware.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -89,6 +90,8 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # A file (not the in-memory default), so the searches' worker threads read it alongside the test
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 CACHES = {
@@ -98,6 +101,75 @@ CACHES = {
     }
 }
 
+# External APIs HTTP client (shared connection pool used by the connectors)
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.3"))
+# Upstream requests a single ASGI worker may keep in flight
+HTTP_ASYNC_MAX_CONNECTIONS = int(os.getenv("HTTP_ASYNC_MAX_CONNECTIONS", "200"))
+
+# Validated API tokens kept in memory (seconds / number of tokens)
+AUTH_TOKEN_CACHE_TTL = float(os.getenv("AUTH_TOKEN_CACHE_TTL", "60"))
+AUTH_TOKEN_CACHE_MAX_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_MAX_SIZE", "10000"))
+
+# Airports list cache (seconds). Lists older than TTL - EARLY_REFRESH are refreshed in the background
+AIRPORT_CACHE_TTL = float(os.getenv("AIRPORT_CACHE_TTL", "60"))
+AIRPORT_CACHE_EARLY_REFRESH = float(os.getenv("AIRPORT_CACHE_EARLY_REFRESH", "10"))
+# How often each process checks if the airports were updated
+AIRPORT_CACHE_VERSION_INTERVAL = float(os.getenv("AIRPORT_CACHE_VERSION_INTERVAL", "5"))
+
+# Airline API legs cache (seconds / number of legs)
+FLIGHT_LEG_CACHE_TTL = float(os.getenv("FLIGHT_LEG_CACHE_TTL", "60"))
+FLIGHT_LEG_CACHE_STALE_TTL = float(os.getenv("FLIGHT_LEG_CACHE_STALE_TTL", "120"))
+FLIGHT_LEG_CACHE_MAX_SIZE = int(os.getenv("FLIGHT_LEG_CACHE_MAX_SIZE", "1024"))
+
+# Time (seconds) each airline has to answer a search before it is left out of the results
+FLIGHT_PROVIDER_TIMEOUT = float(os.getenv("FLIGHT_PROVIDER_TIMEOUT", "10"))
+# Serves the flight search with the async views, when running under ASGI
+FLIGHT_ASYNC_SEARCH = os.getenv("FLIGHT_ASYNC_SEARCH", "false").lower() == "true"
+
+# Loads the airports state and connects to the airline API at startup, before serving requests
+WARM_START = os.getenv("WARM_START", "false").lower() == "true"
+# Set by gunicorn.conf.py when the app is loaded once and then forked into the workers
+SERVER_PRELOAD_APP = os.getenv("SERVER_PRELOAD_APP", "false").lower() == "true"
+# Threads serving the requests in each server worker (see gunicorn.conf.py)
+SERVER_THREADS = int(os.getenv("SERVER_THREADS", "8"))
+# Threads of each process fetching the legs (two per search) and searching each airline (one per search)
+FLIGHT_LEGS_POOL_SIZE = int(os.getenv("FLIGHT_LEGS_POOL_SIZE", str(2 * SERVER_THREADS)))
+FLIGHT_PROVIDERS_POOL_SIZE = int(
+    os.getenv("FLIGHT_PROVIDERS_POOL_SIZE", str(SERVER_THREADS))
+)
+# Threads of each process fetching the legs of the date grids (up to 30 each), apart from the searches ones
+FLIGHT_GRID_LEGS_POOL_SIZE = int(os.getenv("FLIGHT_GRID_LEGS_POOL_SIZE", "4"))
+
+# Keeps the legs of the most searched routes cached ahead of demand, in a background thread
+FLIGHT_PREWARM_ENABLED = os.getenv("FLIGHT_PREWARM_ENABLED", "false").lower() == "true"
+FLIGHT_PREWARM_TOP_ROUTES = int(os.getenv("FLIGHT_PREWARM_TOP_ROUTES", "20"))
+# Seconds between runs, randomized by +/- JITTER (fraction of the interval)
+FLIGHT_PREWARM_INTERVAL = float(os.getenv("FLIGHT_PREWARM_INTERVAL", "20"))
+FLIGHT_PREWARM_JITTER = float(os.getenv("FLIGHT_PREWARM_JITTER", "0.2"))
+# Upstream calls each run may make
+FLIGHT_PREWARM_BUDGET = int(os.getenv("FLIGHT_PREWARM_BUDGET", "20"))
+# Route popularity halves every HALF_LIFE seconds
+FLIGHT_ROUTE_POPULARITY_HALF_LIFE = float(
+    os.getenv("FLIGHT_ROUTE_POPULARITY_HALF_LIFE", "600")
+)
+FLIGHT_ROUTE_POPULARITY_MAX_ROUTES = int(
+    os.getenv("FLIGHT_ROUTE_POPULARITY_MAX_ROUTES", "10000")
+)
+
+
+# Per-stage timings, sent in the Server-Timing header, and the /metrics endpoint (Prometheus text)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+
+# Profiles the flights and airports list requests of staff users sending X-Profile, and a
+# SAMPLE_RATE (0 to 1) of every request. The last MAX_PROFILES are kept for TTL seconds
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_MAX_PROFILES = int(os.getenv("PROFILING_MAX_PROFILES", "20"))
+PROFILING_TTL = float(os.getenv("PROFILING_TTL", "3600"))
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -152,4 +224,7 @@ LOGGING = {
         "handlers": ["console"],
         "level": "INFO",  # global log level config
     },
+    "loggers": {
+        "httpx": {"level": "WARNING"},  # Logs every upstream request on INFO
+    },
 }
@@ -1,9 +1,14 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from flightservice.views import MetricsView, ProfileDetailView, ProfileListView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("user/", include("user.urls")),
     path("airport/", include("airport.urls")),
     path("flight/", include("flight.urls")),
+    path("metrics", MetricsView.as_view()),
+    path("profiles", ProfileListView.as_view()),
+    path("profiles/<str:profile_id>", ProfileDetailView.as_view()),
 ]
@@ -0,0 +1,75 @@
+from django.http import Http404, HttpResponse
+from django.views import View
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from flightservice.metrics import metrics
+from flightservice.profiling import request_profiler
+from user.authentication import CachedTokenAuthentication
+
+
+class MetricsView(View):
+    """Metrics of this process in the Prometheus text format. Not found when the metrics are disabled"""
+
+    def get(self, request):
+        if not metrics.enabled:
+            raise Http404()
+        return HttpResponse(
+            metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+
+class ProfileListView(APIView):
+    """Stored request profiles (GET) and the sample rate of the profiled requests (POST), for staff users"""
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        if not request_profiler.enabled:
+            raise Http404()
+        return Response(
+            {
+                "sample_rate": request_profiler.get_sample_rate(),
+                "profiles": request_profiler.list_profiles(),
+            },
+            200,
+        )
+
+    def post(self, request):
+        if not request_profiler.enabled:
+            raise Http404()
+        # The body may be any JSON value, not only an object
+        data = request.data if isinstance(request.data, dict) else {}
+        try:
+            sample_rate = float(data.get("sample_rate"))
+        except (TypeError, ValueError):
+            sample_rate = -1
+        if not 0 <= sample_rate <= 1:
+            return Response({"error": "'sample_rate' must be between 0 and 1"}, 400)
+        request_profiler.set_sample_rate(sample_rate)
+        return Response({"sample_rate": sample_rate}, 200)
+
+
+class ProfileDetailView(APIView):
+    """A stored request profile, as a cProfile file or, with ?format=text, as its most expensive functions"""
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, profile_id: str):
+        if not request_profiler.enabled:
+            raise Http404()
+        profile = request_profiler.get_profile(profile_id)
+        if profile is None:
+            raise Http404()
+        info, data = profile
+        if request.query_params.get("format") == "text":
+            return HttpResponse(
+                request_profiler.get_summary(data),
+                content_type="text/plain; charset=utf-8",
+            )
+        response = HttpResponse(data, content_type="application/octet-stream")
+        response["Content-Disposition"] = f'attachment; filename="{profile_id}.prof"'
+        return response
@@ -0,0 +1,81 @@
+from django.db import connections
+import logging
+import os
+import threading
+import time
+
+# Process that last started the worker state, so a forked worker starts its own
+_worker_pid: int | None = None
+
+
+def start_server() -> None:
+    """Method used to warm up and start the process when the server loads the app (wsgi.py, asgi.py).
+
+    Management commands don't load these modules, so they skip it.
+    """
+    from django.conf import settings
+
+    if settings.WARM_START:
+        warm_up_state()
+    # A preloaded app is forked into the workers, which start their own (see gunicorn.conf.py)
+    if not settings.SERVER_PRELOAD_APP:
+        start_worker()
+
+
+def warm_up_state() -> None:
+    """Loads the per-process airports state (iata index, airports list, distances, spatial index).
+
+    It is plain data, so when the app is preloaded by the server the workers share it from
+    the fork. The database connections are closed afterwards, since they can't be shared.
+    """
+    from airport.views import airport_cache_repository, nearby_airports_service
+    from flight.views import airport_distance_service, iata_index_repository
+
+    started_at = time.perf_counter()
+    try:
+        iata_index_repository.get_iata_codes()
+        airport_cache_repository.get_entry()
+        airport_distance_service.get_coordinates()
+        nearby_airports_service.get_index()
+    except Exception as error:
+        # The requests load what is missing, as if the process was not warmed up
+        logging.warning(f"Could not warm up the airports state: {error}")
+    finally:
+        connections.close_all()
+    logging.info(
+        f"Warmed up the airports state in {time.perf_counter() - started_at:.3f}s"
+    )
+
+
+def start_worker() -> None:
+    """Starts the state that can't be shared from a fork: the pooled HTTP connections and the background threads.
+
+    Nothing blocks, so the worker serves its first request right away.
+    """
+    global _worker_pid
+    if _worker_pid == os.getpid():
+        return
+    _worker_pid = os.getpid()
+
+    from django.conf import settings
+    from flight.views import mock_airline_api_connector, route_prewarmer
+
+    if settings.WARM_START:
+        threading.Thread(
+            target=warm_up_http_pool,
+            args=(mock_airline_api_connector,),
+            name="http-warm-up",
+            daemon=True,
+        ).start()
+    if settings.FLIGHT_PREWARM_ENABLED:
+        route_prewarmer.start()
+
+
+def warm_up_http_pool(api_connector) -> None:
+    """Opens a connection to the airline API, so the first search doesn't pay the TCP and TLS handshakes"""
+    from flightservice.http_session import get_http_timeout
+
+    try:
+        api_connector.session.head(api_connector.base_url, timeout=get_http_timeout())
+    except Exception as error:
+        logging.warning(f"Could not connect to the airline API: {error}")
@@ -11,6 +11,11 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from flightservice.warm_up import start_server
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'flightservice.settings')
 
 application = get_wsgi_application()
+
+# Only the servers load this module, so management commands don't warm up nor start threads
+start_server()
@@ -0,0 +1,43 @@
+"""Production server settings, run with: gunicorn -c gunicorn.conf.py
+
+Every setting can be changed with the environment variable named after it.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("SERVER_BIND", "0.0.0.0:8080")
+# One process per core, each serving requests on a pool of threads (the searches mostly wait on the airlines)
+workers = int(os.getenv("SERVER_WORKERS", multiprocessing.cpu_count()))
+threads = int(os.getenv("SERVER_THREADS", "8"))
+# Under ASGI (FLIGHT_ASYNC_SEARCH) each worker runs an event loop instead of threads
+if os.getenv("FLIGHT_ASYNC_SEARCH", "false").lower() == "true":
+    wsgi_app = "flightservice.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "flightservice.wsgi:application"
+    worker_class = "gthread"
+
+# Loads and warms up the app once, before forking the workers, which share its memory
+preload_app = os.getenv("SERVER_PRELOAD_APP", "true").lower() == "true"
+os.environ["SERVER_PRELOAD_APP"] = str(preload_app).lower()
+os.environ.setdefault("WARM_START", "true")
+
+# Workers are recycled after a number of requests (randomized, so they don't restart together)
+max_requests = int(os.getenv("SERVER_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("SERVER_MAX_REQUESTS_JITTER", "1000"))
+timeout = int(os.getenv("SERVER_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("SERVER_KEEPALIVE", "5"))
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("SERVER_LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    # Connection pools and threads don't survive the fork, each worker starts its own
+    if preload_app:
+        from flightservice.warm_up import start_worker
+
+        start_worker()
@@ -0,0 +1,113 @@
+from collections import OrderedDict
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+import threading
+import time
+
+from flightservice.metrics import metrics
+
+
+class TokenCache:
+    """This class is used to keep the recently validated tokens in memory, with their user.
+
+    Entries are valid for `ttl` seconds and at most `max_size` tokens are kept, evicting
+    the least recently used.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.entries: OrderedDict[str, tuple[tuple, float]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> tuple | None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            credentials, stored_at = entry
+            if time.monotonic() - stored_at >= self.ttl:
+                del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return credentials
+
+    def set(self, key: str, credentials: tuple) -> None:
+        with self.lock:
+            self.entries[key] = (credentials, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def delete_user(self, user_id: int) -> None:
+        with self.lock:
+            for key in [
+                key
+                for key, ((user, _), _) in self.entries.items()
+                if user.pk == user_id
+            ]:
+                del self.entries[key]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"size": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TokenCache(
+    ttl=settings.AUTH_TOKEN_CACHE_TTL, max_size=settings.AUTH_TOKEN_CACHE_MAX_SIZE
+)
+
+
+def collect_token_cache_metrics() -> list:
+    stats = token_cache.stats()
+    return [
+        (
+            "cache_requests_total",
+            "counter",
+            "Requests to the in-process caches, by result",
+            [
+                ({"cache": "auth_tokens", "result": "hit"}, stats["hits"]),
+                ({"cache": "auth_tokens", "result": "miss"}, stats["misses"]),
+            ],
+        ),
+        (
+            "cache_entries",
+            "gauge",
+            "Entries kept by the in-process caches",
+            [({"cache": "auth_tokens"}, stats["size"])],
+        ),
+    ]
+
+
+metrics.register_collector(collect_token_cache_metrics)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that skips the Token and User query for recently validated tokens.
+
+    Tokens are dropped from the cache when deleted or when their user is deactivated
+    (see user.signals). Changes made by other processes are seen once the entry expires.
+    """
+
+    def authenticate_credentials(self, key: str) -> tuple:
+        credentials = token_cache.get(key)
+        if credentials is not None:
+            return credentials
+
+        # Raises AuthenticationFailed for unknown tokens and inactive users, which aren't cached
+        credentials = super().authenticate_credentials(key)
+        token_cache.set(key, credentials)
+        return credentials
@@ -0,0 +1,85 @@
+import django
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flightservice.settings")
+
+django.setup()
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from user.authentication import CachedTokenAuthentication, TokenCache, token_cache
+
+
+pytestmark = pytest.mark.usefixtures("db")
+
+
+@pytest.fixture
+def token() -> Token:
+    user = User.objects.create(username="cached_token_user")
+    return Token.objects.create(user=user)
+
+
+def authenticate(key: str) -> tuple:
+    return CachedTokenAuthentication().authenticate_credentials(key)
+
+
+def test_validated_token_is_served_without_queries(token: Token):
+    authenticate(token.key)
+    with CaptureQueriesContext(connection) as queries:
+        user, cached_token = authenticate(token.key)
+    assert len(queries) == 0
+    assert user.username == "cached_token_user"
+    assert cached_token.key == token.key
+
+
+def test_unknown_token_is_not_cached():
+    for _ in range(2):
+        with pytest.raises(AuthenticationFailed):
+            authenticate("unknown")
+    assert token_cache.get("unknown") is None
+
+
+def test_deleted_token_is_rejected(token: Token):
+    authenticate(token.key)
+    token.delete()
+    with pytest.raises(AuthenticationFailed):
+        authenticate(token.key)
+
+
+def test_deactivated_user_is_rejected(token: Token):
+    authenticate(token.key)
+    token.user.is_active = False
+    token.user.save()
+    with pytest.raises(AuthenticationFailed):
+        authenticate(token.key)
+
+
+def test_demoted_staff_user_loses_staff_access(token: Token):
+    token.user.is_staff = True
+    token.user.save()
+    assert authenticate(token.key)[0].is_staff
+
+    token.user.is_staff = False
+    token.user.save()
+    assert not authenticate(token.key)[0].is_staff
+
+
+def test_token_cache_expires_entries():
+    cache = TokenCache(ttl=0, max_size=10)
+    cache.set("key", (User(pk=1), None))
+    assert cache.get("key") is None
+
+
+def test_token_cache_evicts_least_recently_used():
+    cache = TokenCache(ttl=60, max_size=2)
+    cache.set("a", (User(pk=1), None))
+    cache.set("b", (User(pk=2), None))
+    cache.get("a")
+    cache.set("c", (User(pk=3), None))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None